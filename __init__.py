@@ -9,7 +9,6 @@ def _prepare_logging():
     logger.addHandler(logging.NullHandler())
 
     websocket_logger = logging.getLogger("websocket")
-    websocket_logger.setLevel(logging.DEBUG)
     websocket_logger.addHandler(logging.NullHandler())
 
 
@@ -2,14 +2,15 @@
 import os
 import sys
 import time
-import json
 import ssl
 import urllib3
 import requests
 import certifi
+import asyncio
 import logging
 import platform
 import threading
+from . import codec
 from . import global_value
 from .http.login import Login
 from .http.logout import Logout
@@ -25,6 +26,28 @@ from .ws.objects.candles import Candles
 from .ws.objects.profile import Profile
 from .ws.objects.listinfodata import ListInfoData
 from .ws.client import WebsocketClient
+from .depth import DepthBooks
+from .ledger import Ledger, account_name
+from .frames import FrameDecoder, outgoing_event
+from .sentiment import SentimentStore
+from .signals import SignalStore
+from .streams import StreamHub
+from .pipeline import CandlePipeline
+from .sell import OptionSeller
+from .resample import Resamplers
+from .ratelimit import RateLimiter, OutboundQueue, classify, HTTP
+from .recorder import INBOUND, OUTBOUND
+from .connection import (
+    ConnectionState,
+    CONNECTING,
+    CONNECTED,
+    AUTHENTICATING,
+    READY,
+    REJECTED,
+    CLOSED
+)
+from .settings_cache import SettingsCache
+from .metrics import metrics
 from collections import defaultdict
 
 urllib3.disable_warnings()
@@ -55,6 +78,10 @@ class QuotexAPI(object):
     buy_id = None
     pending_id = None
     trace_ws = False
+    recorder = None
+    rtt_monitor = None
+    ping_interval = 24
+    ping_timeout = 20
     buy_expiration = None
     current_asset = None
     current_period = None
@@ -80,7 +107,8 @@ class QuotexAPI(object):
             lang,
             proxies=None,
             resource_path=None,
-            user_data_dir="."
+            user_data_dir=".",
+            ws_host=None
     ):
         """
         :param str host: The hostname or ip address of a Quotex server.
@@ -89,10 +117,12 @@ class QuotexAPI(object):
         :param str lang: The lang of a Quotex platform.
         :param proxies: The proxies of a Quotex server.
         :param user_data_dir: The path browser user data dir.
+        :param str ws_host: The websocket ``host[:port]``, ``ws2.<host>`` by default.
         """
         self.host = host
         self.https_url = f"https://{host}"
-        self.wss_url = f"wss://ws2.{host}/socket.io/?EIO=3&transport=websocket"
+        self.ws_host = ws_host or f"ws2.{host}"
+        self.wss_url = f"wss://{self.ws_host}/socket.io/?EIO=3&transport=websocket"
         self.wss_message = None
         self.websocket_thread = None
         self.websocket_client = None
@@ -118,6 +148,26 @@ class QuotexAPI(object):
         self.realtime_sentiment = {}
         self.top_list_leader = {}
         self.session_data = {}
+        self.frame_listeners = []
+        self.frame_lock = None
+        self.frame_decoder = FrameDecoder()
+        self.connection = ConnectionState()
+        self.send_lock = threading.Lock()
+        self.depth = DepthBooks()
+        self.sentiment = SentimentStore()
+        self.settings_cache = SettingsCache(self.profile)
+        self.ledger = Ledger()
+        self.signals = SignalStore()
+        self.streams = StreamHub()
+        self.candle_pipeline = CandlePipeline(self)
+        self.resamplers = Resamplers()
+        self.seller = OptionSeller(self)
+        self.rate_limiter = RateLimiter()
+        self.outbound = OutboundQueue(self.rate_limiter, self._send_frame)
+        self.enabled = set()
+        self.add_frame_listener(self.rate_limiter.on_frame)
+        self.add_frame_listener(self.connection.on_frame)
+        self.add_frame_listener(self.settings_cache.on_frame)
         self.browser = Browser()
         self.browser.set_headers()
         self.settings = Settings(self)
@@ -130,13 +180,125 @@ class QuotexAPI(object):
         """
         return self.websocket_client.wss
 
+    def add_frame_listener(self, listener):
+        """Register ``listener(event, payload)`` for every inbound frame.
+
+        Listeners run on the websocket thread after the client has
+        updated the API state, so they must return quickly.
+        """
+        if listener not in self.frame_listeners:
+            self.frame_listeners = self.frame_listeners + [listener]
+
+    def remove_frame_listener(self, listener):
+        if listener in self.frame_listeners:
+            self.frame_listeners = [item for item in self.frame_listeners if item != listener]
+
+    def enable(self, *components):
+        """Start feeding optional components such as ``"ledger"`` or ``"depth"`` on first use.
+
+        Only the connection state, rate limiter and settings cache listen
+        to every frame by default; the other stores register their
+        listener here, so unused features cost nothing per frame.
+        """
+        for name in components:
+            if name not in self.enabled:
+                self.enabled.add(name)
+                self.add_frame_listener(getattr(self, name).on_frame)
+
+    def dispatch_frame(self, message):
+        """Decode an inbound message and hand it to the frame listeners."""
+        frame = self.frame_decoder.decode(message)
+        if frame is None:
+            return
+        self.emit_frame(*frame)
+
+    def emit_frame(self, event, payload):
+        """Hand an already decoded frame to the frame listeners.
+
+        When ``frame_lock`` is set, as sharding does, the listeners run
+        under it so frames merged from several sockets never overlap.
+        """
+        if self.frame_lock is None:
+            self._emit_frame(event, payload)
+        else:
+            with self.frame_lock:
+                self._emit_frame(event, payload)
+
+    def _emit_frame(self, event, payload):
+        if metrics.enabled:
+            metrics.inc("frames_in_total", event or "")
+            started = metrics.now()
+        for listener in self.frame_listeners:
+            try:
+                listener(event, payload)
+            except Exception:
+                logger.exception("Frame listener failed on %s", event)
+        if metrics.enabled and self.frame_listeners:
+            metrics.observe("handler_seconds", "listeners", metrics.now() - started)
+
+    def attach_client(self):
+        """Create the websocket client and tap its handlers, without connecting it.
+
+        A replay feeds recorded messages to the tapped ``on_message`` of
+        this client, so they reach the same handlers as live traffic.
+        """
+        self.websocket_client = WebsocketClient(self)
+        self.tap_websocket()
+
+    def tap_websocket(self):
+        """Chain :meth:`dispatch_frame` and the connection state behind the client handlers."""
+        handler = self.websocket.on_message
+        on_open = self.websocket.on_open
+        on_close = self.websocket.on_close
+        on_error = self.websocket.on_error
+
+        def opened(wss):
+            if on_open:
+                on_open(wss)
+            self.connection.transition(CONNECTED)
+
+        def closed(wss, *args):
+            if on_close:
+                on_close(wss, *args)
+            self.connection.transition(CLOSED, "Websocket connection closed.")
+
+        def failed(wss, error):
+            if on_error:
+                on_error(wss, error)
+            self.connection.transition(CLOSED, str(error))
+
+        def on_message(wss, message):
+            if self.recorder is not None:
+                self.recorder.record(INBOUND, message)
+            if self.rtt_monitor is not None:
+                self.rtt_monitor.on_message(message)
+            self.wss_message = None
+            if metrics.enabled:
+                started = metrics.now()
+                handler(wss, message)
+                metrics.observe("handler_seconds", "client", metrics.now() - started)
+            else:
+                handler(wss, message)
+            if not (self.frame_listeners or metrics.enabled):
+                return
+            # The client keeps the binary payload it just decoded in wss_message.
+            if self.wss_message is not None and isinstance(message, (bytes, bytearray)):
+                self.emit_frame(*self.frame_decoder.decoded(self.wss_message))
+            else:
+                self.dispatch_frame(message)
+
+        self.websocket.on_message = on_message
+        self.websocket.on_open = opened
+        self.websocket.on_close = closed
+        self.websocket.on_error = failed
+
     def subscribe_realtime_candle(self, asset, period):
         self.realtime_price[asset] = []
         payload = {
             "asset": asset,
             "period": period
         }
-        data = f'42["instruments/update", {json.dumps(payload)}]'
+        data = f'42["instruments/update", {codec.dumps(payload)}]'
         return self.send_websocket_request(data)
 
     def chart_notification(self, asset):
@@ -144,15 +306,17 @@ class QuotexAPI(object):
             "asset": asset,
             "version": "1.0.0"
         }
-        data = f'42["chart_notification/get", {json.dumps(payload)}]'
+        data = f'42["chart_notification/get", {codec.dumps(payload)}]'
         return self.send_websocket_request(data)
 
     def follow_candle(self, asset):
-        data = f'42["depth/follow", {json.dumps(asset)}]'
+        self.enable("depth")
+        data = f'42["depth/follow", {codec.dumps(asset)}]'
         return self.send_websocket_request(data)
 
     def unfollow_candle(self, asset):
-        data = f'42["depth/unfollow", {json.dumps(asset)}]'
+        self.depth.discard(asset)
+        data = f'42["depth/unfollow", {codec.dumps(asset)}]'
         return self.send_websocket_request(data)
 
     def settings_apply(
@@ -191,28 +355,34 @@ class QuotexAPI(object):
                 "downColor": "#FF6251"
             }
         }
-        data = f'42["settings/store",{json.dumps(payload)}]'
-        self.send_websocket_request(data)
+        if not self.settings_cache.settings_changed(payload):
+            return False
+        self.settings_list = {}
+        data = f'42["settings/store",{codec.dumps(payload)}]'
+        self.send_websocket_request(data, sent=lambda: self.settings_cache.settings_sent(payload))
+        return True
 
     def unsubscribe_realtime_candle(self, asset):
-        data = f'42["subfor", {json.dumps(asset)}]'
+        data = f'42["subfor", {codec.dumps(asset)}]'
         return self.send_websocket_request(data)
 
     def edit_training_balance(self, amount):
-        data = f'42["demo/refill",{json.dumps(amount)}]'
+        data = f'42["demo/refill",{codec.dumps(amount)}]'
         self.send_websocket_request(data)
 
     def signals_subscribe(self):
+        self.enable("signals")
         data = f'42["signal/subscribe"]'
         self.send_websocket_request(data)
 
     def change_account(self, account_type):
         self.account_type = account_type
+        self.ledger.account = account_name(account_type)
         payload = {
             "demo": self.account_type,
             "tournamentId": 0
         }
-        data = f'42["account/change",{json.dumps(payload)}]'
+        data = f'42["account/change",{codec.dumps(payload)}]'
         self.send_websocket_request(data)
 
     def get_history_line(self, asset_id, index, end_from_time, offset):
@@ -222,10 +392,19 @@ class QuotexAPI(object):
             "time": end_from_time,
             "offset": offset,
         }
-        data = f'42["history/load/line",{json.dumps(payload)}]'
+        data = f'42["history/load/line",{codec.dumps(payload)}]'
         self.send_websocket_request(data)
 
     def open_pending(self, amount, asset, direction, duration, open_time):
+        data = self.pending_frame(amount, asset, direction, duration, open_time)
+        logger.debug(data)
+        # 42["pending/create",{"openType":0,"asset":"AUDCAD_otc","openTime":"2025-04-01T20:09:00.000Z","timeframe":60,"command":"call","amount":50}]
+        # 42["pending/create",{"openType":0,"asset":"EURUSD_otc","openTime":"2025-04-01T20:11:00.000Z","timeframe":60,"command":"call","amount":5}]
+        self.send_websocket_request(data)
+
+    @staticmethod
+    def pending_frame(amount, asset, direction, duration, open_time):
+        """Build the ``pending/create`` frame without sending it."""
         payload = {
             "openType": 0,
             "asset": asset,
@@ -234,11 +413,12 @@ class QuotexAPI(object):
             "command": direction,
             "amount": amount
         }
-        data = f'42["pending/create",{json.dumps(payload)}]'
-        print(data)
-        # 42["pending/create",{"openType":0,"asset":"AUDCAD_otc","openTime":"2025-04-01T20:09:00.000Z","timeframe":60,"command":"call","amount":50}]
-        # 42["pending/create",{"openType":0,"asset":"EURUSD_otc","openTime":"2025-04-01T20:11:00.000Z","timeframe":60,"command":"call","amount":5}]
-        self.send_websocket_request(data)
+        return f'42["pending/create",{codec.dumps(payload)}]'
+
+    @staticmethod
+    def sell_frame(ticket):
+        """Build the ``orders/cancel`` frame that closes one option early."""
+        return f'42["orders/cancel",{codec.dumps({"ticket": ticket})}]'
 
     def instruments_follow(
             self,
@@ -260,7 +440,7 @@ class QuotexAPI(object):
             "timeframe": duration,
             "uid": self.profile.profile_id
         }
-        data = f'42["instruments/follow",{json.dumps(payload)}]'
+        data = f'42["instruments/follow",{codec.dumps(payload)}]'
         self.send_websocket_request(data)
 
     def indicators(self):
@@ -382,57 +562,75 @@ class QuotexAPI(object):
         self.browser.headers["Sec-Fetch-Dest"] = "document"
         self.browser.headers["Sec-Fetch-Mode"] = "navigate"
         self.browser.headers["Dnt"] = "1"
+        self.rate_limiter.acquire(HTTP)
         response = self.browser.send_request(
             method=method,
             url=url,
             data=data,
             params=params
         )
+        if response.status_code == 429:
+            self.rate_limiter.throttled("http 429")
         try:
             response.raise_for_status()
         except requests.exceptions.HTTPError:
             return None
         return response
 
-    async def get_profile(self):
-        user_settings = self.settings.get_settings()
-        self.profile.nick_name = user_settings.get("data")["nickname"]
-        self.profile.profile_id = user_settings.get("data")["id"]
-        self.profile.demo_balance = user_settings.get("data")["demoBalance"]
-        self.profile.live_balance = user_settings.get("data")["liveBalance"]
-        self.profile.avatar = user_settings.get("data")["avatar"]
-        self.profile.currency_code = user_settings.get("data")["currencyCode"]
-        self.profile.country = user_settings.get("data")["country"]
-        self.profile.country_name = user_settings.get("data")["countryName"]
-        self.profile.currency_symbol = user_settings.get("data")["currencySymbol"]
-        self.profile.offset = user_settings.get("data").get("timeOffset")
+    async def get_profile(self, refresh=False):
+        """Return the profile, fetching it over HTTP only when the cache is stale."""
+        if refresh or not self.settings_cache.is_fresh():
+            await self.refresh_settings()
         return self.profile
 
+    async def refresh_settings(self):
+        """Fetch the user settings off the event loop and refresh the cache."""
+        user_settings = await asyncio.to_thread(self.settings.get_settings)
+        data = (user_settings or {}).get("data") or {}
+        self.settings_cache.apply(data)
+        if not self.settings_list:
+            self.settings_list = data
+        return data
+
     async def get_trader_history(self, account_type, page_number):
+        await self.rate_limiter.wait(HTTP)
         history = await self.get_history(account_type, page_number)
         return history.get("data", {})
 
     def change_time_offset(self, time_offset):
         user_settings = self.settings.set_time_offset(time_offset)
-        self.profile.offset = user_settings.get("data").get("timeOffset")
+        self.settings_cache.apply(user_settings.get("data"))
         return self.profile
 
-    def send_websocket_request(self, data, no_force_send=True):
+    def send_websocket_request(self, data, no_force_send=True, sent=None):
         """Send websocket request to Quotex server.
+
+        Frames over their traffic class rate are queued and sent by the
+        outbound thread, this never blocks the caller.
+
         :param str data: The websocket request data.
         :param bool no_force_send: Default None.
+        :param sent: Called without arguments once the frame was written.
         """
-        while (global_value.ssl_Mutual_exclusion
-               or global_value.ssl_Mutual_exclusion_write) and no_force_send:
-            pass
-        global_value.ssl_Mutual_exclusion_write = True
-        self.websocket.send(data)
-        logger.debug(data)
-        global_value.ssl_Mutual_exclusion_write = False
+        self.outbound.submit(classify(data), data, no_force_send, sent)
+
+    def _send_frame(self, data, no_force_send=True):
+        # The lock belongs to this socket, so a shard never waits on another one.
+        if no_force_send:
+            with self.send_lock:
+                self.websocket.send(data)
+        else:
+            self.websocket.send(data)
+        if self.recorder is not None:
+            self.recorder.record(OUTBOUND, data)
+        logger.debug("Sent %s", data)
+        if metrics.enabled:
+            metrics.inc("frames_out_total", outgoing_event(data) or "")
 
     async def authenticate(self):
         print("Connecting User Account ...")
         logger.debug("Login Account User...")
+        await self.rate_limiter.wait(HTTP)
         status, message = await self.login(
             self.username,
             self.password,
@@ -444,19 +642,17 @@ class QuotexAPI(object):
         global_value.SSID = self.session_data.get("token")
         self.is_logged = True
 
-    async def start_websocket(self):
-        global_value.check_websocket_if_connect = None
-        global_value.check_websocket_if_error = False
-        global_value.websocket_error_reason = None
+    async def start_websocket(self, timeout=15):
         if not global_value.SSID:
             await self.authenticate()
-        self.websocket_client = WebsocketClient(self)
+        self.connection.transition(CONNECTING)
+        self.attach_client()
         payload = {
-            "ping_interval": 24,
-            "ping_timeout": 20,
+            "ping_interval": self.ping_interval,
+            "ping_timeout": self.ping_timeout,
             "ping_payload": "2",
             "origin": self.https_url,
-            "host": f"ws2.{self.host}",
+            "host": self.ws_host,
             "sslopt": {
                 "check_hostname": False,
                 "cert_reqs": ssl.CERT_NONE,
@@ -473,41 +669,39 @@ class QuotexAPI(object):
         )
         self.websocket_thread.daemon = True
         self.websocket_thread.start()
-        while True:
-            if global_value.check_websocket_if_error:
-                return False, global_value.websocket_error_reason
-            elif global_value.check_websocket_if_connect == 0:
-                logger.debug("Websocket connection closed.")
-                return False, "Websocket connection closed."
-            elif global_value.check_websocket_if_connect == 1:
-                logger.debug("Websocket connected successfully!!!")
-                return True, "Websocket connected successfully!!!"
-            elif global_value.check_rejected_connection == 1:
-                global_value.SSID = None
-                logger.debug("Websocket Token Rejected.")
-                return True, "Websocket Token Rejected."
+        state = await self.connection.wait((CONNECTED, REJECTED, CLOSED), timeout)
+        if state == REJECTED:
+            global_value.SSID = None
+            self.rate_limiter.throttled("token rejected")
+            logger.debug("Websocket Token Rejected.")
+            return True, "Websocket Token Rejected."
+        if state == CONNECTED:
+            logger.debug("Websocket connected successfully!!!")
+            return True, "Websocket connected successfully!!!"
+        logger.debug("Websocket connection closed.")
+        return False, self.connection.reason or "Websocket connection closed."
 
     def send_ssid(self, timeout=10):
-        self.wss_message = None
+        """Send the SSID and block until the server accepts or rejects it."""
         if not global_value.SSID:
             return False
-
+        self.connection.transition(AUTHENTICATING)
         self.ssid(global_value.SSID)
-        start_time = time.time()
-
-        while self.wss_message is None:
-            if time.time() - start_time > timeout:
-                return False
-            time.sleep(0.5)
+        return self.connection.wait_sync((READY, REJECTED, CLOSED), timeout) == READY
 
-        return True
+    async def authorize(self, timeout=10):
+        """Send the SSID and wait on the event loop for ``s_authorization``."""
+        if not global_value.SSID:
+            return False
+        self.connection.transition(AUTHENTICATING)
+        self.ssid(global_value.SSID)
+        return await self.connection.wait((READY, REJECTED, CLOSED), timeout) == READY
 
     async def connect(self, is_demo):
         """Method for connection to Quotex API."""
         self.account_type = is_demo
-        global_value.ssl_Mutual_exclusion = False
-        global_value.ssl_Mutual_exclusion_write = False
-        if global_value.check_websocket_if_connect:
+        self.ledger.account = account_name(is_demo)
+        if self.connection.state in (CONNECTED, AUTHENTICATING, READY):
             logger.info("Closing websocket connection...")
             self.close()
 
@@ -515,23 +709,27 @@ class QuotexAPI(object):
 
         if not check_websocket:
             return check_websocket, websocket_reason
-        check_ssid = self.send_ssid()
+        check_ssid = await self.authorize()
 
         if not check_ssid:
             await self.authenticate()
             if self.is_logged:
-                self.send_ssid()
+                await self.authorize()
 
         return check_websocket, websocket_reason
 
     async def reconnect(self):
         """Method for connection to Quotex API."""
         logger.info("Websocket Reconnection...")
+        if metrics.enabled:
+            metrics.inc("reconnects_total")
         await self.start_websocket()
 
     def close(self):
+        self.outbound.close()
         if self.websocket_client:
             self.websocket.close()
+        if self.websocket_thread is not None:
             self.websocket_thread.join()
         return True
 
@@ -0,0 +1,396 @@
+"""Micro benchmarks for the client hot paths.
+
+Run with ``python -m quotexapi.benchmarks <name> [options]``.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import socket
+import argparse
+import threading
+import tracemalloc
+from . import codec
+from .records import Candle
+from .depth import DepthBook
+from .pipeline import CandlePipeline
+from .ratelimit import RateLimiter
+from .frames import FrameDecoder
+from .ledger import Ledger
+from .depth import DepthBooks
+from .shards import HashRing, ShardedSubscriptions, SHARED_STATE
+from .connection import ConnectionState, READY
+from .endpoints import Endpoint, EndpointPool
+from .logs import start_background_logging, stop_background_logging
+
+SAMPLE_FRAMES = [
+    b'\x04[["EURUSD_otc",1712345678.123,1.08451,1]]',
+    b'\x04[["EURUSD_otc",1712345678.456,1.08455,0],["GBPUSD",1712345678.457,1.26312,1]]',
+    b'\x04{"asset":"EURUSD_otc","period":60,"index":171234567812,"data":[[1712345600,1.0841,1.0845,1.0846,1.0839,54]]}',
+    b'\x04{"deals":[{"id":"a1b2c3","profit":8.5,"openPrice":1.0845,"closePrice":1.0851,"asset":"EURUSD_otc"}],"profit":8.5}',
+    b'\x04{"liveBalance":1000.0,"demoBalance":9876.54,"currencyCode":"USD"}',
+]
+
+
+def _timeit(function, items, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            function(item)
+    return time.perf_counter() - started
+
+
+def bench_codec(args):
+    """Compare JSON backends on recorded (or sample) inbound frames."""
+    frames = SAMPLE_FRAMES
+    if args.frames:
+        with open(args.frames, "rb") as file:
+            frames = [line.rstrip(b"\n") for line in file if line.strip()]
+    bodies = [frame[1:] for frame in frames]
+    current = codec.backend
+    payloads = [codec.loads(body) for body in bodies]
+    total = len(bodies) * args.repeat
+    print(f"{len(bodies)} frames x {args.repeat} repeats")
+    try:
+        for name in codec.available():
+            codec.use(name)
+            decode = _timeit(codec.loads, bodies, args.repeat)
+            encode = _timeit(codec.dumps, payloads, args.repeat)
+            print(f"{name:>8}: loads {total / decode:>12,.0f}/s  dumps {total / encode:>12,.0f}/s")
+    finally:
+        codec.use(current)
+
+
+def _allocated(build, count):
+    tracemalloc.start()
+    items = [build(index) for index in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return size / count
+
+
+def bench_records(args):
+    """Bytes per cached candle as a dict and as a :class:`Candle`."""
+    count = args.repeat
+
+    def as_dict(index):
+        return {"time": 1712345600 + index * 60, "open": 1.0841 + index, "close": 1.0845 + index,
+                "high": 1.0846 + index, "low": 1.0839 + index, "ticks": index}
+
+    def as_record(index):
+        return Candle(1712345600 + index * 60, 1.0841 + index, 1.0845 + index,
+                      1.0846 + index, 1.0839 + index, index)
+
+    before = _allocated(as_dict, count)
+    after = _allocated(as_record, count)
+    print(f"{count} candles")
+    print(f"    dict: {before:>7.1f} bytes/candle")
+    print(f"  Candle: {after:>7.1f} bytes/candle ({after / before:.0%})")
+
+
+def bench_depth(args):
+    """Incremental depth updates applied per second."""
+    rng = random.Random(7)
+    book = DepthBook("EURUSD")
+    book.apply(
+        [(round(1.08 - i * 0.00001, 5), 100) for i in range(200)],
+        [(round(1.08 + (i + 1) * 0.00001, 5), 100) for i in range(200)],
+        snapshot=True
+    )
+    updates = []
+    for _ in range(10000):
+        offset = rng.randint(1, 250) * 0.00001
+        size = rng.choice((0, 50, 100, 150))
+        if rng.random() < 0.5:
+            updates.append(([(round(1.08 - offset, 5), size)], ()))
+        else:
+            updates.append(((), [(round(1.08 + offset, 5), size)]))
+    started = time.perf_counter()
+    for _ in range(max(1, args.repeat // len(updates))):
+        for bids, asks in updates:
+            book.apply(bids, asks)
+            book.best_bid, book.best_ask
+    elapsed = time.perf_counter() - started
+    print(f"{book.updates:,} updates in {elapsed:.3f}s: {book.updates / elapsed:,.0f} updates/s")
+    print(f"levels: {len(book.bids)} bids / {len(book.asks)} asks, spread {book.spread}")
+
+
+class _HistoryServer(object):
+    """Stand-in for the candles channel answering after ``latency`` seconds."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.pipeline = CandlePipeline(self)
+        self.rate_limiter = RateLimiter()
+        self.rate_limiter.enabled = False
+
+    def get_candles(self, asset, index, end_from_time, offset, period):
+        payload = {"asset": asset, "index": index, "period": period, "data": []}
+        threading.Timer(self.latency, self.pipeline.on_frame, ("history/load", payload)).start()
+
+
+def bench_warmup(args):
+    """Total warm-up time of 60 assets x 4 periods, sequential vs pipelined."""
+    requests = [(f"ASSET{i}", period, 3600) for i in range(60) for period in (60, 300, 900, 3600)]
+
+    async def warmup(window):
+        server = _HistoryServer(args.latency / 1000)
+        started = time.perf_counter()
+        count = 0
+        async for _ in server.pipeline.fetch(requests, window):
+            count += 1
+        return count, time.perf_counter() - started
+
+    for window in (1, 4, 8, 16, 32):
+        count, elapsed = asyncio.run(warmup(window))
+        print(f"window {window:>2}: {count} requests in {elapsed:.2f}s")
+
+
+def bench_logging(args):
+    """Inbound frames per second through the decoder with the per-frame log calls
+    websocket-client and the client make, under several logging setups."""
+    frames = SAMPLE_FRAMES * max(1, args.repeat // len(SAMPLE_FRAMES))
+    ws_logger = logging.getLogger("websocket")
+    client_logger = logging.getLogger(f"{__package__}.api")
+    null = logging.NullHandler()
+    sink = open(os.devnull, "w")
+
+    def run():
+        decoder = FrameDecoder()
+        started = time.perf_counter()
+        for frame in frames:
+            ws_logger.debug("++Rcv raw: %r", frame)
+            decoder.decode(frame)
+            client_logger.debug("Sent %s", frame)
+        return len(frames) / (time.perf_counter() - started)
+
+    ws_logger.addHandler(null)
+    ws_logger.setLevel(logging.DEBUG)
+    print(f"{'forced DEBUG, NullHandler':<34} {run():>12,.0f} frames/s")
+    ws_logger.setLevel(logging.NOTSET)
+    ws_logger.removeHandler(null)
+    print(f"{'logging off':<34} {run():>12,.0f} frames/s")
+
+    stream = logging.StreamHandler(sink)
+    stream.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+    for logger in (ws_logger, client_logger):
+        logger.addHandler(stream)
+        logger.setLevel(logging.DEBUG)
+    print(f"{'DEBUG, synchronous handler':<34} {run():>12,.0f} frames/s")
+    for logger in (ws_logger, client_logger):
+        logger.removeHandler(stream)
+        logger.setLevel(logging.NOTSET)
+
+    start_background_logging(logging.DEBUG, [stream], ("websocket", f"{__package__}.api"))
+    rate = run()
+    stop_background_logging()
+    print(f"{'DEBUG, background queue handler':<34} {rate:>12,.0f} frames/s")
+    sink.close()
+
+
+def _standin_server(frames, go):
+    """Local stand-in pushing ``frames`` newline separated tick frames per connection
+    as fast as the socket takes them, once ``go`` is set."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+
+    def serve(connection):
+        batch = 100
+        go.wait()
+        for sent in range(0, frames, batch):
+            connection.sendall(b"".join(
+                b'[["ASSET%d",%d.5,1.%05d,1]]\n' % (sent % 97, sent, sent % 99999) for _ in range(batch)
+            ))
+        connection.close()
+
+    def accept():
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=serve, args=(connection,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return server
+
+
+class _StandinAPI(object):
+    """The part of ``QuotexAPI`` that :class:`ShardedSubscriptions` drives, with a
+    reader thread decoding frames from a local stand-in socket."""
+
+    def __init__(self, address):
+        self.address = address
+        self.connection = ConnectionState()
+        self.rate_limiter = RateLimiter()
+        self.frame_decoder = FrameDecoder()
+        self.frame_listeners = []
+        self.frame_lock = None
+        self.reader = None
+        for name in SHARED_STATE:
+            setattr(self, name, {})
+
+    def emit_frame(self, event, payload):
+        if self.frame_lock is None:
+            for listener in self.frame_listeners:
+                listener(event, payload)
+            return
+        with self.frame_lock:
+            for listener in self.frame_listeners:
+                listener(event, payload)
+
+    async def connect(self, is_demo):
+        connection = socket.create_connection(self.address)
+        self.reader = threading.Thread(target=self._read, args=(connection,), daemon=True)
+        self.reader.start()
+        self.connection.transition(READY)
+        return True, "connected"
+
+    def _read(self, connection):
+        buffer = b""
+        while True:
+            chunk = connection.recv(65536)
+            if not chunk:
+                break
+            lines = (buffer + chunk).split(b"\n")
+            buffer = lines.pop()
+            for line in lines:
+                frame = self.frame_decoder.decode(b"\x04" + line)
+                if frame is not None:
+                    self.emit_frame(*frame)
+        connection.close()
+
+    def close(self):
+        self.reader.join()
+
+
+class _StandinClient(object):
+    account_is_demo = True
+
+    def __init__(self, address):
+        self.address = address
+        self.api = self._new_api()
+
+    def _new_api(self):
+        return _StandinAPI(self.address)
+
+
+async def _shards(args):
+    for count in (1, 2, 4, 8):
+        go = threading.Event()
+        server = _standin_server(args.repeat // count, go)
+        client = _StandinClient(server.getsockname())
+        ledger, books = Ledger(), DepthBooks()
+        client.api.frame_listeners = [ledger.on_frame, books.on_frame]
+        await client.api.connect(client.account_is_demo)
+        shards = await ShardedSubscriptions(client, count).start()
+        started = time.perf_counter()
+        go.set()
+        for shard in shards.shards:
+            await asyncio.to_thread(shard.api.reader.join)
+        elapsed = time.perf_counter() - started
+        merged = [stat["frames"] for stat in shards.stats()[1:]]
+        await shards.stop()
+        server.close()
+        total = args.repeat // count * count
+        print(f"{count} socket(s): {total:,} frames in {elapsed:.2f}s, {total / elapsed:,.0f} frames/s, "
+              f"merged from extra shards {merged}")
+
+
+def bench_shards(args):
+    """Merged pipeline throughput of :class:`ShardedSubscriptions` over 1, 2, 4 and 8
+    unpaced local sockets, shard 0 being the primary connection.
+
+    Every frame is decoded and merged in one interpreter, so extra sockets
+    only pay off when the upstream paces each socket below this rate.
+    """
+    ring = HashRing(range(8))
+    print("assets per shard (8 shards):",
+          sorted(sum(ring.node_for(f"ASSET{i}") == n for i in range(80)) for n in range(8)))
+    asyncio.run(_shards(args))
+
+
+async def _greeting_probe(endpoint):
+    """Connect and wait for the first byte, so the stand-in's injected delay counts."""
+    started = time.monotonic()
+    reader, writer = await asyncio.open_connection(endpoint.ws_host, endpoint.port)
+    try:
+        if not await reader.read(1):
+            raise ConnectionResetError("closed without greeting")
+    finally:
+        writer.close()
+    return time.monotonic() - started
+
+
+async def _endpoints(args):
+    delays = (0.08, args.latency / 1000, 0.12, 0.03)
+
+    def standin(delay):
+        async def greet(reader, writer):
+            await asyncio.sleep(delay)
+            writer.write(b"0")
+            writer.close()
+        return greet
+
+    servers = [await asyncio.start_server(standin(delay), "127.0.0.1", 0) for delay in delays]
+    endpoints = [
+        Endpoint(f"standin{index}", ws_host="127.0.0.1", port=server.sockets[0].getsockname()[1])
+        for index, server in enumerate(servers)
+    ]
+    pool = EndpointPool(endpoints, probe_timeout=1.0, probe=_greeting_probe)
+    started = time.perf_counter()
+    rtts = await pool.probe(samples=3)
+    print(f"probed {len(endpoints)} endpoints in {time.perf_counter() - started:.3f}s:",
+          {host: round(rtt * 1000, 1) for host, rtt in rtts.items()})
+    chosen = pool.choose()
+    print(f"fastest: {chosen.host}")
+
+    servers[endpoints.index(chosen)].close()
+    started = time.perf_counter()
+    for attempt in range(1, 10):
+        endpoint = pool.choose()
+        try:
+            await asyncio.wait_for(_greeting_probe(endpoint), pool.probe_timeout)
+        except (OSError, asyncio.TimeoutError) as error:
+            pool.record_failure(endpoint, str(error) or type(error).__name__)
+            continue
+        pool.record_success(endpoint)
+        print(f"{chosen.host} down: connected to {endpoint.host} on attempt {attempt} "
+              f"after {time.perf_counter() - started:.3f}s")
+        break
+    for server in servers:
+        server.close()
+
+
+def bench_endpoints(args):
+    """Probe local stand-in servers with injected latency, then fail over from the fastest."""
+    asyncio.run(_endpoints(args))
+
+
+BENCHMARKS = {
+    "depth": bench_depth,
+    "codec": bench_codec,
+    "records": bench_records,
+    "warmup": bench_warmup,
+    "logging": bench_logging,
+    "shards": bench_shards,
+    "endpoints": bench_endpoints,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m quotexapi.benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--frames", help="File with one recorded binary frame per line.")
+    parser.add_argument("--latency", type=float, default=50, help="Simulated round trip in ms.")
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.name](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Time ordered candle series stored in typed arrays.
+
+Candles live in one ``array`` per field, sorted by time. Appending a
+newer candle is O(1), a candle with an existing time is merged into the
+stored one in place, and range or "last N" queries return views over
+the arrays found by binary search instead of copies.
+"""
+import bisect
+from array import array
+from .records import Candle
+
+FIELDS = ("time", "open", "close", "high", "low", "ticks")
+TYPECODES = {"time": "q", "open": "d", "close": "d", "high": "d", "low": "d", "ticks": "q"}
+
+
+class CandleView(object):
+    """Read-only window ``[start, stop)`` over a :class:`CandleSeries`."""
+
+    def __init__(self, series, start, stop):
+        self.series = series
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return CandleView(self.series, self.start + start, self.start + stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.series.candle(self.start + index)
+
+    def __iter__(self):
+        for index in range(self.start, self.stop):
+            yield self.series.candle(index)
+
+    def column(self, name):
+        """One field over the window as a typed array.
+
+        Unlike the view this copies, a live ``memoryview`` would stop the
+        series from growing while it is held.
+        """
+        return self.series.columns[name][self.start:self.stop]
+
+    def to_candles(self):
+        return list(self)
+
+
+class CandleSeries(object):
+    """Candles of one asset/period sorted by time.
+
+    :param int maxlen: Oldest candles are dropped (in blocks) past this size.
+    """
+
+    def __init__(self, candles=(), maxlen=None):
+        self.columns = {name: array(TYPECODES[name]) for name in FIELDS}
+        self.maxlen = maxlen
+        self.extend(candles)
+
+    def __len__(self):
+        return len(self.columns["time"])
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def candle(self, index):
+        columns = self.columns
+        return Candle(*(columns[name][index] for name in FIELDS))
+
+    @property
+    def last_time(self):
+        times = self.columns["time"]
+        return times[-1] if times else None
+
+    def add(self, time, open, close, high, low, ticks=0):
+        """Insert a candle, merging it into a stored candle with the same time."""
+        times = self.columns["time"]
+        time = int(time)
+        if not times or time > times[-1]:
+            for name, value in zip(FIELDS, (time, open, close, high, low, ticks or 0)):
+                self.columns[name].append(value)
+            if self.maxlen and len(times) > self.maxlen * 1.25:
+                self.trim()
+            return
+        index = len(times) - 1 if time == times[-1] else bisect.bisect_left(times, time)
+        if index < len(times) and times[index] == time:
+            self.merge(index, close, high, low, ticks)
+        else:
+            for name, value in zip(FIELDS, (time, open, close, high, low, ticks or 0)):
+                self.columns[name].insert(index, value)
+
+    def merge(self, index, close, high, low, ticks=0):
+        """Fold a newer snapshot of the candle at ``index`` into it."""
+        columns = self.columns
+        columns["close"][index] = close
+        if high > columns["high"][index]:
+            columns["high"][index] = high
+        if low < columns["low"][index]:
+            columns["low"][index] = low
+        if ticks and ticks > columns["ticks"][index]:
+            columns["ticks"][index] = ticks
+
+    def update(self, time, price, period):
+        """Fold a live tick into the current candle, opening a new one at period boundaries."""
+        start = int(time // period * period)
+        times = self.columns["time"]
+        if times and times[-1] == start:
+            index = len(times) - 1
+            self.merge(index, price, price, price)
+            self.columns["ticks"][index] += 1
+        else:
+            self.add(start, price, price, price, price, 1)
+
+    def extend(self, candles):
+        for candle in candles:
+            if isinstance(candle, dict):
+                candle = Candle.from_dict(candle)
+            self.add(candle.time, candle.open, candle.close, candle.high, candle.low, candle.ticks)
+
+    def trim(self):
+        excess = len(self) - self.maxlen
+        if excess > 0:
+            for column in self.columns.values():
+                del column[:excess]
+
+    def view(self):
+        return CandleView(self, 0, len(self))
+
+    def range(self, start=None, end=None):
+        """Candles with ``start <= time <= end`` as a view, found by binary search."""
+        times = self.columns["time"]
+        low = 0 if start is None else bisect.bisect_left(times, start)
+        high = len(times) if end is None else bisect.bisect_right(times, end)
+        return CandleView(self, low, high)
+
+    def last(self, count):
+        return CandleView(self, max(0, len(self) - count), len(self))
+
+    def column(self, name):
+        return self.columns[name][:]
+
+    def to_candles(self):
+        return self.view().to_candles()
@@ -0,0 +1,89 @@
+"""JSON codec used for frames, session and trade log persistence.
+
+The fastest installed backend is picked at import time (orjson, msgspec,
+ujson, then the standard library). Set ``QUOTEX_JSON`` to force one of
+them, or call :func:`use` at runtime. Pretty output is only written to
+files, so every backend leaves it to the standard library and produces
+the same text.
+"""
+import os
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional backend
+    orjson = None
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional backend
+    msgspec = None
+try:
+    import ujson
+except ImportError:  # pragma: no cover - optional backend
+    ujson = None
+
+PREFERENCE = ("orjson", "msgspec", "ujson", "json")
+DecodeError = (ValueError, msgspec.DecodeError) if msgspec is not None else (ValueError,)
+
+
+def _dumps_pretty(obj):
+    return json.dumps(obj, indent=4, ensure_ascii=False)
+
+
+def _orjson_backend():
+    def dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    return dumps, orjson.loads, _dumps_pretty
+
+
+def _msgspec_backend():
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj):
+        return encoder.encode(obj).decode()
+
+    return dumps, decoder.decode, _dumps_pretty
+
+
+def _ujson_backend():
+    def dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=False)
+
+    return dumps, ujson.loads, _dumps_pretty
+
+
+def _json_backend():
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    return encoder.encode, json.loads, _dumps_pretty
+
+
+BACKENDS = {
+    "orjson": (orjson, _orjson_backend),
+    "msgspec": (msgspec, _msgspec_backend),
+    "ujson": (ujson, _ujson_backend),
+    "json": (json, _json_backend),
+}
+
+
+def available():
+    """Return the names of the installed backends, fastest first."""
+    return [name for name in PREFERENCE if BACKENDS[name][0] is not None]
+
+
+def use(name=None):
+    """Switch the module level ``dumps``/``loads`` to another backend."""
+    global backend, dumps, loads, dumps_pretty
+    name = name or os.environ.get("QUOTEX_JSON") or available()[0]
+    module, factory = BACKENDS[name]
+    if module is None:
+        raise ImportError(f"JSON backend '{name}' is not installed")
+    backend = name
+    dumps, loads, dumps_pretty = factory()
+    return name
+
+
+backend = None
+dumps = loads = dumps_pretty = None
+use()
@@ -0,0 +1,145 @@
+"""Columnar on-disk format for candle history.
+
+A file holds the candles of one asset/period as fixed-width columns
+laid out one after another behind a 64 byte header::
+
+    header | time[int64] | open[f8] | high[f8] | low[f8] | close[f8] | ticks[int64]
+
+Readers map the file with :mod:`mmap` and expose every column as a
+NumPy view (or a ``memoryview`` when NumPy is not installed), so opening
+months of history costs no parsing and the pages are shared between all
+processes reading the same file.
+"""
+import os
+import mmap
+import struct
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+MAGIC = b"QXCF"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqq32s8x")
+COLUMNS = ("time", "open", "high", "low", "close", "ticks")
+FORMATS = {
+    "time": "q",
+    "open": "d",
+    "high": "d",
+    "low": "d",
+    "close": "d",
+    "ticks": "q",
+}
+ITEM_SIZE = 8
+
+
+def write_candles(path, asset, period, candles):
+    """Write candles of one asset/period to ``path``.
+
+    :param path: Destination file, replaced atomically.
+    :param str asset: The asset name (at most 32 bytes utf-8).
+    :param int period: The candle period in seconds.
+    :param candles: Iterable of candle mappings with ``time``, ``open``,
+        ``high``, ``low``, ``close`` and optionally ``ticks`` keys.
+    :returns: The number of candles written.
+    """
+    rows = sorted(candles, key=lambda candle: candle["time"])
+    name = asset.encode("utf-8")
+    if len(name) > 32:
+        raise ValueError(f"Asset name too long for candle file: {asset}")
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True, parents=True)
+    temp_path = path.with_name(f"{path.name}.tmp")
+    count = len(rows)
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, int(period), count, name))
+        for column in COLUMNS:
+            fmt = FORMATS[column]
+            cast = int if fmt == "q" else float
+            values = [cast(row.get(column, 0) or 0) for row in rows]
+            file.write(struct.pack(f"<{count}{fmt}", *values))
+    os.replace(temp_path, path)
+    return count
+
+
+class CandleFile(object):
+    """Read-only memory mapped view of a candle file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, period, count, name = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Not a candle file: {self.path}")
+        self.asset = name.rstrip(b"\x00").decode("utf-8")
+        self.period = period
+        self.count = count
+        self._columns = {}
+        self._memoryview = None
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def column(self, name):
+        """Return a zero-copy view over one column."""
+        view = self._columns.get(name)
+        if view is None:
+            offset = HEADER.size + COLUMNS.index(name) * self.count * ITEM_SIZE
+            fmt = FORMATS[name]
+            if np is not None:
+                dtype = np.dtype(f"<{'i8' if fmt == 'q' else 'f8'}")
+                view = np.frombuffer(self._mmap, dtype=dtype, count=self.count, offset=offset)
+            else:
+                end = offset + self.count * ITEM_SIZE
+                view = self._buffer()[offset:end].cast(fmt)
+            self._columns[name] = view
+        return view
+
+    def _buffer(self):
+        if self._memoryview is None:
+            self._memoryview = memoryview(self._mmap)
+        return self._memoryview
+
+    def to_candles(self):
+        """Materialize the file as the list of dicts used by ``get_candles``."""
+        columns = [self.column(name) for name in COLUMNS]
+        return [dict(zip(COLUMNS, (c[i].item() if np is not None else c[i] for c in columns)))
+                for i in range(self.count)]
+
+    def close(self):
+        for view in self._columns.values():
+            if isinstance(view, memoryview):
+                view.release()
+        self._columns.clear()
+        if self._memoryview is not None:
+            self._memoryview.release()
+            self._memoryview = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # NumPy views handed out to callers still reference the map;
+            # it is released once the last of them is collected.
+            pass
+
+
+def open_candles(path):
+    """Open a candle file written by :func:`write_candles`."""
+    return CandleFile(path)
+
+
+def candles_path(base_dir, asset, period):
+    """Return the conventional file name for an asset/period pair."""
+    return Path(base_dir) / f"{asset}_{int(period)}.qxc"
@@ -1,8 +1,8 @@
 import os
 import sys
-import json
 import configparser
 from pathlib import Path
+from . import codec
 
 USER_AGENT = "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/119.0"
 
@@ -49,8 +49,8 @@ def load_session(user_agent):
         )
     )
     if os.path.isfile(output_file):
-        with open(output_file) as file:
-            session_data = json.loads(
+        with open(output_file, "rb") as file:
+            session_data = codec.loads(
                 file.read()
             )
     else:
@@ -58,17 +58,13 @@ def load_session(user_agent):
             exist_ok=True,
             parents=True
         )
-        session_dict = {
+        session_data = {
             "cookies": None,
             "token": None,
             "user_agent": user_agent
         }
-        session_result = json.dumps(session_dict, indent=4)
         output_file.write_text(
-            session_result
-        )
-        session_data = json.loads(
-            session_result
+            codec.dumps_pretty(session_data)
         )
     return session_data
 
@@ -79,12 +75,8 @@ def update_session(session_data):
             "session.json"
         )
     )
-    session_result = json.dumps(session_data, indent=4)
     output_file.write_text(
-        session_result
-    )
-    session_data = json.loads(
-        session_result
+        codec.dumps_pretty(session_data)
     )
-    return session_data
+    return dict(session_data)
 
@@ -0,0 +1,98 @@
+"""Event driven connection state machine.
+
+States move ``connecting -> connected -> authenticating -> ready`` as the
+socket opens, the SSID is sent and the server answers ``s_authorization``.
+Callers wait for a state instead of sleeping and polling, so readiness is
+signalled one network round trip after the SSID goes out.
+"""
+import time
+import asyncio
+import logging
+import threading
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DISCONNECTED = "disconnected"
+CONNECTING = "connecting"
+CONNECTED = "connected"
+AUTHENTICATING = "authenticating"
+READY = "ready"
+REJECTED = "rejected"
+CLOSED = "closed"
+
+ACCEPTED_EVENTS = ("s_authorization",)
+REJECTED_EVENTS = ("authorization/reject",)
+
+
+class ConnectionState(object):
+    """Current connection state with blocking and async waits."""
+
+    def __init__(self):
+        self.state = DISCONNECTED
+        self.reason = None
+        self.changed_at = {}
+        self._condition = threading.Condition()
+        self._waiters = []
+
+    def transition(self, state, reason=None):
+        with self._condition:
+            if state == self.state:
+                return
+            logger.debug("Connection %s -> %s", self.state, state)
+            self.state = state
+            self.reason = reason
+            self.changed_at[state] = time.monotonic()
+            if state == CONNECTING:
+                self.changed_at = {CONNECTING: self.changed_at[state]}
+            self._condition.notify_all()
+            waiters, self._waiters = self._waiters, []
+        for loop, states, future in waiters:
+            if state in states:
+                loop.call_soon_threadsafe(_resolve, future, state)
+            else:
+                self._waiters.append((loop, states, future))
+        if state == READY and metrics.enabled:
+            for stage, seconds in self.timings().items():
+                metrics.observe("connect_seconds", stage, seconds)
+
+    def wait_sync(self, states, timeout=None):
+        """Block the calling thread until one of ``states``, returns the state reached."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.state in states, timeout)
+            return self.state
+
+    async def wait(self, states, timeout=None):
+        """Wait on the event loop until one of ``states``, returns the state reached."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._condition:
+            if self.state in states:
+                return self.state
+            self._waiters.append((loop, states, future))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return self.state
+
+    def timings(self):
+        """Seconds from ``connecting`` to each later state of the current attempt."""
+        started = self.changed_at.get(CONNECTING)
+        if started is None:
+            return {}
+        return {state: at - started for state, at in self.changed_at.items() if state != CONNECTING}
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def on_frame(self, event, payload):
+        if event in ACCEPTED_EVENTS:
+            self.transition(READY)
+        elif event in REJECTED_EVENTS:
+            self.transition(REJECTED, "Websocket Token Rejected.")
+
+
+def _resolve(future, state):
+    if not future.done():
+        future.set_result(state)
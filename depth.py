@@ -0,0 +1,138 @@
+"""Per asset order book built from ``depth/follow`` streams."""
+import bisect
+import threading
+
+
+class BookSide(object):
+    """Price levels of one side kept as a sorted price list and a size map.
+
+    Prices are stored ascending for both sides, so the best bid is the
+    last element and the best ask the first one.
+    """
+    __slots__ = ("prices", "sizes")
+
+    def __init__(self):
+        self.prices = []
+        self.sizes = {}
+
+    def __len__(self):
+        return len(self.prices)
+
+    def set(self, price, size):
+        if size:
+            if price not in self.sizes:
+                bisect.insort(self.prices, price)
+            self.sizes[price] = size
+        elif self.sizes.pop(price, None) is not None:
+            del self.prices[bisect.bisect_left(self.prices, price)]
+
+    def clear(self):
+        self.prices.clear()
+        self.sizes.clear()
+
+    def level(self, price):
+        """Return ``(index, size)`` of the level at or next to ``price``."""
+        index = bisect.bisect_left(self.prices, price)
+        return index, self.sizes.get(price, 0)
+
+
+class DepthBook(object):
+    """Order book for one asset."""
+
+    def __init__(self, asset):
+        self.asset = asset
+        self.bids = BookSide()
+        self.asks = BookSide()
+        self.updates = 0
+        self.timestamp = None
+        self._lock = threading.Lock()
+
+    def apply(self, bids=(), asks=(), snapshot=False, timestamp=None):
+        """Apply ``[price, size]`` level changes, a zero size removes a level."""
+        with self._lock:
+            if snapshot:
+                self.bids.clear()
+                self.asks.clear()
+            for price, size in bids:
+                self.bids.set(price, size)
+            for price, size in asks:
+                self.asks.set(price, size)
+            self.updates += 1
+            self.timestamp = timestamp
+
+    @property
+    def best_bid(self):
+        with self._lock:
+            return self._best_bid()
+
+    @property
+    def best_ask(self):
+        with self._lock:
+            return self._best_ask()
+
+    @property
+    def spread(self):
+        with self._lock:
+            bid, ask = self._best_bid(), self._best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def _best_bid(self):
+        prices = self.bids.prices
+        return (prices[-1], self.bids.sizes[prices[-1]]) if prices else None
+
+    def _best_ask(self):
+        prices = self.asks.prices
+        return (prices[0], self.asks.sizes[prices[0]]) if prices else None
+
+    def size_at(self, side, price):
+        book = self.bids if side == "bid" else self.asks
+        with self._lock:
+            return book.level(price)[1]
+
+    def snapshot(self, levels=10):
+        """Return the top ``levels`` of each side, best price first."""
+        with self._lock:
+            bid_prices = self.bids.prices[-levels:][::-1]
+            ask_prices = self.asks.prices[:levels]
+            return {
+                "asset": self.asset,
+                "time": self.timestamp,
+                "bids": [(price, self.bids.sizes[price]) for price in bid_prices],
+                "asks": [(price, self.asks.sizes[price]) for price in ask_prices],
+            }
+
+
+class DepthBooks(object):
+    """Registry of depth books fed by the websocket frame listener.
+
+    Depth frames are expected as ``{"asset": ..., "bids": [[price, size],
+    ...], "asks": [...]}``; ``buy``/``sell`` are accepted as aliases and a
+    truthy ``snapshot`` key replaces the book instead of updating it.
+    """
+
+    def __init__(self):
+        self.books = {}
+
+    def get(self, asset):
+        book = self.books.get(asset)
+        if book is None:
+            book = self.books[asset] = DepthBook(asset)
+        return book
+
+    def discard(self, asset):
+        self.books.pop(asset, None)
+
+    def on_frame(self, event, payload):
+        if not (event and event.startswith("depth")) or not isinstance(payload, dict):
+            return
+        asset = payload.get("asset")
+        if not asset:
+            return
+        self.get(asset).apply(
+            payload.get("bids") or payload.get("buy") or (),
+            payload.get("asks") or payload.get("sell") or (),
+            snapshot=bool(payload.get("snapshot")),
+            timestamp=payload.get("time"),
+        )
@@ -0,0 +1,166 @@
+"""Endpoint selection and failover for the websocket connection.
+
+By default each endpoint is probed with a plain TCP connect to its
+websocket host, which costs one round trip and needs neither TLS nor a
+session. The pool hands out the fastest healthy endpoint; an endpoint
+that fails to connect ``max_failures`` times in a row is put on a
+``cooldown`` and the next best one is used until it expires.
+"""
+import time
+import asyncio
+import logging
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINTS = ("qxbroker.com",)
+
+
+class Endpoint(object):
+    """One Quotex deployment.
+
+    :param str host: Site host, used for the origin header and HTTP calls.
+    :param str ws_host: Websocket host, ``ws2.<host>`` by default.
+    :param int port: Websocket port.
+    """
+
+    def __init__(self, host, ws_host=None, port=443):
+        self.host = host
+        self.ws_host = ws_host or f"ws2.{host}"
+        self.port = port
+        self.rtt = None
+        self.failures = 0
+        self.down_until = 0.0
+        self.last_error = None
+
+    def __repr__(self):
+        return f"Endpoint({self.host!r}, ws_host={self.ws_host!r}, port={self.port})"
+
+    @property
+    def ws_address(self):
+        """``host[:port]`` as used in the websocket URL and the Host header."""
+        return self.ws_host if self.port == 443 else f"{self.ws_host}:{self.port}"
+
+    def available(self, now=None):
+        return self.down_until <= (now or time.monotonic())
+
+
+async def tcp_probe(endpoint):
+    """Seconds taken by a TCP connect to the websocket host of ``endpoint``."""
+    started = time.monotonic()
+    _, writer = await asyncio.open_connection(endpoint.ws_host, endpoint.port)
+    elapsed = time.monotonic() - started
+    writer.close()
+    return elapsed
+
+
+class EndpointPool(object):
+    """Probe endpoints and pick the one to connect to.
+
+    :param endpoints: Host names or :class:`Endpoint` instances, in order of preference.
+    :param float probe_timeout: Seconds before a probe counts as failed.
+    :param int max_failures: Consecutive connect failures before failing over.
+    :param float cooldown: Seconds a failed over endpoint is skipped.
+    :param float probe_interval: Probe results older than this are refreshed on connect.
+    :param probe: ``async probe(endpoint)`` returning seconds, :func:`tcp_probe` by default.
+    """
+
+    def __init__(self, endpoints=DEFAULT_ENDPOINTS, probe_timeout=2.0, max_failures=2,
+                 cooldown=60.0, probe_interval=300.0, probe=tcp_probe):
+        self.endpoints = [
+            endpoint if isinstance(endpoint, Endpoint) else Endpoint(endpoint)
+            for endpoint in endpoints
+        ]
+        if not self.endpoints:
+            raise ValueError("At least one endpoint is required")
+        self.probe_timeout = probe_timeout
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self.probe_function = probe
+        self.current = self.endpoints[0]
+        self.failovers = 0
+        self.probed_at = None
+
+    @property
+    def stale(self):
+        """Whether a probe is worth running before choosing an endpoint."""
+        if len(self.endpoints) < 2:
+            return False
+        return self.probed_at is None or time.monotonic() - self.probed_at > self.probe_interval
+
+    async def probe(self, samples=1):
+        """Probe every endpoint concurrently, keeping the best of ``samples`` per endpoint."""
+        await asyncio.gather(*(self._probe(endpoint, samples) for endpoint in self.endpoints))
+        self.probed_at = time.monotonic()
+        return {endpoint.host: endpoint.rtt for endpoint in self.endpoints}
+
+    async def _probe(self, endpoint, samples):
+        best = None
+        for _ in range(samples):
+            try:
+                rtt = await asyncio.wait_for(self.probe_function(endpoint), self.probe_timeout)
+            except (OSError, asyncio.TimeoutError) as error:
+                endpoint.last_error = str(error) or type(error).__name__
+                logger.debug("Probe of %s failed: %s", endpoint.ws_address, endpoint.last_error)
+                continue
+            best = rtt if best is None else min(best, rtt)
+        endpoint.rtt = best
+        if best is None:
+            endpoint.down_until = time.monotonic() + self.cooldown
+        else:
+            endpoint.down_until = 0.0
+            if metrics.enabled:
+                metrics.observe("request_seconds", "probe", best)
+
+    def best(self):
+        """The fastest available endpoint, or the one coming back first when all are down.
+
+        Endpoints that were never probed rank after probed ones, in the
+        order they were configured.
+        """
+        now = time.monotonic()
+        available = [endpoint for endpoint in self.endpoints if endpoint.available(now)]
+        if not available:
+            return min(self.endpoints, key=lambda endpoint: endpoint.down_until)
+        return min(available, key=lambda endpoint: (
+            endpoint.rtt is None, endpoint.rtt or 0.0, self.endpoints.index(endpoint)))
+
+    def choose(self):
+        """Select :meth:`best` as the current endpoint and return it."""
+        endpoint = self.best()
+        if endpoint is not self.current:
+            logger.info("Switching endpoint from %s to %s", self.current.host, endpoint.host)
+            self.failovers += 1
+            if metrics.enabled:
+                metrics.inc("failovers_total", endpoint.host)
+            self.current = endpoint
+        return endpoint
+
+    def record_success(self, endpoint):
+        endpoint.failures = 0
+        endpoint.last_error = None
+
+    def record_failure(self, endpoint, reason=None):
+        endpoint.failures += 1
+        endpoint.last_error = reason
+        if endpoint.failures >= self.max_failures:
+            logger.warning("Endpoint %s failed %s times (%s), skipping it for %.0fs",
+                           endpoint.host, endpoint.failures, reason, self.cooldown)
+            endpoint.failures = 0
+            endpoint.down_until = time.monotonic() + self.cooldown
+
+    def stats(self):
+        now = time.monotonic()
+        return [
+            {
+                "host": endpoint.host,
+                "ws": endpoint.ws_address,
+                "rtt": endpoint.rtt,
+                "available": endpoint.available(now),
+                "failures": endpoint.failures,
+                "last_error": endpoint.last_error,
+                "current": endpoint is self.current,
+            }
+            for endpoint in self.endpoints
+        ]
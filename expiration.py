@@ -83,6 +83,17 @@ def get_next_timeframe(timestamp, time_zone, timeframe: int, open_time: str = No
     return next_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
 
 
+def get_next_boundary(timestamp, timeframe: int) -> int:
+    """Return the first multiple of ``timeframe`` seconds after ``timestamp``."""
+    return (int(timestamp) // timeframe + 1) * timeframe
+
+
+def format_open_time(timestamp, time_zone) -> str:
+    """Format a boundary timestamp the way ``get_next_timeframe`` does."""
+    open_time = datetime.fromtimestamp(timestamp) - timedelta(seconds=time_zone)
+    return open_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
 def get_expiration_time(timestamp, duration):
     now = datetime.now()
     new_date = now.replace(second=0, microsecond=0)
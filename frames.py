@@ -0,0 +1,50 @@
+"""Module for decoding Quotex socket.io frames."""
+from . import codec
+
+TEXT_EVENT = "42"
+BINARY_EVENT = "451-"
+
+
+def outgoing_event(data):
+    """Return the event name of an outbound ``42["event", ...]`` frame."""
+    if not data.startswith(TEXT_EVENT):
+        return None
+    end = data.find('"', 4)
+    return data[4:end] if end > 0 else None
+
+
+class FrameDecoder(object):
+    """Turn raw websocket messages into ``(event, payload)`` pairs.
+
+    Quotex announces binary payloads with a ``451-["event", placeholder]``
+    text frame and sends the JSON body in the following binary frame, so
+    the decoder remembers the announced event name between two messages.
+    """
+
+    def __init__(self):
+        self.pending_event = None
+
+    def decoded(self, payload):
+        """Pair a binary payload someone else already decoded with its announced event."""
+        event, self.pending_event = self.pending_event, None
+        return event, payload
+
+    def decode(self, message):
+        """Decode one message, returns ``None`` for control frames."""
+        if isinstance(message, (bytes, bytearray)):
+            event, self.pending_event = self.pending_event, None
+            try:
+                return event, codec.loads(message[1:])
+            except codec.DecodeError:
+                return None
+        if message.startswith(BINARY_EVENT):
+            end = message.find('"', 7)
+            self.pending_event = message[6:end] if end > 0 else None
+            return None
+        if message.startswith(TEXT_EVENT):
+            try:
+                body = codec.loads(message[2:])
+            except codec.DecodeError:
+                return None
+            return body[0], body[1] if len(body) > 1 else None
+        return None
@@ -0,0 +1,75 @@
+"""Memoized indicator results shared by every caller of a client.
+
+Results are keyed by asset, timeframe, indicator, parameters and the
+start of the last closed candle, so they stay valid until the next candle
+closes. Concurrent identical requests share one computation and the
+least recently used results are evicted past ``maxsize``.
+"""
+import asyncio
+from collections import OrderedDict
+
+
+class IndicatorCache(object):
+    """LRU cache with single-flight computation of identical keys.
+
+    Cached results are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    @staticmethod
+    def key(asset, timeframe, indicator, params, candle_time, *extra):
+        return (asset, timeframe, indicator.upper(), repr(sorted((params or {}).items())), candle_time) + extra
+
+    async def get(self, key, compute, cacheable=None):
+        """Return the cached result for ``key`` or await ``compute()`` once for all callers.
+
+        The computation runs in its own task that every caller awaits
+        through :func:`asyncio.shield`, so a caller being cancelled
+        cancels only its own wait.
+
+        :param cacheable: Optional predicate, results it rejects (errors)
+            are returned to the waiting callers but not stored.
+        """
+        if key in self.results:
+            self.results.move_to_end(key)
+            self.hits += 1
+            return self.results[key]
+        task = self.inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self.inflight[key] = asyncio.ensure_future(self._compute(key, compute, cacheable))
+            task.add_done_callback(_retrieve)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    async def _compute(self, key, compute, cacheable):
+        try:
+            result = await compute()
+        finally:
+            self.inflight.pop(key, None)
+        if cacheable is None or cacheable(result):
+            self.results[key] = result
+            if len(self.results) > self.maxsize:
+                self.results.popitem(last=False)
+        return result
+
+    def clear(self):
+        self.results.clear()
+
+    def stats(self):
+        return {"size": len(self.results), "hits": self.hits, "misses": self.misses, "shared": self.shared}
+
+
+def _retrieve(task):
+    """Mark the exception of a computation nobody waits for any more as seen."""
+    if not task.cancelled():
+        task.exception()
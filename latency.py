@@ -0,0 +1,140 @@
+"""Application level round trip monitor and dead connection detection.
+
+The monitor sends an Engine.IO ping (``"2"``) every ``interval`` seconds
+and times the ``"3"`` answer, keeping a window of recent round trips.
+A connection is declared dead when a ping goes unanswered for
+``dead_after`` seconds or, when ``stall_after`` is set, when the tick
+stream of an active subscription goes quiet that long. The websocket
+level ping (24s interval, 20s timeout) is left as a last resort.
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PING = "2"
+PONG = "3"
+
+
+class LatencyMonitor(object):
+    """Measure RTT continuously and report a dead connection within a budget.
+
+    :param float interval: Seconds between pings.
+    :param float dead_after: Seconds without a pong before the connection is dead.
+    :param float stall_after: Seconds without ticks, once ticks have flowed,
+        before the connection is dead; ``None`` disables the check.
+    :param on_dead: ``async on_dead(reason)`` run in its own task once per
+        dead connection, while the monitor keeps running.
+    :param int window: Round trips kept for statistics.
+    """
+
+    def __init__(self, interval=2.0, dead_after=6.0, stall_after=None, on_dead=None, window=1000):
+        self.interval = interval
+        self.dead_after = dead_after
+        self.stall_after = stall_after
+        self.on_dead = on_dead
+        self.samples = deque(maxlen=window)
+        self.api = None
+        self.dead = False
+        self.last_tick = None
+        self._ping_sent = None
+        self._task = None
+        self._recovery = None
+
+    def attach(self, api):
+        """Follow ``api`` (a new connection after a reconnect)."""
+        if self.api is not None:
+            self.api.rtt_monitor = None
+            self.api.remove_frame_listener(self.on_frame)
+        self.api = api
+        api.rtt_monitor = self
+        api.add_frame_listener(self.on_frame)
+        self.dead = False
+        self.last_tick = None
+        self._ping_sent = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._recovery is not None:
+            self._recovery.cancel()
+            self._recovery = None
+
+    def on_message(self, message):
+        """Raw message hook, called on the websocket thread for every message."""
+        if message == PONG and self._ping_sent is not None:
+            rtt = time.monotonic() - self._ping_sent
+            self._ping_sent = None
+            self.samples.append((time.time(), rtt))
+            if metrics.enabled:
+                metrics.observe("request_seconds", "rtt", rtt)
+
+    def on_frame(self, event, payload):
+        if isinstance(payload, list) and payload and isinstance(payload[0], list):
+            self.last_tick = time.monotonic()
+
+    async def _run(self):
+        next_ping = 0.0
+        while True:
+            now = time.monotonic()
+            reason = None
+            if self.dead or self.api is None:
+                pass
+            elif self._ping_sent is not None and now - self._ping_sent > self.dead_after:
+                reason = f"no pong for {now - self._ping_sent:.1f}s"
+            elif self.stall_after and self.last_tick is not None and now - self.last_tick > self.stall_after:
+                reason = f"tick stream stalled for {now - self.last_tick:.1f}s"
+            elif self._ping_sent is None and now >= next_ping:
+                self._ping_sent = now
+                next_ping = now + self.interval
+                try:
+                    self.api.websocket.send(PING)
+                except Exception as error:
+                    reason = f"ping failed: {error}"
+            if reason:
+                await self._declare_dead(reason)
+            await asyncio.sleep(min(self.interval, self.dead_after) / 4)
+
+    async def _declare_dead(self, reason):
+        self.dead = True
+        logger.warning("Websocket connection dead: %s", reason)
+        if self.on_dead is not None and (self._recovery is None or self._recovery.done()):
+            self._recovery = asyncio.ensure_future(self._recover(reason))
+
+    async def _recover(self, reason):
+        try:
+            await self.on_dead(reason)
+        except Exception:
+            logger.exception("Dead connection handler failed")
+
+    def history(self, size=None):
+        """``(wall time, rtt seconds)`` samples, oldest first."""
+        samples = list(self.samples)
+        return samples[-size:] if size else samples
+
+    def stats(self):
+        values = sorted(rtt for _, rtt in self.samples)
+        if not values:
+            return {"count": 0}
+
+        def pick(q):
+            return values[min(len(values) - 1, int(len(values) * q))]
+
+        return {
+            "count": len(values),
+            "last": self.samples[-1][1],
+            "mean": sum(values) / len(values),
+            "p50": pick(0.5),
+            "p90": pick(0.9),
+            "p99": pick(0.99),
+            "max": values[-1],
+        }
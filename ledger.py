@@ -0,0 +1,180 @@
+"""Event driven balance and P&L ledger.
+
+The ledger is updated from balance pushes, order acknowledgements and
+deal settlement frames, so balance and exposure queries are answered
+from memory instead of polling the API state.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+DEMO = "demo"
+LIVE = "live"
+
+
+def account_name(is_demo):
+    return DEMO if is_demo else LIVE
+
+
+class Position(object):
+    __slots__ = ("id", "asset", "account", "amount", "direction", "open_price", "payout", "request_id")
+
+    def __init__(self, id, asset, account, amount, direction, open_price, payout, request_id=None):
+        self.id = id
+        self.asset = asset
+        self.account = account
+        self.amount = amount
+        self.direction = direction
+        self.open_price = open_price
+        self.payout = payout
+        self.request_id = request_id
+
+    def unrealized(self, price):
+        """Binary option P&L if it settled at ``price``."""
+        if price is None or self.open_price is None or price == self.open_price:
+            return 0.0
+        winning = price > self.open_price if self.direction == 0 else price < self.open_price
+        return self.amount * self.payout / 100 if winning else -self.amount
+
+
+class Ledger(object):
+    """Balances, open positions and realized/unrealized P&L per account and asset."""
+
+    def __init__(self, account=DEMO):
+        self.account = account
+        self.balances = {DEMO: None, LIVE: None}
+        self.positions = {}
+        self.exposure = {DEMO: defaultdict(float), LIVE: defaultdict(float)}
+        self.realized = {DEMO: defaultdict(float), LIVE: defaultdict(float)}
+        self.unrealized = {DEMO: defaultdict(float), LIVE: defaultdict(float)}
+        self.open_count = {DEMO: 0, LIVE: 0}
+        self.exposure_total = {DEMO: 0.0, LIVE: 0.0}
+        self.unrealized_total = {DEMO: 0.0, LIVE: 0.0}
+        self.prices = {}
+        self._by_asset = defaultdict(dict)
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def balance(self, account=None):
+        """Balance plus the open P&L estimated from the last prices."""
+        account = account or self.account
+        balance = self.balances[account]
+        if balance is None:
+            return None
+        return balance + self.unrealized_total[account]
+
+    def total_exposure(self, account=None):
+        return self.exposure_total[account or self.account]
+
+    def asset_exposure(self, asset, account=None):
+        return self.exposure[account or self.account].get(asset, 0.0)
+
+    def open_positions(self, account=None):
+        return self.open_count[account or self.account]
+
+    def realized_pnl(self, asset=None, account=None):
+        realized = self.realized[account or self.account]
+        return realized.get(asset, 0.0) if asset else sum(realized.values())
+
+    def add_listener(self, listener):
+        """Register ``listener(kind, data)`` called on every ledger change."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def changes(self, maxsize=1000):
+        """Async iterator over ``(kind, data)`` change notifications."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize)
+
+        def push(kind, data):
+            loop.call_soon_threadsafe(_put_latest, queue, (kind, data))
+
+        self.add_listener(push)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.remove_listener(push)
+
+    def _notify(self, kind, data):
+        for listener in self._listeners:
+            listener(kind, data)
+
+    def on_balance(self, payload):
+        with self._lock:
+            for key, account in (("demoBalance", DEMO), ("liveBalance", LIVE)):
+                if payload.get(key) is not None:
+                    self.balances[account] = float(payload[key])
+        self._notify("balance", dict(self.balances))
+
+    def on_open(self, payload):
+        account = account_name(payload.get("isDemo", self.account == DEMO))
+        position = Position(
+            payload["id"], payload.get("asset"), account, float(payload.get("amount") or 0),
+            payload.get("command"), payload.get("openPrice"), float(payload.get("percentProfit") or 0),
+            payload.get("requestId")
+        )
+        with self._lock:
+            if position.id in self.positions:
+                return
+            self.positions[position.id] = position
+            self._by_asset[position.asset][position.id] = position
+            self.exposure[account][position.asset] += position.amount
+            self.exposure_total[account] += position.amount
+            self.open_count[account] += 1
+        self._notify("open", position)
+
+    def on_close(self, deal):
+        with self._lock:
+            position = self.positions.pop(deal.get("id"), None)
+            asset = deal.get("asset") or (position.asset if position else None)
+            account = position.account if position else account_name(deal.get("isDemo", self.account == DEMO))
+            profit = float(deal.get("profit") or 0)
+            self.realized[account][asset] += profit
+            if position:
+                self._by_asset[asset].pop(position.id, None)
+                self.exposure[account][asset] -= position.amount
+                self.exposure_total[account] -= position.amount
+                self.open_count[account] -= 1
+            self._revalue(asset)
+        self._notify("close", deal)
+
+    def on_tick(self, asset, price):
+        self.prices[asset] = price
+        if self._by_asset.get(asset):
+            with self._lock:
+                self._revalue(asset)
+
+    def _revalue(self, asset):
+        price = self.prices.get(asset)
+        totals = {DEMO: 0.0, LIVE: 0.0}
+        for position in self._by_asset.get(asset, {}).values():
+            totals[position.account] += position.unrealized(price)
+        for account, total in totals.items():
+            self.unrealized_total[account] += total - self.unrealized[account].get(asset, 0.0)
+            self.unrealized[account][asset] = total
+
+    def on_frame(self, event, payload):
+        if isinstance(payload, list):
+            for tick in payload:
+                if isinstance(tick, list) and len(tick) >= 3:
+                    self.on_tick(tick[0], tick[2])
+            return
+        if not isinstance(payload, dict):
+            return
+        if "demoBalance" in payload or "liveBalance" in payload:
+            self.on_balance(payload)
+        if payload.get("deals"):
+            for deal in payload["deals"]:
+                self.on_close(deal)
+        elif payload.get("id") and payload.get("openPrice") is not None and not payload.get("closePrice"):
+            self.on_open(payload)
+
+
+def _put_latest(queue, item):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
@@ -0,0 +1,71 @@
+"""Background logging for the client.
+
+Log records are put on a queue by the calling thread and formatted and
+written by a listener thread, so a slow terminal or disk never stalls
+the websocket thread. Records are queued unformatted; the message is
+only built when a handler actually writes it.
+"""
+import sys
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+# The package logger is named after wherever this flat package was imported from.
+LOGGERS = (__name__.rpartition(".")[0] or __name__, "websocket")
+FORMAT = "%(asctime)s %(threadName)s %(name)s %(levelname)s %(message)s"
+
+_listener = None
+
+
+class LazyQueueHandler(QueueHandler):
+    """Queue records as they are, skipping the eager formatting of :class:`QueueHandler`.
+
+    The queue never leaves the process, so the record (and its ``args``)
+    can be handed to the listener thread untouched.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def start_background_logging(level=logging.INFO, handlers=None, loggers=LOGGERS):
+    """Route the client loggers through a queue served by a background thread.
+
+    :param int level: Level applied to ``loggers``; hot-path ``debug``
+        calls below it return after a single cached level check.
+    :param list handlers: Handlers the listener writes to, a stderr
+        stream handler by default.
+    :returns: The running :class:`QueueListener`.
+    """
+    global _listener
+    stop_background_logging()
+    if handlers is None:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(FORMAT))
+        handlers = [handler]
+    records = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(records)
+    for name in loggers:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.queue_handler = queue_handler
+    _listener.loggers = loggers
+    _listener.start()
+    return _listener
+
+
+def stop_background_logging():
+    """Flush queued records and restore the loggers to their defaults."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for name in _listener.loggers:
+        logger = logging.getLogger(name)
+        logger.removeHandler(_listener.queue_handler)
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+    _listener = None
@@ -0,0 +1,211 @@
+"""Lightweight instrumentation for the Quotex client hot paths.
+
+Every instrumented call site checks ``metrics.enabled`` first, so with
+metrics disabled (the default) the only cost is one attribute lookup.
+Collected values can be read as a snapshot dict or rendered in the
+Prometheus text exposition format.
+"""
+import time
+import bisect
+import asyncio
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+DESCRIPTIONS = {
+    "frames_in_total": ("counter", "Inbound websocket frames by event."),
+    "frames_out_total": ("counter", "Outbound websocket frames by event."),
+    "reconnects_total": ("counter", "Websocket reconnections."),
+    "handler_seconds": ("histogram", "Inbound frame handler execution time."),
+    "request_seconds": ("histogram", "Request round trip latency."),
+    "delivery_seconds": ("histogram", "Frame arrival to consumer delivery latency."),
+    "queue_depth": ("gauge", "Items waiting in internal queues."),
+    "throttle_seconds": ("histogram", "Time outbound requests waited on the rate limiter."),
+    "throttled_total": ("counter", "Server throttling signals by reason."),
+    "connect_seconds": ("histogram", "Seconds from connecting to each connection state."),
+    "failovers_total": ("counter", "Switches to another endpoint by target host."),
+}
+
+
+class Histogram(object):
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Estimate a quantile from the bucket upper bounds."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[index] if index < len(BUCKETS) else self.max
+        return self.max
+
+
+class Metrics(object):
+    """Counters, gauges and histograms keyed by ``(name, label)``."""
+
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def inc(self, name, label="", value=1):
+        key = (name, label)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, label, value):
+        self.gauges[(name, label)] = value
+
+    def observe(self, name, label, seconds):
+        key = (name, label)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @staticmethod
+    def now():
+        return time.perf_counter()
+
+    def snapshot(self):
+        """Return all current values as plain dicts."""
+        with self._lock:
+            histograms = {
+                f"{name}{{{label}}}": {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "max": h.max,
+                    "p50": h.quantile(0.5),
+                    "p99": h.quantile(0.99),
+                }
+                for (name, label), h in self.histograms.items()
+            }
+            return {
+                "counters": {f"{n}{{{l}}}": v for (n, l), v in self.counters.items()},
+                "gauges": {f"{n}{{{l}}}": v for (n, l), v in self.gauges.items()},
+                "histograms": histograms,
+            }
+
+    def render_prometheus(self, prefix="quotex_"):
+        """Render the collected values in Prometheus text format."""
+        lines = []
+        with self._lock:
+            series = {}
+            for (name, label), value in self.counters.items():
+                series.setdefault(name, []).append((label, value))
+            for (name, label), value in self.gauges.items():
+                series.setdefault(name, []).append((label, value))
+            for (name, label), h in self.histograms.items():
+                series.setdefault(name, []).append((label, h))
+        for name, values in sorted(series.items()):
+            kind, description = DESCRIPTIONS.get(name, ("untyped", name))
+            lines.append(f"# HELP {prefix}{name} {description}")
+            lines.append(f"# TYPE {prefix}{name} {kind}")
+            for label, value in values:
+                labels = f'{_label_key(name)}="{label}"' if label else ""
+                if isinstance(value, Histogram):
+                    seen = 0
+                    for bound, count in zip(BUCKETS + (float("inf"),), value.counts):
+                        seen += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        sep = "," if labels else ""
+                        lines.append(f'{prefix}{name}_bucket{{{labels}{sep}le="{le}"}} {seen}')
+                    lines.append(f"{prefix}{name}_sum{_braces(labels)} {value.sum}")
+                    lines.append(f"{prefix}{name}_count{_braces(labels)} {value.count}")
+                else:
+                    lines.append(f"{prefix}{name}{_braces(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9108, host="127.0.0.1"):
+        """Expose ``/metrics`` over HTTP from a daemon thread."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.enable()
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        return self._server
+
+    def shutdown(self):
+        if self._server:
+            self._server.shutdown()
+            self._server = None
+
+    async def report(self, callback, interval=10):
+        """Call ``callback(snapshot)`` every ``interval`` seconds."""
+        while self.enabled:
+            await asyncio.sleep(interval)
+            callback(self.snapshot())
+
+
+def _braces(labels):
+    return f"{{{labels}}}" if labels else ""
+
+
+def _label_key(name):
+    if name.startswith("frames"):
+        return "event"
+    if name == "handler_seconds":
+        return "handler"
+    if name == "request_seconds":
+        return "request"
+    if name == "delivery_seconds":
+        return "stream"
+    if name == "throttle_seconds":
+        return "traffic_class"
+    if name == "throttled_total":
+        return "reason"
+    if name == "connect_seconds":
+        return "stage"
+    return "name"
+
+
+metrics = Metrics()
@@ -0,0 +1,91 @@
+"""Pipelined ``history/load`` requests for bulk candle warm-up.
+
+Requests are sent through the regular candles channel without waiting
+for the previous answer; up to ``window`` requests are in flight at once
+and each response is matched back to its request by the ``index`` the
+server echoes.
+"""
+import time
+import asyncio
+import itertools
+from . import expiration
+from .metrics import metrics
+from .ratelimit import HISTORY
+
+
+class CandlePipeline(object):
+    """Match ``history/load`` responses to concurrent requests.
+
+    :param api: The :class:`QuotexAPI` used to send requests.
+    :param int window: Default number of requests in flight.
+    :param float timeout: Seconds to wait for each response.
+    """
+
+    def __init__(self, api, window=8, timeout=20.0):
+        self.api = api
+        self.window = window
+        self.timeout = timeout
+        self.pending = {}
+        # The original single request uses the second timestamp as index;
+        # a counter on a prefix two digits longer never repeats or waits.
+        self._prefix = expiration.get_timestamp() * 100
+        self._sequence = itertools.count(1)
+
+    def _next_index(self):
+        return self._prefix + next(self._sequence)
+
+    async def request(self, asset, period, offset, end_from_time=None):
+        """Send one ``history/load`` request and wait for its own response."""
+        self.api.enable("candle_pipeline")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        index = self._next_index()
+        self.pending[index] = (loop, future)
+        started = time.perf_counter()
+        try:
+            await self.api.rate_limiter.wait(HISTORY)
+            self.api.get_candles(asset, index, end_from_time or time.time(), offset, period)
+            payload = await asyncio.wait_for(future, self.timeout)
+        finally:
+            self.pending.pop(index, None)
+        if metrics.enabled:
+            metrics.observe("request_seconds", "candles_many", time.perf_counter() - started)
+        return payload
+
+    async def fetch(self, requests, window=None, end_from_time=None):
+        """Yield ``(position, request, payload)`` in completion order.
+
+        ``payload`` is the response dict, or the exception raised for that
+        request (for example :class:`asyncio.TimeoutError`).
+        """
+        semaphore = asyncio.Semaphore(window or self.window)
+
+        async def run(position, item):
+            asset, period, offset = item
+            async with semaphore:
+                try:
+                    payload = await self.request(asset, period, offset, end_from_time)
+                except asyncio.TimeoutError as error:
+                    payload = error
+            return position, item, payload
+
+        tasks = [asyncio.ensure_future(run(position, item)) for position, item in enumerate(requests)]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def on_frame(self, event, payload):
+        if not self.pending or not isinstance(payload, dict):
+            return
+        entry = self.pending.get(payload.get("index"))
+        if entry is not None:
+            loop, future = entry
+            loop.call_soon_threadsafe(_resolve, future, payload)
+
+
+def _resolve(future, payload):
+    if not future.done():
+        future.set_result(payload)
@@ -1,11 +1,11 @@
 import os
 import re
-import json
 import platform
 import requests
 from pathlib import Path
 from bs4 import BeautifulSoup
 from playwright_stealth import stealth_async
+from .. import codec
 from ..utils.playwright_install import install
 from playwright.async_api import Playwright, async_playwright, expect
 
@@ -143,7 +143,7 @@ class Browser(object):
 
         match = re.sub("window.settings = ", "", settings)
         if match:
-            token = json.loads(match).get("token")
+            token = codec.loads(match).get("token")
             self.api.session_data["token"] = token
 
         output_file = Path(os.path.join(self.api.resource_path, "session.json"))
@@ -152,7 +152,7 @@ class Browser(object):
         cookies_string = '; '.join([f'{c.name}={c.value}' for c in cookiejar])
         self.api.session_data["cookies"] = cookies_string
         output_file.write_text(
-            json.dumps({"cookies": cookies_string, "token": token, "user_agent": user_agent}, indent=4)
+            codec.dumps_pretty({"cookies": cookies_string, "token": token, "user_agent": user_agent})
         )
 
         await context.close() if self.user_data_dir else await browser.close()
@@ -0,0 +1,386 @@
+"""Client side token bucket rate limiting for outbound traffic.
+
+Every outbound websocket frame is classified by event name into a
+traffic class with its own bucket; all classes also draw from one shared
+connection bucket. Orders take from the shared bucket without waiting for
+it. A frame that cannot go out at once is queued in an
+:class:`OutboundQueue` and sent by its thread, orders first, so neither
+the event loop nor an order waits behind a burst of subscriptions or
+history backfill. When the server signals throttling (token rejected,
+HTTP 429, a rate limit error frame) every rate is halved and then
+recovers gradually while the connection stays quiet.
+"""
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from .frames import outgoing_event
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ORDERS = "orders"
+SUBSCRIPTIONS = "subscriptions"
+HISTORY = "history"
+HTTP = "http"
+
+# Frames sent per second and burst size per traffic class.
+DEFAULT_LIMITS = {
+    ORDERS: (10.0, 10),
+    SUBSCRIPTIONS: (5.0, 20),
+    HISTORY: (10.0, 10),
+    HTTP: (2.0, 5),
+}
+CONNECTION_LIMIT = (20.0, 40)
+
+EVENT_CLASSES = {
+    "orders/open": ORDERS,
+    "orders/cancel": ORDERS,
+    "pending/create": ORDERS,
+    "history/load": HISTORY,
+    "history/load/line": HISTORY,
+    "instruments/update": SUBSCRIPTIONS,
+    "instruments/follow": SUBSCRIPTIONS,
+    "depth/follow": SUBSCRIPTIONS,
+    "depth/unfollow": SUBSCRIPTIONS,
+    "chart_notification/get": SUBSCRIPTIONS,
+    "subfor": SUBSCRIPTIONS,
+    "unsubfor": SUBSCRIPTIONS,
+    "signal/subscribe": SUBSCRIPTIONS,
+    "settings/store": SUBSCRIPTIONS,
+    "indicator/store": SUBSCRIPTIONS,
+    "indicator/change": SUBSCRIPTIONS,
+    "indicator/delete": SUBSCRIPTIONS,
+}
+
+# Queued frames go out in this order, orders first.
+PRIORITIES = (ORDERS, HISTORY, SUBSCRIPTIONS, HTTP)
+
+THROTTLE_WORDS = ("too many", "rate limit", "limit exceeded", "throttl")
+
+
+def classify(data):
+    """Return the traffic class of an outbound frame, ``None`` when unlimited."""
+    return EVENT_CLASSES.get(outgoing_event(data))
+
+
+class TokenBucket(object):
+    """Token bucket that may go into debt so waiting callers keep their order."""
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        """Take one token and return the seconds to wait before using it."""
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def take(self, now):
+        """Take one token without waiting, even if that leaves a debt."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def delay(self, now):
+        """Seconds until a token is available, without taking it."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class ClassStats(object):
+    __slots__ = ("sent", "delayed", "waited", "max_wait")
+
+    def __init__(self):
+        self.sent = 0
+        self.delayed = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+
+    def to_dict(self):
+        return {"sent": self.sent, "delayed": self.delayed, "waited": self.waited, "max_wait": self.max_wait}
+
+
+class RateLimiter(object):
+    """Per traffic class token buckets with adaptive backoff.
+
+    :param dict limits: ``{class: (rate, burst)}`` overriding :data:`DEFAULT_LIMITS`.
+    :param tuple connection: ``(rate, burst)`` of the shared connection bucket.
+    :param float backoff: Factor applied to every rate on a throttle signal.
+    :param float floor: Lowest fraction of the configured rate backoff goes to.
+    :param float recovery: Quiet seconds between each step back up.
+    """
+
+    def __init__(self, limits=None, connection=CONNECTION_LIMIT, backoff=0.5, floor=0.1, recovery=10.0):
+        self.buckets = {name: TokenBucket(*limit) for name, limit in dict(DEFAULT_LIMITS, **(limits or {})).items()}
+        self.connection = TokenBucket(*connection)
+        self.backoff = backoff
+        self.floor = floor
+        self.recovery = recovery
+        self.enabled = True
+        self.throttle_events = []
+        self.stats = {name: ClassStats() for name in self.buckets}
+        self._prepaid = dict.fromkeys(self.buckets, 0)
+        self._last_change = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, traffic_class):
+        """Reserve a slot for ``traffic_class`` and return the wait in seconds."""
+        if not self.enabled or traffic_class not in self.buckets:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            self._recover(now)
+            wait = self.buckets[traffic_class].reserve(now)
+            if traffic_class == ORDERS:
+                self.connection.take(now)
+            else:
+                wait = max(wait, self.connection.reserve(now))
+            stats = self.stats[traffic_class]
+            stats.sent += 1
+            if wait:
+                stats.delayed += 1
+                stats.waited += wait
+                stats.max_wait = max(stats.max_wait, wait)
+        if wait and metrics.enabled:
+            metrics.observe("throttle_seconds", traffic_class, wait)
+        return wait
+
+    def delay(self, traffic_class):
+        """Seconds until ``traffic_class`` may send, 0 when :meth:`try_take` would succeed."""
+        if not self.enabled or traffic_class not in self.buckets:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            if self._prepaid[traffic_class]:
+                return 0.0
+            self._recover(now)
+            delay = self.buckets[traffic_class].delay(now)
+            if traffic_class != ORDERS:
+                delay = max(delay, self.connection.delay(now))
+            return delay
+
+    def try_take(self, traffic_class, waited=0.0):
+        """Take a slot if one is free now, never waiting.
+
+        A slot pre-paid by :meth:`wait` is used first. ``waited`` is the
+        time the frame spent queued, recorded in the statistics.
+        """
+        if not self.enabled or traffic_class not in self.buckets:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if self._prepaid[traffic_class]:
+                self._prepaid[traffic_class] -= 1
+                return True
+            self._recover(now)
+            bucket = self.buckets[traffic_class]
+            if bucket.delay(now) or (traffic_class != ORDERS and self.connection.delay(now)):
+                return False
+            bucket.take(now)
+            self.connection.take(now)
+            stats = self.stats[traffic_class]
+            stats.sent += 1
+            if waited:
+                stats.delayed += 1
+                stats.waited += waited
+                stats.max_wait = max(stats.max_wait, waited)
+        if waited and metrics.enabled:
+            metrics.observe("throttle_seconds", traffic_class, waited)
+        return True
+
+    def acquire(self, traffic_class):
+        """Block the calling thread until ``traffic_class`` may send.
+
+        Coroutines await :meth:`wait` first, which pre-pays this call. An
+        unpaid call on a thread running an event loop never sleeps, the
+        slot is taken on credit so later callers wait longer instead.
+        """
+        with self._lock:
+            if self._prepaid.get(traffic_class):
+                self._prepaid[traffic_class] -= 1
+                return 0.0
+        wait = self.reserve(traffic_class)
+        if wait:
+            if _on_event_loop():
+                logger.debug("Not sleeping %.2fs for %s on the event loop", wait, traffic_class)
+            else:
+                time.sleep(wait)
+        return wait
+
+    async def wait(self, traffic_class):
+        """Wait on the event loop for a slot and pre-pay the next send.
+
+        The following :meth:`acquire` of the same class returns at once,
+        so channel calls made right after this do not block the loop.
+        """
+        wait = self.reserve(traffic_class)
+        if wait:
+            await asyncio.sleep(wait)
+        if self.enabled and traffic_class in self._prepaid:
+            with self._lock:
+                self._prepaid[traffic_class] += 1
+        return wait
+
+    def _recover(self, now):
+        if now - self._last_change < self.recovery:
+            return
+        for bucket in list(self.buckets.values()) + [self.connection]:
+            bucket._refill(now)
+            bucket.rate = min(bucket.base_rate, bucket.rate * 1.25)
+        self._last_change = now
+
+    def throttled(self, reason):
+        """Slow every class down after the server pushed back."""
+        now = time.monotonic()
+        with self._lock:
+            for bucket in list(self.buckets.values()) + [self.connection]:
+                bucket._refill(now)
+                bucket.rate = max(bucket.base_rate * self.floor, bucket.rate * self.backoff)
+            self._last_change = now
+            self.throttle_events.append((time.time(), reason))
+            del self.throttle_events[:-100]
+        logger.warning("Server throttling (%s), outbound rates reduced", reason)
+        if metrics.enabled:
+            metrics.inc("throttled_total", reason)
+
+    def on_frame(self, event, payload):
+        if not isinstance(payload, dict):
+            return
+        message = payload.get("error") or payload.get("message")
+        if isinstance(message, str) and any(word in message.lower() for word in THROTTLE_WORDS):
+            self.throttled(event or "error")
+
+    def snapshot(self):
+        """Current rates and per class throttle statistics."""
+        with self._lock:
+            return {
+                "classes": {
+                    name: dict(self.stats[name].to_dict(), rate=bucket.rate, tokens=bucket.tokens)
+                    for name, bucket in self.buckets.items()
+                },
+                "connection": {"rate": self.connection.rate, "tokens": self.connection.tokens},
+                "throttle_events": list(self.throttle_events),
+            }
+
+
+class OutboundQueue(object):
+    """Send frames through the rate limiter without blocking the caller.
+
+    A frame is sent on the calling thread when nothing of its class is
+    queued and a slot is free; otherwise it is queued and a sender thread
+    sends it once a slot frees up, always picking the first ready class in
+    :data:`PRIORITIES` order, so a queued order goes out ahead of queued
+    subscriptions.
+
+    :param limiter: The :class:`RateLimiter` to draw slots from.
+    :param send: ``send(data, no_force_send)`` writing one frame to the socket.
+    """
+
+    def __init__(self, limiter, send):
+        self.limiter = limiter
+        self.send = send
+        self.queues = {name: deque() for name in PRIORITIES}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._generation = 0
+        self._thread_generation = None
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    def submit(self, traffic_class, data, no_force_send=True, sent=None):
+        """Send or queue ``data``, calling ``sent()`` after it was written."""
+        queue = self.queues.get(traffic_class)
+        if queue is None:
+            self.send(data, no_force_send)
+            if sent is not None:
+                sent()
+            return
+        with self._condition:
+            if not queue and self.limiter.try_take(traffic_class):
+                queued = False
+            else:
+                queue.append((time.monotonic(), data, no_force_send, sent))
+                queued = True
+                self._start_sender()
+                self._condition.notify_all()
+        if not queued:
+            self.send(data, no_force_send)
+            if sent is not None:
+                sent()
+
+    def _start_sender(self):
+        """Start a sender unless one of the current generation is running.
+
+        A sender stopped by :meth:`close` may still be alive while it
+        finishes, so frames submitted after ``close`` get a new one.
+        """
+        if (self._thread is not None and self._thread.is_alive()
+                and self._thread_generation == self._generation):
+            return
+        self._thread_generation = self._generation
+        self._thread = threading.Thread(
+            target=self._run, args=(self._generation,), name="quotex-outbound", daemon=True
+        )
+        self._thread.start()
+
+    def _next(self):
+        """Pop the first frame that may go out now, or return the seconds to wait."""
+        delay = None
+        now = time.monotonic()
+        for name in PRIORITIES:
+            queue = self.queues[name]
+            if not queue:
+                continue
+            enqueued = queue[0][0]
+            if self.limiter.try_take(name, now - enqueued):
+                return queue.popleft()
+            wait = self.limiter.delay(name)
+            delay = wait if delay is None else min(delay, wait)
+        return delay
+
+    def _run(self, generation):
+        while True:
+            with self._condition:
+                while True:
+                    if self._generation != generation:
+                        return
+                    item = self._next()
+                    if isinstance(item, tuple):
+                        break
+                    self._condition.wait(None if item is None else max(item, 0.001))
+            _, data, no_force_send, sent = item
+            try:
+                self.send(data, no_force_send)
+                if sent is not None:
+                    sent()
+            except Exception:
+                logger.exception("Sending a queued frame failed")
+
+    def close(self):
+        """Stop the sender thread and drop queued frames.
+
+        The queue stays usable, a later :meth:`submit` starts a new sender.
+        """
+        with self._condition:
+            self._generation += 1
+            for queue in self.queues.values():
+                queue.clear()
+            self._condition.notify_all()
+
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
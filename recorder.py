@@ -0,0 +1,176 @@
+"""Websocket session capture and deterministic replay.
+
+A capture is a gzip stream starting with a small header followed by one
+record per frame: nanoseconds since the start of the capture (monotonic
+clock), direction, message kind and length, then the raw message. The
+websocket thread only appends to a deque; compression and disk writes
+happen on a background thread.
+"""
+import gzip
+import time
+import struct
+import asyncio
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"QXWS"
+VERSION = 1
+HEADER = struct.Struct("<4sHd")
+RECORD = struct.Struct("<QBBI")
+
+INBOUND = 0
+OUTBOUND = 1
+TEXT = 0
+BINARY = 1
+
+
+class SessionRecorder(object):
+    """Capture every inbound and outbound frame of a session to ``path``.
+
+    :param str path: Destination file, conventionally ``*.qxws.gz``.
+    :param float flush_interval: Seconds between background writes.
+    :param int compresslevel: gzip level used by the writer thread.
+    """
+
+    def __init__(self, path, flush_interval=0.5, compresslevel=6):
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.compresslevel = compresslevel
+        self.frames = 0
+        self._pending = deque()
+        self._started = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def recording(self):
+        return self._thread is not None
+
+    def start(self):
+        self._started = time.monotonic_ns()
+        self._stop.clear()
+        file = gzip.open(self.path, "wb", compresslevel=self.compresslevel)
+        file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+        self._thread = threading.Thread(target=self._writer, args=(file,), daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, direction, message):
+        """Hot path: timestamp the frame and queue it for the writer thread."""
+        if self._thread is not None:
+            self._pending.append((time.monotonic_ns(), direction, message))
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _writer(self, file):
+        pending = self._pending
+        started = self._started
+        try:
+            while True:
+                stopping = self._stop.wait(self.flush_interval)
+                chunks = []
+                while pending:
+                    timestamp, direction, message = pending.popleft()
+                    if isinstance(message, str):
+                        kind, message = TEXT, message.encode("utf-8")
+                    else:
+                        kind, message = BINARY, bytes(message)
+                    chunks.append(RECORD.pack(timestamp - started, direction, kind, len(message)))
+                    chunks.append(message)
+                if chunks:
+                    file.write(b"".join(chunks))
+                    self.frames += len(chunks) // 2
+                if stopping:
+                    break
+        except Exception:
+            logger.exception("Session recorder stopped writing %s", self.path)
+        finally:
+            file.close()
+
+
+def read_capture(path):
+    """Yield ``(seconds, direction, message)`` from a capture file.
+
+    Text frames come back as ``str`` and binary frames as ``bytes``,
+    exactly as the websocket client delivered them.
+    """
+    with gzip.open(str(path), "rb") as file:
+        magic, version, _ = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a websocket capture")
+        while True:
+            head = file.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return
+            offset, direction, kind, length = RECORD.unpack(head)
+            message = file.read(length)
+            yield offset / 1e9, direction, message.decode("utf-8") if kind == TEXT else message
+
+
+class SessionReplayer(object):
+    """Feed a capture back into a :class:`QuotexAPI` instance.
+
+    Inbound frames go through the same path as live traffic: the tapped
+    websocket ``on_message`` when a client exists (see
+    :meth:`QuotexAPI.attach_client`), otherwise straight to
+    :meth:`QuotexAPI.dispatch_frame`. Frames the strategy stack sends
+    during the replay are collected in :attr:`sent` instead of hitting a
+    socket.
+
+    :param float speed: ``1`` for real time, ``N`` for N times faster and
+        ``0`` or ``None`` to replay as fast as possible.
+    """
+
+    def __init__(self, api, path, speed=1.0):
+        self.api = api
+        self.path = path
+        self.speed = speed
+        self.sent = []
+        self.frames = 0
+        self.max_lag = 0.0
+
+    def _send(self, data, no_force_send=True):
+        self.sent.append(data)
+
+    async def run(self):
+        api = self.api
+        client = api.websocket_client
+        handler = client.wss.on_message if client is not None else None
+        api.send_websocket_request = self._send
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            for offset, direction, message in read_capture(self.path):
+                if direction != INBOUND:
+                    continue
+                if self.speed:
+                    delay = started + offset / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    else:
+                        self.max_lag = max(self.max_lag, -delay)
+                elif self.frames % 256 == 0:
+                    await asyncio.sleep(0)
+                if handler is not None:
+                    handler(client.wss, message)
+                else:
+                    api.dispatch_frame(message)
+                self.frames += 1
+        finally:
+            del api.send_websocket_request
+        return {"frames": self.frames, "sent": len(self.sent),
+                "seconds": loop.time() - started, "max_lag": self.max_lag}
@@ -0,0 +1,112 @@
+"""Compact market records used in place of per-item dicts.
+
+The records keep their values in ``__slots__`` (no per-instance
+``__dict__``) and still answer ``record["close"]``, ``record.get()``,
+``keys()`` and ``dict(record)`` so code written against the old dict
+shapes keeps working.
+"""
+
+
+class Record(object):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        fields = self.__slots__
+        for index, name in enumerate(fields):
+            if index < len(args):
+                value = args[index]
+            else:
+                value = kwargs.get(name)
+            setattr(self, name, value)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.keys())
+        return f"{type(self).__name__}({values})"
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def keys(self):
+        return [name for name in self.__slots__ if getattr(self, name) is not None]
+
+    def values(self):
+        return [getattr(self, name) for name in self.keys()]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.keys()}
+
+
+class Tick(Record):
+    """A single price update, ``[asset, time, price, direction]`` on the wire."""
+    __slots__ = ("asset", "time", "price", "direction")
+
+    @classmethod
+    def from_list(cls, data):
+        return cls(*data[:4])
+
+
+class Candle(Record):
+    __slots__ = ("time", "open", "close", "high", "low", "ticks")
+
+    def update(self, price, ticks=1):
+        """Fold a new price into the candle in place."""
+        self.close = price
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        self.ticks = (self.ticks or 0) + ticks
+
+
+class Deal(Record):
+    """An order from open to settlement, also used for trade log entries."""
+    __slots__ = (
+        "id", "timestamp", "asset", "direction", "amount", "entry_price",
+        "close_price", "fib_level", "result", "profit", "win", "game_state",
+        "duration_seconds"
+    )
+
+
+class SellResult(Record):
+    """Outcome of one early close: the server response or an error, and the round trip."""
+    __slots__ = ("ticket", "response", "latency", "error")
+
+
+def to_candles(candles):
+    """Convert candle dicts (or records) to :class:`Candle` records."""
+    return [c if isinstance(c, Candle) else Candle.from_dict(c) for c in candles]
@@ -0,0 +1,167 @@
+"""Resample base candles to higher timeframes.
+
+Bars are aligned to server time boundaries: a bar of ``timeframe``
+seconds starts at ``(time - offset) // timeframe * timeframe + offset``,
+with ``offset`` 0 for the UTC aligned buckets the server uses. History is
+resampled in one vectorized pass with NumPy when it is installed; live
+ticks then update every derived timeframe in place.
+"""
+import threading
+from collections import deque
+from .records import Candle
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+
+def bucket_start(timestamp, timeframe, offset=0):
+    return int((timestamp - offset) // timeframe * timeframe + offset)
+
+
+def resample(candles, timeframe, offset=0):
+    """Aggregate time ordered ``candles`` into ``timeframe`` second bars."""
+    if not candles:
+        return []
+    if np is not None:
+        return _resample_numpy(candles, timeframe, offset)
+    result = []
+    current = None
+    for candle in candles:
+        start = bucket_start(candle.time, timeframe, offset)
+        if current is None or current.time != start:
+            current = Candle(start, candle.open, candle.close, candle.high, candle.low, candle.ticks or 0)
+            result.append(current)
+        else:
+            current.close = candle.close
+            current.high = max(current.high, candle.high)
+            current.low = min(current.low, candle.low)
+            current.ticks += candle.ticks or 0
+    return result
+
+
+def _resample_numpy(candles, timeframe, offset):
+    count = len(candles)
+    times = np.fromiter((c.time for c in candles), dtype=np.int64, count=count)
+    opens = np.fromiter((c.open for c in candles), dtype=np.float64, count=count)
+    closes = np.fromiter((c.close for c in candles), dtype=np.float64, count=count)
+    highs = np.fromiter((c.high for c in candles), dtype=np.float64, count=count)
+    lows = np.fromiter((c.low for c in candles), dtype=np.float64, count=count)
+    ticks = np.fromiter((c.ticks or 0 for c in candles), dtype=np.int64, count=count)
+    columns = resample_columns(times, opens, closes, highs, lows, ticks, timeframe, offset)
+    return [Candle(*row) for row in zip(*(column.tolist() for column in columns))]
+
+
+def resample_columns(times, opens, closes, highs, lows, ticks, timeframe, offset=0):
+    """Vectorized resample of column arrays, returns the same six columns."""
+    buckets = (times - offset) // timeframe * timeframe + offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    return (
+        buckets[starts],
+        opens[starts],
+        closes[ends],
+        np.maximum.reduceat(highs, starts),
+        np.minimum.reduceat(lows, starts),
+        np.add.reduceat(ticks, starts),
+    )
+
+
+class Resampler(object):
+    """Base candles of one asset with derived timeframes kept up to date.
+
+    :param int base_period: Period of the fetched base candles.
+    :param int maxlen: Bars kept per timeframe, grown by :meth:`load` to
+        hold the loaded history.
+    """
+
+    def __init__(self, asset, base_period=60, offset=0, maxlen=5000):
+        self.asset = asset
+        self.base_period = base_period
+        self.offset = offset
+        self.maxlen = maxlen
+        self.base = deque(maxlen=maxlen)
+        self.span = 0
+        self.frames = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return bool(self.base)
+
+    def covers(self, span):
+        """Whether the loaded base history spans at least ``span`` seconds."""
+        return self.loaded and self.span >= span
+
+    def load(self, candles, span=None):
+        """Replace the base history and rebuild every derived timeframe.
+
+        :param int span: Seconds of history ``candles`` were fetched for.
+        """
+        candles = sorted(candles, key=lambda c: c.time)
+        with self._lock:
+            self.maxlen = max(self.maxlen, len(candles) + len(candles) // 4)
+            self.base = deque(candles, maxlen=self.maxlen)
+            self.span = (span or len(candles) * self.base_period) if candles else 0
+            for timeframe in self.frames:
+                self._rebuild(timeframe)
+
+    def add_timeframe(self, timeframe):
+        if timeframe % self.base_period:
+            raise ValueError(f"{timeframe}s is not a multiple of the {self.base_period}s base")
+        with self._lock:
+            if timeframe not in self.frames:
+                self._rebuild(timeframe)
+
+    def _rebuild(self, timeframe):
+        self.frames[timeframe] = deque(resample(list(self.base), timeframe, self.offset), maxlen=self.maxlen)
+
+    def on_tick(self, timestamp, price):
+        with self._lock:
+            self._fold(self.base, self.base_period, timestamp, price)
+            for timeframe, bars in self.frames.items():
+                self._fold(bars, timeframe, timestamp, price)
+
+    def _fold(self, bars, timeframe, timestamp, price):
+        start = bucket_start(timestamp, timeframe, self.offset)
+        if bars and bars[-1].time == start:
+            bars[-1].update(price)
+        elif not bars or bars[-1].time < start:
+            bars.append(Candle(start, price, price, price, price, 1))
+
+    def candles(self, timeframe, count=None):
+        """Bars of ``timeframe`` oldest first, the last one may still be open."""
+        if timeframe == self.base_period:
+            bars = self.base
+        else:
+            self.add_timeframe(timeframe)
+            bars = self.frames[timeframe]
+        with self._lock:
+            bars = list(bars)
+        return bars[-count:] if count else bars
+
+
+class Resamplers(object):
+    """Registry of resamplers fed with live ticks by the frame listener."""
+
+    def __init__(self):
+        self.resamplers = {}
+
+    def get(self, asset, base_period=60):
+        resampler = self.resamplers.get(asset)
+        if resampler is None or resampler.base_period != base_period:
+            resampler = self.resamplers[asset] = Resampler(asset, base_period)
+        return resampler
+
+    def discard(self, asset):
+        self.resamplers.pop(asset, None)
+
+    def on_frame(self, event, payload):
+        if not self.resamplers or not isinstance(payload, list):
+            return
+        for tick in payload:
+            if isinstance(tick, list) and len(tick) >= 3:
+                resampler = self.resamplers.get(tick[0])
+                if resampler is not None and resampler.loaded:
+                    resampler.on_tick(tick[1], tick[2])
@@ -0,0 +1,174 @@
+"""Pre-trade risk checks for the order path.
+
+Every figure a check needs is kept as a running total, either by the
+:class:`Ledger` (exposure and open positions, from order acknowledgements
+and settlements) or here (today's realized P&L and orders approved but
+not yet acknowledged), so an approval is a handful of dict lookups.
+Every approved order holds a reservation until it is released exactly
+once: by its order acknowledgement, by the caller once the order was
+acknowledged or failed, or when it expires.
+"""
+import time
+import itertools
+import threading
+from collections import defaultdict
+from .ledger import DEMO, LIVE, account_name
+
+
+class RiskLimits(object):
+    """Limits of one account, ``None`` disables a rule.
+
+    :param float max_order_amount: Largest single order.
+    :param float max_asset_exposure: Open amount allowed per asset.
+    :param float max_total_exposure: Open amount allowed across assets.
+    :param int max_open_positions: Concurrent open positions.
+    :param float max_daily_loss: Stop trading once today's realized loss reaches it.
+    """
+    __slots__ = ("max_order_amount", "max_asset_exposure", "max_total_exposure",
+                 "max_open_positions", "max_daily_loss")
+
+    def __init__(self, max_order_amount=None, max_asset_exposure=None, max_total_exposure=None,
+                 max_open_positions=None, max_daily_loss=None):
+        self.max_order_amount = max_order_amount
+        self.max_asset_exposure = max_asset_exposure
+        self.max_total_exposure = max_total_exposure
+        self.max_open_positions = max_open_positions
+        self.max_daily_loss = max_daily_loss
+
+
+class RiskEngine(object):
+    """Approve or reject orders against per account :class:`RiskLimits`.
+
+    :param float reservation_timeout: Seconds after which a reservation
+        whose order was never acknowledged nor released is dropped.
+    """
+
+    def __init__(self, reservation_timeout=60.0):
+        self.limits = {DEMO: RiskLimits(), LIVE: RiskLimits()}
+        self.ledger = None
+        self.reservation_timeout = reservation_timeout
+        self.day = _today()
+        self.daily_pnl = {DEMO: 0.0, LIVE: 0.0}
+        self.rejections = defaultdict(int)
+        self.reservations = {}
+        self._by_request = defaultdict(list)
+        self._tokens = itertools.count(1)
+        self._pending = {DEMO: defaultdict(float), LIVE: defaultdict(float)}
+        self._pending_total = {DEMO: 0.0, LIVE: 0.0}
+        self._pending_count = {DEMO: 0, LIVE: 0}
+        self._lock = threading.Lock()
+
+    def attach(self, ledger):
+        """Follow the ledger of a (new) API connection."""
+        if self.ledger is not None:
+            self.ledger.remove_listener(self.on_ledger)
+        self.ledger = ledger
+        ledger.add_listener(self.on_ledger)
+
+    def set_limits(self, account, **limits):
+        self.limits[account] = RiskLimits(**limits)
+        return self.limits[account]
+
+    def approve(self, amount, asset, request_id=None, account=None):
+        """Return ``(True, reservation)`` or ``(False, reason)``.
+
+        :param request_id: Request id sent with the order, its
+            acknowledgement releases the reservation.
+        """
+        ledger = self.ledger
+        account = account or (ledger.account if ledger else DEMO)
+        limits = self.limits[account]
+        with self._lock:
+            self._expire(time.monotonic())
+            if self.day != _today():
+                self.day = _today()
+                self.daily_pnl = {DEMO: 0.0, LIVE: 0.0}
+            reason = None
+            if limits.max_order_amount is not None and amount > limits.max_order_amount:
+                reason = "max_order_amount"
+            elif limits.max_daily_loss is not None and -self.daily_pnl[account] >= limits.max_daily_loss:
+                reason = "max_daily_loss"
+            elif ledger is not None:
+                if limits.max_open_positions is not None and (
+                        ledger.open_count[account] + self._pending_count[account] >= limits.max_open_positions):
+                    reason = "max_open_positions"
+                elif limits.max_asset_exposure is not None and (
+                        ledger.exposure[account].get(asset, 0.0) + self._pending[account][asset] + amount
+                        > limits.max_asset_exposure):
+                    reason = "max_asset_exposure"
+                elif limits.max_total_exposure is not None and (
+                        ledger.exposure_total[account] + self._pending_total[account] + amount
+                        > limits.max_total_exposure):
+                    reason = "max_total_exposure"
+            if reason:
+                self.rejections[reason] += 1
+                return False, reason
+            reservation = next(self._tokens)
+            request_id = None if request_id is None else str(request_id)
+            self.reservations[reservation] = (
+                account, asset, amount, time.monotonic() + self.reservation_timeout, request_id)
+            if request_id is not None:
+                self._by_request[request_id].append(reservation)
+            self._pending[account][asset] += amount
+            self._pending_total[account] += amount
+            self._pending_count[account] += 1
+        return True, reservation
+
+    def release(self, reservation):
+        """Drop the reservation of an acknowledged or failed order, a no-op when already released."""
+        with self._lock:
+            return self._release(reservation)
+
+    def release_request(self, request_id):
+        """Release the oldest open reservation made under ``request_id``."""
+        with self._lock:
+            for reservation in list(self._by_request.get(str(request_id), ())):
+                if self._release(reservation):
+                    return True
+            return False
+
+    def _release(self, reservation):
+        entry = self.reservations.pop(reservation, None)
+        if entry is None:
+            return False
+        account, asset, amount, _, request_id = entry
+        if request_id is not None:
+            tokens = self._by_request[request_id]
+            tokens.remove(reservation)
+            if not tokens:
+                del self._by_request[request_id]
+        self._pending[account][asset] -= amount
+        if self._pending[account][asset] <= 1e-9:
+            del self._pending[account][asset]
+        self._pending_total[account] = max(0.0, self._pending_total[account] - amount)
+        self._pending_count[account] -= 1
+        return True
+
+    def _expire(self, now):
+        for reservation in [key for key, value in self.reservations.items() if value[3] <= now]:
+            self._release(reservation)
+
+    def on_ledger(self, kind, data):
+        if kind == "open":
+            if data.request_id is not None:
+                self.release_request(data.request_id)
+        elif kind == "close":
+            account = account_name(data.get("isDemo", self.ledger.account == DEMO))
+            with self._lock:
+                if self.day != _today():
+                    self.day = _today()
+                    self.daily_pnl = {DEMO: 0.0, LIVE: 0.0}
+                self.daily_pnl[account] += float(data.get("profit") or 0)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "daily_pnl": dict(self.daily_pnl),
+                "pending": {account: dict(values) for account, values in self._pending.items()},
+                "reservations": len(self.reservations),
+                "rejections": dict(self.rejections),
+            }
+
+
+def _today():
+    return int(time.time() // 86400)
@@ -0,0 +1,244 @@
+"""Process pool strategy runner fed by one shared Quotex connection.
+
+The main process keeps the only broker session. Ticks and closed candles
+received on the websocket thread are published into a shared memory ring
+buffer that every worker process reads with its own cursor; order
+intents returned by the strategies travel back over a queue and are sent
+through :meth:`Quotex.buy` by the main process.
+"""
+import time
+import queue
+import struct
+import asyncio
+import logging
+import multiprocessing
+from collections import namedtuple
+from multiprocessing import shared_memory
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TICK = 1
+CANDLE = 2
+
+HEADER = struct.Struct("<Q")
+RECORD = struct.Struct("<BxHIdddddd")
+
+MarketEvent = namedtuple(
+    "MarketEvent",
+    ["kind", "asset", "period", "time", "open", "high", "low", "close", "ticks"]
+)
+
+
+class RingBuffer(object):
+    """Single producer, multi consumer ring of fixed size market records.
+
+    The header holds the total number of records ever written. Readers
+    keep their own position and detect overruns by comparing it with the
+    write sequence before and after copying a record out. The slot of
+    record ``sequence - capacity`` is the one the producer overwrites next,
+    so only the ``capacity - 1`` records before ``sequence`` are readable.
+    """
+
+    def __init__(self, capacity=65536, name=None):
+        self.capacity = capacity
+        size = HEADER.size + capacity * RECORD.size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            HEADER.pack_into(self.shm.buf, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    @property
+    def sequence(self):
+        return HEADER.unpack_from(self.shm.buf, 0)[0]
+
+    def publish(self, kind, asset_id, period, timestamp, open_, high, low, close, ticks=0):
+        sequence = HEADER.unpack_from(self.shm.buf, 0)[0]
+        offset = HEADER.size + (sequence % self.capacity) * RECORD.size
+        RECORD.pack_into(
+            self.shm.buf, offset, kind, asset_id, period,
+            timestamp, open_, high, low, close, ticks
+        )
+        HEADER.pack_into(self.shm.buf, 0, sequence + 1)
+
+    def read(self, position, limit=1024):
+        """Return ``(records, new_position, lost)`` starting at ``position``."""
+        sequence = HEADER.unpack_from(self.shm.buf, 0)[0]
+        lost = 0
+        if sequence - position >= self.capacity:
+            lost = sequence - self.capacity + 1 - position
+            position += lost
+        end = min(sequence, position + limit)
+        records = []
+        for index in range(position, end):
+            offset = HEADER.size + (index % self.capacity) * RECORD.size
+            records.append(RECORD.unpack_from(self.shm.buf, offset))
+        sequence = HEADER.unpack_from(self.shm.buf, 0)[0]
+        if sequence - position >= self.capacity:
+            # The producer lapped us while copying; the oldest records may be torn.
+            overwritten = min(len(records), sequence - self.capacity + 1 - position)
+            records = records[overwritten:]
+            lost += overwritten
+        return records, end, lost
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _worker_main(strategy, ring_name, capacity, assets, intents, stop):
+    ring = RingBuffer(capacity, name=ring_name)
+    position = ring.sequence
+    idle = 0
+    try:
+        while not stop.is_set():
+            records, position, lost = ring.read(position)
+            if lost:
+                logger.warning("Strategy worker lagged behind by %s records", lost)
+            if not records:
+                idle += 1
+                time.sleep(0.0005 if idle < 100 else 0.005)
+                continue
+            idle = 0
+            for kind, asset_id, period, timestamp, open_, high, low, close, ticks in records:
+                event = MarketEvent(
+                    kind, assets[asset_id], period, timestamp,
+                    open_, high, low, close, int(ticks)
+                )
+                result = strategy(event)
+                if not result:
+                    continue
+                for intent in result if isinstance(result, list) else [result]:
+                    intents.put(intent)
+    finally:
+        ring.close()
+
+
+class StrategyRunner(object):
+    """Run CPU heavy strategies in worker processes.
+
+    :param client: The connected :class:`Quotex` instance.
+    :param strategies: Picklable callables receiving a :class:`MarketEvent`
+        and returning ``None``, an order intent dict or a list of them.
+        Intents use the keyword names of :meth:`Quotex.buy`.
+    :param assets: The asset names that will be published.
+    :param periods: Candle periods to build from ticks and publish on close.
+    :param int max_restarts: Crashed workers restarted in total before a
+        crashed worker is dropped instead.
+    """
+
+    def __init__(self, client, strategies, assets, periods=(60,), capacity=65536, max_restarts=3):
+        self.client = client
+        self.strategies = list(strategies)
+        self.assets = list(assets)
+        self.asset_ids = {asset: index for index, asset in enumerate(self.assets)}
+        self.periods = tuple(periods)
+        self.capacity = capacity
+        self.ring = None
+        self.processes = []
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.results = []
+        self._strategies = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._intents = self._context.Queue()
+        self._stop = self._context.Event()
+        self._candles = {}
+
+    def start(self):
+        self.ring = RingBuffer(self.capacity)
+        for strategy in self.strategies:
+            self._spawn(strategy)
+        self.client.add_frame_listener(self.on_frame)
+        for asset in self.assets:
+            self.client.start_candles_stream(asset, self.periods[0] if self.periods else 0)
+
+    def _spawn(self, strategy):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(strategy, self.ring.name, self.capacity, self.assets, self._intents, self._stop),
+            daemon=True
+        )
+        process.start()
+        self.processes.append(process)
+        self._strategies[process] = strategy
+
+    def check_workers(self):
+        """Restart or drop workers that exited, returns the number still running."""
+        for process in [process for process in self.processes if not process.is_alive()]:
+            self.processes.remove(process)
+            strategy = self._strategies.pop(process)
+            logger.warning("Strategy worker %s exited with code %s", process.name, process.exitcode)
+            if process.exitcode != 0 and self.restarts < self.max_restarts:
+                self.restarts += 1
+                self._spawn(strategy)
+        return len(self.processes)
+
+    def stop(self):
+        self.client.remove_frame_listener(self.on_frame)
+        self._stop.set()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.processes = []
+        self._strategies = {}
+        if self.ring:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+
+    def on_frame(self, event, payload):
+        if not isinstance(payload, list):
+            return
+        for tick in payload:
+            if isinstance(tick, list) and len(tick) >= 3 and tick[0] in self.asset_ids:
+                self.publish_tick(tick[0], tick[1], tick[2])
+
+    def publish_tick(self, asset, timestamp, price):
+        asset_id = self.asset_ids[asset]
+        self.ring.publish(TICK, asset_id, 0, timestamp, price, price, price, price, 1)
+        for period in self.periods:
+            self._update_candle(asset_id, period, timestamp, price)
+
+    def _update_candle(self, asset_id, period, timestamp, price):
+        start = int(timestamp // period * period)
+        candle = self._candles.get((asset_id, period))
+        if candle is None or candle[0] != start:
+            if candle is not None:
+                self.ring.publish(CANDLE, asset_id, period, *candle)
+            self._candles[(asset_id, period)] = [start, price, price, price, price, 1]
+            return
+        candle[2] = max(candle[2], price)
+        candle[3] = min(candle[3], price)
+        candle[4] = price
+        candle[5] += 1
+
+    async def route_intents(self):
+        """Send worker order intents through the shared connection.
+
+        Returns once every worker has exited and could not be restarted.
+        """
+        while self.check_workers():
+            if metrics.enabled:
+                try:
+                    metrics.set_gauge("queue_depth", "strategy_intents", self._intents.qsize())
+                except NotImplementedError:
+                    pass
+            while True:
+                try:
+                    intent = self._intents.get_nowait()
+                except queue.Empty:
+                    break
+                result = await self.client.buy(**intent)
+                self.results.append((intent, result))
+            await asyncio.sleep(0.01)
+
+    async def run(self):
+        self.start()
+        try:
+            await self.route_intents()
+        finally:
+            self.stop()
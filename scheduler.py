@@ -0,0 +1,206 @@
+"""Scheduled order entries fired at candle boundaries.
+
+Entries are prepared ahead of time (frame built, profile offset already
+known) and parked in a hashed timing wheel with one second slots. When
+the wheel reaches a slot its entries are armed with ``loop.call_at`` for
+their exact target, so hundreds of pending entries cost one wheel tick
+per second plus one timer per distinct fire time.
+
+Entries fire ``lead`` seconds early so the frame reaches the server by
+its target; by default the lead follows the round trips measured by the
+connection's :class:`LatencyMonitor`.
+"""
+import time
+import asyncio
+import logging
+from . import expiration
+
+logger = logging.getLogger(__name__)
+
+# Lead in seconds used until round trips have been measured, and its floor.
+DEFAULT_LEAD = 0.5
+
+
+class ScheduledEntry(object):
+    __slots__ = ("asset", "direction", "amount", "duration", "target", "fire_at", "kind",
+                 "frame", "open_time", "fired_at", "cancelled", "result", "handle")
+
+    def __init__(self, asset, direction, amount, duration, target, kind, frame=None, open_time=None):
+        self.asset = asset
+        self.direction = direction
+        self.amount = amount
+        self.duration = duration
+        self.target = target
+        self.fire_at = target
+        self.kind = kind
+        self.frame = frame
+        self.open_time = open_time
+        self.fired_at = None
+        self.cancelled = False
+        self.result = None
+        self.handle = None
+
+    @property
+    def lag(self):
+        """Seconds between the planned fire time and the moment the entry fired."""
+        return None if self.fired_at is None else self.fired_at - self.fire_at
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class OrderScheduler(object):
+    """Fire pre-built order entries at exact wall clock times.
+
+    :param client: The connected :class:`Quotex` instance.
+    :param float lead: Seconds before the target at which frames are
+        sent. ``None`` uses the p90 round trip of the latency monitor,
+        never less than :data:`DEFAULT_LEAD`.
+    :param int slots: Size of the timing wheel in one second slots.
+    """
+
+    def __init__(self, client, lead=None, slots=512):
+        self.client = client
+        self.lead = lead
+        self.slots = slots
+        self.wheel = [[] for _ in range(slots)]
+        self.fired = []
+        self.armed = set()
+        self.pending = 0
+        self._loop = None
+        self._tick_handle = None
+        self._processed = None
+
+    async def schedule(self, amount, asset, direction, duration, at=None, period=None, kind="pending"):
+        """Prepare an entry and park it in the wheel.
+
+        :param at: Wall clock target. Defaults to the boundary ``open_pending``
+            would pick for a pending entry, one ``period`` past the next one,
+            and to the first boundary at least :meth:`current_lead` away for a buy.
+        :param period: Candle period used to find the boundary (defaults to duration).
+        :param str kind: ``"pending"`` sends a pre-built ``pending/create``
+            frame and follows the instrument once it is accepted; ``"buy"``
+            places a market order through ``Quotex.buy``.
+        """
+        period = period or duration
+        if at:
+            target = at
+        elif kind == "pending":
+            target = expiration.get_next_boundary(time.time(), period) + period
+        else:
+            target = expiration.get_next_boundary(time.time() + self.current_lead(), period)
+        entry = ScheduledEntry(asset, direction, amount, duration, target, kind)
+        if kind == "pending":
+            entry.open_time = expiration.format_open_time(target, await self.client.get_time_offset())
+            entry.frame = self.client.api.pending_frame(amount, asset, direction, duration, entry.open_time)
+        self.add(entry)
+        return entry
+
+    def add(self, entry):
+        self._loop = self._loop or asyncio.get_running_loop()
+        entry.fire_at = entry.target - self.current_lead()
+        self.pending += 1
+        if int(entry.fire_at) <= int(time.time()) + 1:
+            self._arm(entry)
+        else:
+            self.wheel[int(entry.fire_at) % self.slots].append(entry)
+        if self._tick_handle is None:
+            self._processed = int(time.time()) + 1 if self._processed is None else self._processed
+            self._schedule_tick()
+
+    def current_lead(self):
+        """Seconds entries are fired ahead of their target."""
+        if self.lead is not None:
+            return self.lead
+        monitor = self.client.api.rtt_monitor
+        stats = monitor.stats() if monitor is not None else {"count": 0}
+        return max(DEFAULT_LEAD, stats["p90"]) if stats["count"] else DEFAULT_LEAD
+
+    def _schedule_tick(self):
+        now = time.time()
+        delay = int(now) + 1 - now
+        self._tick_handle = self._loop.call_at(self._loop.time() + delay, self._tick)
+
+    def _tick(self):
+        """Advance the wheel: arm every entry due within the next second.
+
+        Every slot since the last processed one is swept, so entries whose
+        slot was skipped while the loop stalled fire late instead of a
+        full wheel turn later.
+        """
+        self._tick_handle = None
+        horizon = int(time.time()) + 1
+        for second in range(max(self._processed + 1, horizon - self.slots + 1), horizon + 1):
+            slot = self.wheel[second % self.slots]
+            keep = []
+            for entry in slot:
+                if entry.cancelled:
+                    self.pending -= 1
+                elif int(entry.fire_at) <= horizon:
+                    self._arm(entry)
+                else:
+                    keep.append(entry)
+            self.wheel[second % self.slots] = keep
+        self._processed = max(self._processed, horizon)
+        if self.pending:
+            self._schedule_tick()
+        else:
+            self._processed = None
+
+    def _arm(self, entry):
+        delay = entry.fire_at - time.time()
+        entry.handle = self._loop.call_at(self._loop.time() + max(delay, 0), self._fire, entry)
+        self.armed.add(entry)
+
+    def _fire(self, entry):
+        self.armed.discard(entry)
+        self.pending -= 1
+        if entry.cancelled:
+            return
+        entry.fired_at = time.time()
+        api = self.client.api
+        if entry.kind == "pending":
+            previous = api.pending_id
+            api.send_websocket_request(entry.frame)
+            entry.result = asyncio.ensure_future(self._follow(entry, previous))
+        else:
+            entry.result = asyncio.ensure_future(
+                self.client.buy(entry.amount, entry.asset, entry.direction, entry.duration)
+            )
+        self.fired.append(entry)
+        logger.debug("Fired %s %s at %+.4fs from target", entry.kind, entry.asset, entry.lag)
+
+    async def _follow(self, entry, previous):
+        """Wait for the pending order ticket and follow the instrument, as ``open_pending`` does."""
+        api = self.client.api
+        deadline = time.time() + entry.duration
+        while api.pending_id in (None, previous):
+            if time.time() > deadline:
+                return False
+            await asyncio.sleep(0.2)
+        api.instruments_follow(entry.amount, entry.asset, entry.direction, entry.duration, entry.open_time)
+        return True
+
+    def lag_report(self):
+        """Summary of how far fire times landed from their targets."""
+        lags = sorted(abs(entry.lag) for entry in self.fired)
+        if not lags:
+            return {"fired": 0}
+        return {
+            "fired": len(lags),
+            "mean": sum(lags) / len(lags),
+            "p50": lags[len(lags) // 2],
+            "p99": lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+            "max": lags[-1],
+        }
+
+    def cancel_all(self):
+        """Cancel every entry, including those already armed for this second."""
+        for slot in self.wheel:
+            for entry in slot:
+                entry.cancel()
+        for entry in list(self.armed):
+            entry.cancel()
+            entry.handle.cancel()
+            self.armed.discard(entry)
+            self.pending -= 1
@@ -0,0 +1,61 @@
+"""Early close of many options at once.
+
+Every ticket gets its own ``orders/cancel`` frame, sent back to back,
+and each response is matched to its ticket by the ``ticket`` field the
+server echoes, so concurrent closes never read each other's answer.
+"""
+import time
+import asyncio
+from .records import SellResult
+from .ratelimit import ORDERS
+
+
+class OptionSeller(object):
+    """Send early close requests and route responses by ticket."""
+
+    def __init__(self, api):
+        self.api = api
+        self.pending = {}
+
+    async def sell_many(self, tickets, timeout=10.0):
+        """Close ``tickets`` and yield a :class:`SellResult` per ticket as responses arrive."""
+        self.api.enable("seller")
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for ticket in dict.fromkeys(tickets):
+            future = loop.create_future()
+            futures[future] = ticket
+            self.pending[ticket] = (loop, future, time.perf_counter())
+        try:
+            for ticket in futures.values():
+                await self.api.rate_limiter.wait(ORDERS)
+                self.api.send_websocket_request(self.api.sell_frame(ticket))
+            waiting = set(futures)
+            deadline = loop.time() + timeout
+            while waiting:
+                done, waiting = await asyncio.wait(
+                    waiting, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for future in done:
+                    response, latency = future.result()
+                    yield SellResult(futures[future], response, latency)
+            for future in waiting:
+                yield SellResult(futures[future], None, None, "timeout")
+        finally:
+            for ticket in futures.values():
+                self.pending.pop(ticket, None)
+
+    def on_frame(self, event, payload):
+        if not self.pending or not isinstance(payload, dict):
+            return
+        entry = self.pending.get(payload.get("ticket"))
+        if entry is not None:
+            loop, future, sent = entry
+            loop.call_soon_threadsafe(_resolve, future, (payload, time.perf_counter() - sent))
+
+
+def _resolve(future, result):
+    if not future.done():
+        future.set_result(result)
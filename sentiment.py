@@ -0,0 +1,138 @@
+"""Timestamped trader sentiment history with rolling statistics."""
+import math
+import time
+import threading
+from array import array
+
+
+class SentimentSeries(object):
+    """Fixed capacity ring of ``(time, buy %)`` samples for one asset.
+
+    Mean and variance over the last ``window`` samples are maintained
+    incrementally on every push, so reading them is O(1).
+    """
+
+    def __init__(self, capacity=3600, window=60):
+        self.capacity = capacity
+        self.window = min(window, capacity)
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _at(self, back):
+        """Value ``back`` samples before the newest one."""
+        return self.values[(self.count - 1 - back) % self.capacity]
+
+    def push(self, timestamp, value):
+        if self.count >= self.window:
+            old = self._at(self.window - 1)
+            self._sum -= old
+            self._sum_sq -= old * old
+        index = self.count % self.capacity
+        self.times[index] = timestamp
+        self.values[index] = value
+        self.count += 1
+        self._sum += value
+        self._sum_sq += value * value
+
+    @property
+    def last(self):
+        return self._at(0) if self.count else None
+
+    @property
+    def last_time(self):
+        return self.times[(self.count - 1) % self.capacity] if self.count else None
+
+    def mean(self):
+        size = min(self.count, self.window)
+        return self._sum / size if size else None
+
+    def std(self):
+        size = min(self.count, self.window)
+        if size < 2:
+            return None
+        mean = self._sum / size
+        return math.sqrt(max(self._sum_sq / size - mean * mean, 0.0))
+
+    def zscore(self):
+        std = self.std()
+        if not std:
+            return 0.0 if std == 0 else None
+        return (self.last - self.mean()) / std
+
+    def rate_of_change(self, period=10):
+        """Change of the value over the last ``period`` samples."""
+        if len(self) <= period:
+            return None
+        return self.last - self._at(period)
+
+    def history(self, size=None):
+        """Return up to ``size`` newest samples as ``(time, value)`` pairs, oldest first."""
+        size = min(len(self), size or len(self))
+        return [
+            (self.times[(self.count - 1 - back) % self.capacity], self._at(back))
+            for back in range(size - 1, -1, -1)
+        ]
+
+    def stats(self, period=10):
+        return {
+            "time": self.last_time,
+            "value": self.last,
+            "mean": self.mean(),
+            "std": self.std(),
+            "zscore": self.zscore(),
+            "roc": self.rate_of_change(period),
+            "samples": len(self),
+        }
+
+
+class SentimentStore(object):
+    """Sentiment series for every asset, fed by the frame listener.
+
+    Sentiment frames carry ``{"asset": ..., "sentiment": {"buy": %,
+    "sell": %}}``; the buy percentage is tracked.
+    """
+
+    def __init__(self, capacity=3600, window=60):
+        self.capacity = capacity
+        self.window = window
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def get(self, asset):
+        series = self.series.get(asset)
+        if series is None:
+            with self._lock:
+                series = self.series.setdefault(asset, SentimentSeries(self.capacity, self.window))
+        return series
+
+    def push(self, asset, value, timestamp=None):
+        self.get(asset).push(timestamp or time.time(), float(value))
+
+    def on_frame(self, event, payload):
+        if not isinstance(payload, dict):
+            return
+        sentiment = payload.get("sentiment")
+        asset = payload.get("asset")
+        if asset and isinstance(sentiment, dict) and sentiment.get("buy") is not None:
+            self.push(asset, sentiment["buy"], payload.get("time"))
+
+    def latest(self):
+        return {asset: series.last for asset, series in self.series.items() if series.count}
+
+    def extremes(self, count=5, key="zscore"):
+        """Return the ``count`` assets with the largest absolute ``key`` statistic."""
+        ranked = []
+        for asset, series in list(self.series.items()):
+            if not series.count:
+                continue
+            stats = series.stats()
+            if stats[key] is not None:
+                ranked.append((abs(stats[key]), asset, stats))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return [dict(stats, asset=asset) for _, asset, stats in ranked[:count]]
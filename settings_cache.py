@@ -0,0 +1,80 @@
+"""Profile and chart settings cache kept fresh by websocket pushes."""
+import time
+
+PROFILE_FIELDS = {
+    "nickname": "nick_name",
+    "id": "profile_id",
+    "demoBalance": "demo_balance",
+    "liveBalance": "live_balance",
+    "avatar": "avatar",
+    "currencyCode": "currency_code",
+    "country": "country",
+    "countryName": "country_name",
+    "currencySymbol": "currency_symbol",
+    "timeOffset": "offset",
+}
+
+
+class SettingsCache(object):
+    """Keep the :class:`Profile` object and last chart settings in memory.
+
+    The profile is considered fresh for ``ttl`` seconds after an HTTP
+    refresh or any websocket push that carries profile fields.
+
+    :param profile: The shared :class:`Profile` instance to update.
+    :param float ttl: Seconds before the profile is fetched again.
+    """
+
+    def __init__(self, profile, ttl=300):
+        self.profile = profile
+        self.ttl = ttl
+        self.updated_at = None
+        self.stored_settings = None
+
+    def is_fresh(self):
+        return self.updated_at is not None and time.monotonic() - self.updated_at < self.ttl
+
+    def invalidate(self):
+        self.updated_at = None
+
+    def apply(self, data):
+        """Copy the known profile keys of ``data`` onto the profile."""
+        profile = self.profile
+        found = False
+        for key, attribute in PROFILE_FIELDS.items():
+            if key in data:
+                setattr(profile, attribute, data[key])
+                found = True
+        if found:
+            self.updated_at = time.monotonic()
+        return found
+
+    def settings_changed(self, payload):
+        """Return ``True`` when a ``settings/store`` payload differs from the last one sent.
+
+        Outside fast options ``currentExpirationTime`` follows the wall
+        clock and is ignored; for fast options it is the chosen expiry.
+        """
+        return _comparable(payload["settings"]) != self.stored_settings
+
+    def settings_sent(self, payload):
+        """Remember ``payload`` once its ``settings/store`` frame went out."""
+        self.stored_settings = _comparable(payload["settings"])
+
+    def on_frame(self, event, payload):
+        if not isinstance(payload, dict):
+            return
+        if "timeOffset" in payload or "nickname" in payload:
+            self.apply(payload)
+        else:
+            if "demoBalance" in payload:
+                self.profile.demo_balance = payload["demoBalance"]
+            if "liveBalance" in payload:
+                self.profile.live_balance = payload["liveBalance"]
+
+
+def _comparable(settings):
+    settings = dict(settings)
+    if not settings.get("isFastOption"):
+        settings.pop("currentExpirationTime", None)
+    return settings
@@ -0,0 +1,204 @@
+"""Spread market data subscriptions over several websocket connections.
+
+Assets are assigned to shards with a consistent hash ring, so adding or
+removing a shard only moves the assets of that shard. Shard 0 is the
+client's own connection; every extra shard is a separate
+:class:`QuotexAPI` whose reader thread decodes its own frames and hands
+the market data among them (ticks, depth and sentiment) to the primary
+connection's frame listeners. The primary dispatches its own frames
+under the same lock, so streams, depth books and the ledger see a single
+merged pipeline, one frame at a time. Handshake, balance and order
+frames stay with the shard that received them.
+Extra shards share the primary's realtime price, candle and sentiment
+dicts, and a dropped shard is reconnected on its own while the others
+keep streaming.
+"""
+import bisect
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from .connection import READY, CLOSED, REJECTED
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SHARED_STATE = ("realtime_price", "realtime_candles", "realtime_sentiment", "candle_v2_data")
+
+
+class HashRing(object):
+    """Consistent hash ring with ``replicas`` virtual points per node."""
+
+    def __init__(self, nodes, replicas=160):
+        self.points = sorted(
+            (_hash(f"{node}:{replica}"), node) for node in nodes for replica in range(replicas)
+        )
+        self.hashes = [point for point, _ in self.points]
+
+    def node_for(self, key):
+        index = bisect.bisect(self.hashes, _hash(key)) % len(self.hashes)
+        return self.points[index][1]
+
+
+def market_data(event, payload):
+    """Whether a frame carries quotes any connection may deliver to the primary."""
+    if isinstance(payload, list):
+        return bool(payload) and isinstance(payload[0], list) and event != "instruments/list"
+    if isinstance(payload, dict):
+        return bool(event and event.startswith("depth")) or "sentiment" in payload
+    return False
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class Shard(object):
+
+    def __init__(self, index, api):
+        self.index = index
+        self.api = api
+        self.assets = {}
+        self.frames = 0
+        self.reconnects = 0
+        self.task = None
+
+
+class ShardedSubscriptions(object):
+    """Route ``follow``/``unfollow`` of assets to ``count`` websocket connections.
+
+    :param client: The connected :class:`Quotex` instance, its connection
+        is shard 0.
+    :param int count: Total number of connections.
+    """
+
+    def __init__(self, client, count=4, max_backoff=10.0):
+        self.client = client
+        self.count = count
+        self.max_backoff = max_backoff
+        self.ring = HashRing(range(count))
+        self.shards = [Shard(index, client.api if index == 0 else None) for index in range(count)]
+        self._merge_lock = threading.Lock()
+
+    @property
+    def primary(self):
+        return self.client.api
+
+    async def start(self):
+        """Connect every extra shard, closing the ones already up if one fails."""
+        if self.count > 1:
+            self.primary.frame_lock = self._merge_lock
+        try:
+            for shard in self.shards[1:]:
+                await self._connect(shard)
+                shard.task = asyncio.ensure_future(self._supervise(shard))
+        except BaseException:
+            await self.stop()
+            raise
+        return self
+
+    async def stop(self):
+        for shard in self.shards[1:]:
+            if shard.task is not None:
+                shard.task.cancel()
+                shard.task = None
+            if shard.api is not None:
+                api, shard.api = shard.api, None
+                await asyncio.to_thread(api.close)
+        self.primary.frame_lock = None
+
+    def relink(self):
+        """Point every shard at the current primary connection after it reconnected."""
+        self.shards[0].api = self.primary
+        if self.count > 1:
+            self.primary.frame_lock = self._merge_lock
+        for shard in self.shards[1:]:
+            if shard.api is not None:
+                self._share_state(shard.api)
+
+    def _share_state(self, api):
+        primary = self.primary
+        for name in SHARED_STATE:
+            setattr(api, name, getattr(primary, name))
+
+    def _link(self, shard, api):
+        self._share_state(api)
+
+        def forward(event, payload):
+            if not market_data(event, payload):
+                return
+            shard.frames += 1
+            self.primary.emit_frame(event, payload)
+
+        api.frame_listeners = [api.rate_limiter.on_frame, api.connection.on_frame, forward]
+
+    async def _connect(self, shard):
+        api = self.client._new_api()
+        self._link(shard, api)
+        try:
+            check, reason = await api.connect(self.client.account_is_demo)
+            if not check or await api.connection.wait((READY, REJECTED, CLOSED), 10) != READY:
+                raise ConnectionError(f"Shard {shard.index} failed to connect: {reason}")
+        except BaseException:
+            await asyncio.to_thread(api.close)
+            raise
+        shard.api = api
+        for asset, period in shard.assets.items():
+            _follow(api, asset, period)
+
+    async def _supervise(self, shard):
+        """Reconnect one shard after it drops, leaving the other shards alone."""
+        while True:
+            await shard.api.connection.wait((CLOSED, REJECTED))
+            logger.warning("Shard %s dropped (%s), reconnecting", shard.index, shard.api.connection.reason)
+            await asyncio.to_thread(shard.api.close)
+            attempt = 0
+            while True:
+                delay = min(self.max_backoff, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect(shard)
+                    break
+                except Exception as error:
+                    logger.warning("%s", error)
+                    attempt += 1
+            shard.reconnects += 1
+            if metrics.enabled:
+                metrics.inc("reconnects_total", f"shard{shard.index}")
+
+    def shard_for(self, asset):
+        return self.shards[self.ring.node_for(asset)]
+
+    def follow(self, asset, period):
+        """Subscribe ``asset`` on its shard, or when that shard connects."""
+        shard = self.shard_for(asset)
+        shard.assets[asset] = period
+        if shard.api is not None:
+            _follow(shard.api, asset, period)
+        return shard.index
+
+    def unfollow(self, asset):
+        shard = self.shard_for(asset)
+        shard.assets.pop(asset, None)
+        if shard.api is not None:
+            shard.api.unsubscribe_realtime_candle(asset)
+            shard.api.unfollow_candle(asset)
+
+    def stats(self):
+        return [
+            {
+                "shard": shard.index,
+                "assets": sorted(shard.assets),
+                "frames": shard.frames,
+                "reconnects": shard.reconnects,
+                "state": shard.api.connection.state if shard.api else None,
+            }
+            for shard in self.shards
+        ]
+
+
+def _follow(api, asset, period):
+    api.subscribe_realtime_candle(asset, period)
+    api.chart_notification(asset)
+    api.follow_candle(asset)
@@ -0,0 +1,150 @@
+"""Indexed signal store with async fan-out to consumers."""
+import time
+import heapq
+import bisect
+import asyncio
+import logging
+import threading
+from collections import defaultdict, deque
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Signal(object):
+    __slots__ = ("asset", "direction", "timeframe", "time", "expires", "received")
+
+    def __init__(self, asset, direction, timeframe, time_, received):
+        self.asset = asset
+        self.direction = direction
+        self.timeframe = timeframe
+        self.time = time_
+        self.expires = time_ + (timeframe or 0)
+        self.received = received
+
+    def __lt__(self, other):
+        return self.time < other.time
+
+    def __repr__(self):
+        return f"Signal({self.asset!r}, {self.direction!r}, {self.timeframe}, {self.time})"
+
+
+def _time(signal):
+    return signal.time
+
+
+class SignalStore(object):
+    """Signals indexed by asset, timeframe and time.
+
+    Frames from ``signal/subscribe`` carry ``{"signals": [[asset,
+    [{"signal": direction, "timeFrame": seconds}, ...], time], ...]}``.
+    A signal expires ``timeFrame`` seconds after its time and is dropped
+    from the index on the next insert or query.
+    """
+
+    def __init__(self, latency_window=1000):
+        self.index = defaultdict(lambda: defaultdict(list))
+        self.latencies = deque(maxlen=latency_window)
+        self._expiry = []
+        self._consumers = []
+        self._queue = None
+        self._loop = None
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def add(self, signal):
+        now = time.time()
+        if signal.expires <= now:
+            return False
+        with self._lock:
+            bisect.insort(self.index[signal.asset][signal.timeframe], signal)
+            heapq.heappush(self._expiry, (signal.expires, id(signal), signal))
+            self._expire(now)
+        queue = self._queue
+        if queue is not None:
+            self._loop.call_soon_threadsafe(queue.put_nowait, signal)
+        return True
+
+    def _expire(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            _, _, signal = heapq.heappop(self._expiry)
+            series = self.index[signal.asset][signal.timeframe]
+            position = bisect.bisect_left(series, signal)
+            while position < len(series) and series[position] is not signal:
+                position += 1
+            if position < len(series):
+                del series[position]
+
+    def get(self, asset, timeframe=None, start=None, end=None):
+        """Return live signals for ``asset`` in time order, optionally filtered."""
+        with self._lock:
+            self._expire(time.time())
+            frames = [timeframe] if timeframe is not None else list(self.index[asset])
+            result = []
+            for frame in frames:
+                series = self.index[asset].get(frame, [])
+                low = 0 if start is None else bisect.bisect_left(series, start, key=_time)
+                high = len(series) if end is None else bisect.bisect_right(series, end, key=_time)
+                result.extend(series[low:high])
+        result.sort()
+        return result
+
+    def latest(self, asset, timeframe):
+        series = self.get(asset, timeframe)
+        return series[-1] if series else None
+
+    def on_frame(self, event, payload):
+        if not isinstance(payload, dict) or not payload.get("signals"):
+            return
+        received = time.perf_counter()
+        for item in payload["signals"]:
+            try:
+                asset, entries, signal_time = item[0], item[1], item[2]
+            except (IndexError, TypeError):
+                continue
+            for entry in entries:
+                self.add(Signal(asset, entry.get("signal"), entry.get("timeFrame"), signal_time, received))
+
+    def subscribe(self, consumer):
+        """Register an ``async consumer(signal)`` and start the dispatcher."""
+        self._consumers.append(consumer)
+        if self._dispatcher is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            self._dispatcher = self._loop.create_task(self._dispatch())
+
+    def unsubscribe(self, consumer):
+        if consumer in self._consumers:
+            self._consumers.remove(consumer)
+        if not self._consumers and self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = self._queue = None
+
+    async def _dispatch(self):
+        while True:
+            signal = await self._queue.get()
+            latency = time.perf_counter() - signal.received
+            self.latencies.append(latency)
+            if metrics.enabled:
+                metrics.observe("delivery_seconds", "signals", latency)
+            for consumer in list(self._consumers):
+                try:
+                    await consumer(signal)
+                except Exception:
+                    logger.exception("Signal consumer failed")
+
+    def latency_stats(self):
+        """Frame arrival to dispatch latency over the recent window, in seconds."""
+        values = sorted(self.latencies)
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "mean": sum(values) / len(values),
+            "p50": values[len(values) // 2],
+            "p99": values[min(len(values) - 1, int(len(values) * 0.99))],
+            "max": values[-1],
+        }
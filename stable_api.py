@@ -1,9 +1,10 @@
 import time
+import random
 import logging
 import asyncio
-import json
 import os
 from datetime import datetime
+from . import codec
 from . import expiration
 from . import global_value
 from .api import QuotexAPI
@@ -11,7 +12,6 @@ from .utils.services import truncate
 from .utils.processor import (
     calculate_candles,
     process_candles_v2,
-    merge_candles,
     process_tick
 )
 from .config import (
@@ -21,12 +21,30 @@ from .config import (
     credentials
 )
 from .utils.indicators import TechnicalIndicators
+from .columnar import write_candles, open_candles, candles_path
+from .runner import StrategyRunner
+from .scheduler import OrderScheduler
+from .metrics import metrics
+from .records import Tick, Candle, Deal
+from .ledger import account_name
+from .recorder import SessionRecorder, SessionReplayer
+from .connection import READY, REJECTED, CLOSED
+from .risk import RiskEngine
+from .resample import bucket_start
+from .indicator_cache import IndicatorCache
+from .candle_series import CandleSeries
+from .logs import start_background_logging, stop_background_logging
+from .latency import LatencyMonitor
+from .shards import ShardedSubscriptions
+from .endpoints import EndpointPool, DEFAULT_ENDPOINTS
 
 logger = logging.getLogger(__name__)
 
 # 📁 ملفات السجل
 TRADES_LOG_FILE = "trades_log.json"
 FIB_LEVELS = [0.2, 0.38, 0.5, 0.62, 0.8, 0.9, 1.0]
+# Stores that outlive a connection, handed from one QuotexAPI to the next.
+SHARED_STORES = ("ledger", "depth", "sentiment", "signals", "streams", "resamplers")
 
 class Quotex:
     def __init__(
@@ -38,7 +56,8 @@ class Quotex:
             root_path=".",
             user_data_dir="browser",
             asset_default="EURUSD",
-            period_default=60
+            period_default=60,
+            endpoints=DEFAULT_ENDPOINTS
     ):
         self.size = [5, 10]
         self.email = email
@@ -59,6 +78,20 @@ class Quotex:
         self.websocket_client = None
         self.websocket_thread = None
         self.debug_ws_enable = False
+        self.recorder = None
+        self.time_to_ready = None
+        self.risk = RiskEngine()
+        self.indicators = TechnicalIndicators()
+        self.indicator_cache = IndicatorCache()
+        self.candle_series = {}
+        self.candle_series_size = 10000
+        self.candle_streams = {}
+        self.latency_monitor = None
+        self.shards = None
+        self.frame_listeners = []
+        self.stores = None
+        self.endpoints = EndpointPool(endpoints)
+        self.scheduler = OrderScheduler(self)
         self.resource_path = resource_path(root_path)
         session = load_session(user_agent)
         self.session_data = session
@@ -75,8 +108,8 @@ class Quotex:
         """تحميل سجل الصفقات من الملف"""
         if os.path.exists(TRADES_LOG_FILE):
             try:
-                with open(TRADES_LOG_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(TRADES_LOG_FILE, 'rb') as f:
+                    return [Deal.from_dict(trade) for trade in codec.loads(f.read())]
             except:
                 return []
         return []
@@ -85,22 +118,22 @@ class Quotex:
         """حفظ سجل الصفقات في الملف"""
         try:
             with open(TRADES_LOG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.trades_log, f, indent=4, ensure_ascii=False)
+                f.write(codec.dumps_pretty([trade.to_dict() for trade in self.trades_log]))
         except Exception as e:
             logger.error(f"❌ فشل حفظ سجل الصفقات: {str(e)}")
 
     def log_trade(self, asset, direction, entry_price, fib_level, result, profit, duration=900):
         """تسجيل تفاصيل الصفقة"""
-        trade = {
-            "timestamp": datetime.now().isoformat(),
-            "asset": asset,
-            "direction": direction,
-            "entry_price": entry_price,
-            "fib_level": fib_level,
-            "result": result,
-            "profit": profit,
-            "duration_seconds": duration
-        }
+        trade = Deal(
+            timestamp=datetime.now().isoformat(),
+            asset=asset,
+            direction=direction,
+            entry_price=entry_price,
+            fib_level=fib_level,
+            result=result,
+            profit=profit,
+            duration_seconds=duration
+        )
         self.trades_log.append(trade)
         self.save_trades_log()
 
@@ -118,7 +151,7 @@ class Quotex:
                 return None, None, None
 
             # 2. تحويل إلى DataFrame
-            df = pd.DataFrame(candles)
+            df = pd.DataFrame([candle.to_dict() for candle in candles])
             df = df[['time', 'open', 'high', 'low', 'close']].copy()
             df['time'] = pd.to_datetime(df['time'], unit='s')
             df.set_index('time', inplace=True)
@@ -186,12 +219,33 @@ class Quotex:
     def websocket(self):
         return self.websocket_client.wss
 
+    async def check_connect(self, timeout=10):
+        """Wait until the SSID is accepted, returns ``False`` on rejection, close or timeout."""
+        if self.api is None:
+            return False
+        state = await self.api.connection.wait((READY, REJECTED, CLOSED), timeout)
+        return state == READY
+
+    @staticmethod
+    def enable_metrics(port=None):
+        """Start collecting metrics, optionally serving them for Prometheus."""
+        metrics.enable()
+        if port:
+            metrics.serve(port)
+        return metrics
+
     @staticmethod
-    async def check_connect():
-        await asyncio.sleep(2)
-        if global_value.check_accepted_connection == 1:
-            return True
-        return False
+    def enable_logging(level=logging.INFO, handlers=None):
+        """Write client and websocket logs from a background thread."""
+        return start_background_logging(level, handlers)
+
+    @staticmethod
+    def disable_logging():
+        stop_background_logging()
+
+    @staticmethod
+    def get_metrics():
+        return metrics.snapshot()
 
     def set_session(self, user_agent: str, cookies: str = None, ssid: str = None):
         session = {
@@ -215,7 +269,7 @@ class Quotex:
             pass
         try:
             for ac in self.subscribe_mood:
-                await self.start_mood_stream(ac)
+                await self.start_mood_stream(ac, timeout=0)
         except:
             pass
 
@@ -258,17 +312,34 @@ class Quotex:
         index = expiration.get_timestamp()
         self.api.candles.candles_data = None
         self.start_candles_stream(asset, period)
+        started = metrics.now() if metrics.enabled else None
         self.api.get_candles(asset, index, end_from_time, offset, period)
         while True:
             while self.check_connect and self.api.candles.candles_data is None:
                 await asyncio.sleep(0.1)
             if self.api.candles.candles_data is not None:
                 break
+        if started is not None:
+            metrics.observe("request_seconds", "candles", metrics.now() - started)
         candles = self.prepare_candles(asset, period)
         if progressive:
             return self.api.historical_candles.get("data", {})
         return candles
 
+    async def get_candles_many(self, requests, end_from_time=None, window=8):
+        """Fetch candles for many ``(asset, period, offset)`` requests at once.
+
+        Up to ``window`` ``history/load`` requests are in flight together and
+        results are yielded as ``((asset, period, offset), candles)`` in
+        completion order; ``candles`` is ``None`` when a request timed out.
+        """
+        async for position, request, payload in self.api.candle_pipeline.fetch(requests, window, end_from_time):
+            if isinstance(payload, Exception):
+                logger.warning("history/load for %s timed out", request)
+                yield request, None
+            else:
+                yield request, self.prepare_candles(request[0], request[1], payload, {})
+
     async def get_history_line(self, asset, end_from_time, offset):
         if end_from_time is None:
             end_from_time = time.time()
@@ -276,12 +347,15 @@ class Quotex:
         self.api.current_asset = asset
         self.api.historical_candles = None
         self.start_candles_stream(asset)
+        started = metrics.now() if metrics.enabled else None
         self.api.get_history_line(self.codes_asset[asset], index, end_from_time, offset)
         while True:
             while self.check_connect and self.api.historical_candles is None:
                 await asyncio.sleep(0.2)
             if self.api.historical_candles is not None:
                 break
+        if started is not None:
+            metrics.observe("request_seconds", "history", metrics.now() - started)
         return self.api.historical_candles
 
     async def get_candle_v2(self, asset, period):
@@ -292,38 +366,209 @@ class Quotex:
         candles = self.prepare_candles(asset, period)
         return candles
 
-    def prepare_candles(self, asset: str, period: int):
-        candles_data = calculate_candles(self.api.candles.candles_data, period)
-        candles_v2_data = process_candles_v2(self.api.candle_v2_data, asset, candles_data)
-        new_candles = merge_candles(candles_v2_data)
-        return new_candles
+    async def export_candles(self, asset, end_from_time, offset, period, base_dir=None):
+        """Fetch candles and store them in the memory mapped columnar format."""
+        candles = await self.get_candles(asset, end_from_time, offset, period)
+        path = candles_path(base_dir or self.resource_path / "candles", asset, period)
+        write_candles(path, asset, period, candles or [])
+        return path
 
-    async def connect(self):
-        self.api = QuotexAPI(
-            "qxbroker.com",
+    @staticmethod
+    def load_candles(path):
+        """Open an exported candle file, columns are zero-copy views."""
+        return open_candles(path)
+
+    def prepare_candles(self, asset: str, period: int, data=None, candle_v2_data=None):
+        if data is None:
+            data = self.api.candles.candles_data
+        if candle_v2_data is None:
+            candle_v2_data = self.api.candle_v2_data
+        candles_data = calculate_candles(data, period)
+        candles_v2_data = process_candles_v2(candle_v2_data, asset, candles_data)
+        if not candles_v2_data:
+            return []
+        fetched = CandleSeries(candles_v2_data)
+        self.get_candle_series(asset, period).extend(fetched.last(self.candle_series_size))
+        return fetched.to_candles()
+
+    def get_candle_series(self, asset: str, period: int):
+        """The time ordered :class:`CandleSeries` the live candle paths of ``asset``/``period`` feed.
+
+        It keeps at most ``candle_series_size`` candles; fetched history is
+        returned in full by :meth:`prepare_candles` and only its newest
+        candles are folded in here.
+        """
+        series = self.candle_series.get((asset, period))
+        if series is None:
+            series = self.candle_series[(asset, period)] = CandleSeries(maxlen=self.candle_series_size)
+        return series
+
+    def _new_api(self, endpoint=None):
+        endpoint = endpoint or self.endpoints.current
+        api = QuotexAPI(
+            endpoint.host,
             self.email,
             self.password,
             self.lang,
             resource_path=self.resource_path,
-            user_data_dir=self.user_data_dir
+            user_data_dir=self.user_data_dir,
+            ws_host=endpoint.ws_address
         )
-        self.close()
-        self.api.trace_ws = self.debug_ws_enable
-        self.api.session_data = self.session_data
-        self.api.current_asset = self.asset_default
-        self.api.current_period = self.period_default
-        global_value.SSID = self.session_data.get("token")
-        if not self.session_data.get("token"):
-            await self.api.authenticate()
-        check, reason = await self.api.connect(self.account_is_demo)
-        if not await self.check_connect():
-            logger.debug("Reconnecting on websocket")
-            return await self.connect()
-        return check, reason
+        api.trace_ws = self.debug_ws_enable
+        api.session_data = self.session_data
+        api.current_asset = self.asset_default
+        api.current_period = self.period_default
+        return api
+
+    async def connect(self, attempts=5, backoff=0.5, max_backoff=10.0):
+        """Connect and wait until the server accepts the SSID.
+
+        Failed attempts are retried up to ``attempts`` times with jittered
+        exponential backoff; ``time_to_ready`` holds the seconds the
+        successful attempt took. With several endpoints configured they are
+        probed first, the fastest is used and repeated failures fail over to
+        the next one.
+        """
+        check, reason = False, None
+        if self.endpoints.stale:
+            await self.endpoints.probe()
+        for attempt in range(attempts):
+            started = time.monotonic()
+            endpoint = self.endpoints.choose()
+            enabled = ()
+            if self.api is not None:
+                enabled = tuple(self.api.enabled)
+                await self._close_api(self.api)
+            self.api = self._new_api(endpoint)
+            self._attach_stores(self.api, enabled)
+            for listener in self.frame_listeners:
+                self.api.add_frame_listener(listener)
+            self.risk.attach(self.api.ledger)
+            if self.latency_monitor is not None:
+                self.latency_monitor.attach(self.api)
+            if self.shards is not None:
+                self.shards.relink()
+            self.api.recorder = self.recorder
+            global_value.SSID = self.session_data.get("token")
+            if not self.session_data.get("token"):
+                await self.api.authenticate()
+            check, reason = await self.api.connect(self.account_is_demo)
+            if check and await self.check_connect():
+                self.endpoints.record_success(endpoint)
+                self.time_to_ready = time.monotonic() - started
+                if metrics.enabled:
+                    metrics.observe("connect_seconds", "total", self.time_to_ready)
+                return check, reason
+            self.endpoints.record_failure(endpoint, reason)
+            delay = min(max_backoff, backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.debug("Reconnecting on websocket in %.2fs (%s)", delay, reason)
+            if metrics.enabled:
+                metrics.inc("reconnects_total")
+            await asyncio.sleep(delay)
+        return False, reason or "Websocket connection failed."
+
+    def _attach_stores(self, api, enabled=()):
+        """Hand the client's long lived stores to ``api`` and keep feeding the ones in use.
+
+        Ledger positions, stream and signal consumers, sentiment history,
+        depth books and resamplers survive a reconnection this way.
+        """
+        if self.stores is None:
+            self.stores = {name: getattr(api, name) for name in SHARED_STORES}
+        for name, store in self.stores.items():
+            setattr(api, name, store)
+        api.enable(*enabled)
+
+    def add_frame_listener(self, listener):
+        """Register ``listener(event, payload)`` on this connection and every reconnection."""
+        if listener not in self.frame_listeners:
+            self.frame_listeners.append(listener)
+        if self.api is not None:
+            self.api.add_frame_listener(listener)
+
+    def remove_frame_listener(self, listener):
+        if listener in self.frame_listeners:
+            self.frame_listeners.remove(listener)
+        if self.api is not None:
+            self.api.remove_frame_listener(listener)
+
+    @staticmethod
+    async def _close_api(api, timeout=5):
+        """Close ``api`` off the event loop, its websocket thread may take a while to join."""
+        try:
+            await asyncio.wait_for(asyncio.to_thread(api.close), timeout)
+        except Exception:
+            logger.debug("Closing the previous websocket failed", exc_info=True)
 
     async def reconnect(self):
         await self.api.authenticate()
 
+    async def probe_endpoints(self, samples: int = 3):
+        """Measure the connect time of every configured endpoint, ``{host: seconds or None}``."""
+        return await self.endpoints.probe(samples)
+
+    def get_endpoint_stats(self):
+        return self.endpoints.stats()
+
+    def start_latency_monitor(self, interval: float = 2.0, dead_after: float = 6.0,
+                              stall_after: float = None, reconnect: bool = True):
+        """Ping continuously, keep RTT percentiles and reconnect fast on a dead connection.
+
+        :param float dead_after: Seconds without a pong before reconnecting.
+        :param float stall_after: Seconds of silence on the tick stream before
+            reconnecting, disabled by default.
+        """
+        if self.latency_monitor is not None:
+            self.latency_monitor.stop()
+        on_dead = self._reconnect_dead if reconnect else None
+        self.latency_monitor = LatencyMonitor(interval, dead_after, stall_after, on_dead)
+        self.latency_monitor.attach(self.api)
+        return self.latency_monitor.start()
+
+    def stop_latency_monitor(self):
+        if self.latency_monitor is not None:
+            self.latency_monitor.stop()
+            self.latency_monitor = None
+
+    def get_rtt_stats(self):
+        """Round trip percentiles in seconds, ``{"count": 0}`` until the first pong."""
+        return self.latency_monitor.stats() if self.latency_monitor else {"count": 0}
+
+    def get_rtt_history(self, size: int = None):
+        return self.latency_monitor.history(size) if self.latency_monitor else []
+
+    async def _reconnect_dead(self, reason, timeout=120.0, max_backoff=30.0):
+        """Reconnect until it succeeds, then follow the streams again.
+
+        Runs in its own task started by the latency monitor; every
+        connect and the resubscription are bounded by ``timeout``.
+        """
+        streams = dict(self.candle_streams)
+        attempt = 0
+        while True:
+            if metrics.enabled:
+                metrics.inc("reconnects_total", "dead")
+            try:
+                check, message = await asyncio.wait_for(self.connect(), timeout)
+            except asyncio.TimeoutError:
+                check, message = False, f"no connection within {timeout:.0f}s"
+            except Exception as error:
+                check, message = False, str(error)
+            if check:
+                break
+            attempt += 1
+            delay = min(max_backoff, 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.error("Reconnect after dead connection failed: %s, retrying in %.1fs", message, delay)
+            await asyncio.sleep(delay)
+        for asset, period in streams.items():
+            self.start_candles_stream(asset, period)
+        if "signals" in self.api.enabled:
+            self.api.signals_subscribe()
+        try:
+            await asyncio.wait_for(self.re_subscribe_stream(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Resubscribing after reconnect timed out")
+
     def set_account_mode(self, balance_mode="PRACTICE"):
         if balance_mode.upper() == "REAL":
             self.account_is_demo = 0
@@ -340,6 +585,11 @@ class Quotex:
     def change_time_offset(self, time_offset):
         return self.api.change_time_offset(time_offset)
 
+    async def get_time_offset(self, refresh: bool = False):
+        """Profile time offset served from the settings cache."""
+        profile = await self.api.get_profile(refresh)
+        return profile.offset or 0
+
     async def edit_practice_balance(self, amount=None):
         self.api.training_balance_edit_request = None
         self.api.edit_training_balance(amount)
@@ -347,27 +597,96 @@ class Quotex:
             await asyncio.sleep(0.2)
         return self.api.training_balance_edit_request
 
-    async def get_balance(self):
-        while self.api.account_balance is None:
+    async def get_balance(self, timeout=10):
+        """Balance of the current account from the ledger plus the server's profit in operation.
+
+        Raises :class:`TimeoutError` when no balance for the account arrives within ``timeout``.
+        """
+        self.api.enable("ledger")
+        ledger = self.api.ledger
+        account = account_name(self.api.account_type)
+        deadline = time.monotonic() + timeout
+        while ledger.balances[account] is None:
+            if self.api.account_balance is not None:
+                ledger.on_balance(self.api.account_balance)
+                if ledger.balances[account] is not None:
+                    break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"No {account} balance received within {timeout}s")
             await asyncio.sleep(0.2)
-        balance = self.api.account_balance.get("demoBalance") \
-            if self.api.account_type > 0 else self.api.account_balance.get("liveBalance")
-        return float(f"{truncate(balance + self.get_profit(), 2):.2f}")
+        return float(f"{truncate(ledger.balances[account] + self.get_profit(), 2):.2f}")
+
+    def get_exposure(self, asset: str = None):
+        """Open amount on ``asset`` (or all assets) for the current account."""
+        self.api.enable("ledger")
+        ledger = self.api.ledger
+        return ledger.asset_exposure(asset) if asset else ledger.total_exposure()
+
+    def get_pnl(self, asset: str = None):
+        self.api.enable("ledger")
+        ledger = self.api.ledger
+        return {
+            "realized": ledger.realized_pnl(asset),
+            "unrealized": ledger.unrealized[ledger.account].get(asset, 0.0) if asset
+            else ledger.unrealized_total[ledger.account],
+            "open_positions": ledger.open_positions(),
+        }
+
+    def ledger_changes(self):
+        """Async iterator of ledger change notifications."""
+        self.api.enable("ledger")
+        return self.api.ledger.changes()
+
+    async def get_resampled_candles(self, asset: str, timeframes, history_size: int = 3600,
+                                    base_period: int = 60):
+        """Derive every timeframe in ``timeframes`` from one base history fetch.
+
+        The base candles are fetched again only when ``history_size``
+        seconds reach further back than the loaded history; otherwise all
+        derived timeframes follow the live ticks without history requests.
+        Every timeframe must be a multiple of ``base_period``
+        (``ValueError`` otherwise).
+        """
+        self.api.enable("resamplers")
+        resampler = self.api.resamplers.get(asset, base_period)
+        if not resampler.covers(history_size):
+            candles = await self.get_candles(asset, time.time(), history_size, base_period)
+            resampler.load(candles or [], history_size)
+        return {timeframe: resampler.candles(timeframe) for timeframe in timeframes}
 
     async def calculate_indicator(self, asset: str, indicator: str, params: dict = None,
-                                  history_size: int = 3600, timeframe: int = 60) -> dict:
+                                  history_size: int = 3600, timeframe: int = 60,
+                                  base_period: int = None) -> dict:
+        """Compute an indicator, shared with every caller until the next candle closes."""
+        params = params or {}
+        last_closed = bucket_start(time.time(), timeframe) - timeframe
+        key = self.indicator_cache.key(asset, timeframe, indicator, params, last_closed, history_size, base_period)
+        return await self.indicator_cache.get(
+            key,
+            lambda: self._calculate_indicator(asset, indicator, params, history_size, timeframe, base_period),
+            cacheable=lambda result: "error" not in result
+        )
+
+    async def _calculate_indicator(self, asset: str, indicator: str, params: dict,
+                                   history_size: int, timeframe: int, base_period: int) -> dict:
         valid_timeframes = [60, 300, 900, 1800, 3600, 7200, 14400, 86400]
         if timeframe not in valid_timeframes:
             return {"error": f"Timeframe no válido. Valores permitidos: {valid_timeframes}"}
         adjusted_history = max(history_size, timeframe * 50)
-        candles = await self.get_candles(asset, time.time(), adjusted_history, timeframe)
+        if base_period and timeframe % base_period:
+            return {"error": f"El timeframe {timeframe} no es múltiplo del período base {base_period}"}
+        if base_period:
+            resampled = await self.get_resampled_candles(asset, [timeframe], adjusted_history, base_period)
+            candles = resampled[timeframe]
+        else:
+            candles = await self.get_candles(asset, time.time(), adjusted_history, timeframe)
         if not candles:
             return {"error": f"No hay datos disponibles para el activo {asset}"}
-        prices = [float(candle["close"]) for candle in candles]
-        highs = [float(candle["high"]) for candle in candles]
-        lows = [float(candle["low"]) for candle in candles]
-        timestamps = [candle["time"] for candle in candles]
-        indicators = TechnicalIndicators()
+        prices = [float(candle.close) for candle in candles]
+        highs = [float(candle.high) for candle in candles]
+        lows = [float(candle.low) for candle in candles]
+        timestamps = [candle.time for candle in candles]
+        indicators = self.indicators
         indicator = indicator.upper()
         try:
             if indicator == "RSI":
@@ -464,27 +783,23 @@ class Quotex:
                 try:
                     real_time_candles = await self.get_realtime_candles(asset, timeframe)
                     if real_time_candles:
-                        candles_list = sorted(real_time_candles.items(), key=lambda x: x[0])
-                        prices = [float(candle[1]["close"]) for candle in candles_list]
-                        highs = [float(candle[1]["high"]) for candle in candles_list]
-                        lows = [float(candle[1]["low"]) for candle in candles_list]
+                        series = self.get_candle_series(asset, timeframe)
                         min_periods = {
                             "RSI": 14, "MACD": 26, "BOLLINGER": 20, "STOCHASTIC": 14,
                             "ADX": 14, "ATR": 14, "SMA": 20, "EMA": 20, "ICHIMOKU": 52
                         }
                         required_periods = min_periods.get(indicator.upper(), 14)
-                        if len(prices) < required_periods:
-                            historical_candles = await self.get_candles(
+                        if len(series) < required_periods:
+                            await self.get_candles(
                                 asset, time.time(), timeframe * required_periods * 2, timeframe
                             )
-                            if historical_candles:
-                                prices = [float(candle["close"]) for candle in historical_candles] + prices
-                                highs = [float(candle["high"]) for candle in historical_candles] + highs
-                                lows = [float(candle["low"]) for candle in historical_candles] + lows
-                        indicators = TechnicalIndicators()
+                        prices = series.column("close").tolist()
+                        highs = series.column("high").tolist()
+                        lows = series.column("low").tolist()
+                        indicators = self.indicators
                         indicator = indicator.upper()
                         result = {
-                            "time": candles_list[-1][0],
+                            "time": series.last_time,
                             "timeframe": timeframe,
                             "asset": asset
                         }
@@ -536,7 +851,7 @@ class Quotex:
                         await callback(result)
                     await asyncio.sleep(1)
                 except Exception as e:
-                    print(f"Error en la suscripción: {str(e)}")
+                    logger.error(f"Error en la suscripción: {str(e)}")
                     await asyncio.sleep(1)
         except Exception as e:
             logger.error(f"Error en la suscripción: {str(e)}")
@@ -546,18 +861,24 @@ class Quotex:
             except:
                 pass
 
-    async def get_profile(self):
-        return await self.api.get_profile()
+    async def get_profile(self, refresh: bool = False):
+        return await self.api.get_profile(refresh)
 
     async def get_history(self):
         account_type = "demo" if self.account_is_demo else "live"
         return await self.api.get_trader_history(account_type, page_number=1)
 
     async def buy(self, amount: float, asset: str, direction: str, duration: int, time_mode: str = "TIME"):
-        self.api.buy_id = None
+        self.api.enable("ledger")
         request_id = expiration.get_timestamp()
+        approved, reservation = self.risk.approve(amount, asset, request_id)
+        if not approved:
+            logger.warning("Order %s %s %s rejected by risk limit %s", asset, direction, amount, reservation)
+            return False, reservation
+        self.api.buy_id = None
         is_fast_option = time_mode.upper() == "TIME"
         self.start_candles_stream(asset, duration)
+        started = metrics.now() if metrics.enabled else None
         self.api.buy(amount, asset, direction, duration, request_id, is_fast_option)
         count = 0.1
         while self.api.buy_id is None:
@@ -566,16 +887,27 @@ class Quotex:
                 status_buy = False
                 break
             await asyncio.sleep(0.2)
-            if global_value.check_websocket_if_error:
-                return False, global_value.websocket_error_reason
+            if self.api.connection.state == CLOSED:
+                self.risk.release(reservation)
+                return False, self.api.connection.reason
         else:
             status_buy = True
+            if started is not None:
+                metrics.observe("request_seconds", "buy", metrics.now() - started)
+        self.risk.release(reservation)
         return status_buy, self.api.buy_successful
 
+    def set_risk_limits(self, balance_mode: str = "PRACTICE", **limits):
+        """Configure the pre-trade limits of the ``"PRACTICE"`` or ``"REAL"`` account.
+
+        Keywords are those of :class:`RiskLimits`, e.g. ``max_asset_exposure=50``.
+        """
+        self.api.enable("ledger")
+        return self.risk.set_limits(account_name(balance_mode.upper() != "REAL"), **limits)
+
     async def open_pending(self, amount: float, asset: str, direction: str, duration: int, open_time: str = None):
         self.api.pending_id = None
-        user_settings = await self.get_profile()
-        offset_zone = user_settings.offset
+        offset_zone = await self.get_time_offset()
         open_time = expiration.get_next_timeframe(
             int(time.time()),
             offset_zone,
@@ -590,20 +922,37 @@ class Quotex:
                 status_buy = False
                 break
             await asyncio.sleep(0.2)
-            if global_value.check_websocket_if_error:
-                return False, global_value.websocket_error_reason
+            if self.api.connection.state == CLOSED:
+                return False, self.api.connection.reason
         else:
             status_buy = True
             self.api.instruments_follow(amount, asset, direction, duration, open_time)
         return status_buy, self.api.pending_successful
 
+    async def schedule_order(self, amount: float, asset: str, direction: str, duration: int,
+                             at: float = None, period: int = None, kind: str = "pending"):
+        """Pre-build an order and fire it at ``at`` or the next candle boundary."""
+        return await self.scheduler.schedule(amount, asset, direction, duration, at, period, kind)
+
     async def sell_option(self, options_ids):
-        self.api.sell_option(options_ids)
         self.api.sold_options_respond = None
+        self.api.sell_option(options_ids)
         while self.api.sold_options_respond is None:
             await asyncio.sleep(0.2)
         return self.api.sold_options_respond
 
+    async def sell_options(self, options_ids, timeout: float = 10.0):
+        """Close many options early, yielding a :class:`SellResult` per ticket as it settles.
+
+        ``result.response`` is the server answer for that ticket and
+        ``result.latency`` its round trip in seconds; tickets without an
+        answer after ``timeout`` come back with ``error="timeout"``.
+        """
+        async for result in self.api.seller.sell_many(options_ids, timeout):
+            if metrics.enabled and result.latency is not None:
+                metrics.observe("request_seconds", "sell", result.latency)
+            yield result
+
     def get_payment(self):
         assets_data = {}
         for i in self.api.instruments:
@@ -656,9 +1005,45 @@ class Quotex:
             await asyncio.sleep(0.2)
         task.cancel()
         self.api.listinfodata.delete(id_number)
-        return data_dict["win"]
+        return Deal.from_dict(data_dict).win
+
+    async def run_strategies(self, strategies, assets, periods=(60,)):
+        """Run strategies in worker processes fed by this connection."""
+        runner = StrategyRunner(self, strategies, assets, periods)
+        await runner.run()
+        return runner.results
+
+    async def enable_sharding(self, count: int = 4):
+        """Spread candle and depth subscriptions over ``count`` websocket connections.
+
+        Assets already followed are moved to their shard.
+        """
+        if self.shards is not None:
+            await self.shards.stop()
+        self.shards = await ShardedSubscriptions(self, count).start()
+        for asset, period in self.candle_streams.items():
+            if self.shards.shard_for(asset).index:
+                self.api.unsubscribe_realtime_candle(asset)
+                self.api.unfollow_candle(asset)
+                self.shards.follow(asset, period)
+        return self.shards
+
+    async def disable_sharding(self):
+        if self.shards is None:
+            return
+        shards, self.shards = self.shards, None
+        await shards.stop()
+        for asset, period in self.candle_streams.items():
+            self.start_candles_stream(asset, period)
+
+    def get_shard_stats(self):
+        return self.shards.stats() if self.shards else []
 
     def start_candles_stream(self, asset: str = "EURUSD", period: int = 0):
+        self.candle_streams[asset] = period
+        if self.shards is not None and self.shards.shard_for(asset).index:
+            self.shards.follow(asset, period)
+            return
         self.api.current_asset = asset
         self.api.subscribe_realtime_candle(asset, period)
         self.api.chart_notification(asset)
@@ -668,18 +1053,21 @@ class Quotex:
                                    deal: int = 5, percent_mode: bool = False, percent_deal: int = 1):
         is_fast_option = False if time_mode.upper() == "TIMER" else True
         self.api.current_asset = asset
-        self.api.settings_apply(asset, period, is_fast_option=is_fast_option, deal=deal,
-                                percent_mode=percent_mode, percent_deal=percent_deal)
+        changed = self.api.settings_apply(asset, period, is_fast_option=is_fast_option, deal=deal,
+                                          percent_mode=percent_mode, percent_deal=percent_deal)
+        if not changed and self.api.settings_list:
+            return self.api.settings_list
         await asyncio.sleep(0.2)
-        while True:
-            self.api.refresh_settings()
-            if self.api.settings_list:
-                investments_settings = self.api.settings_list
-                break
+        while not self.api.settings_list:
+            await self.api.refresh_settings()
             await asyncio.sleep(0.2)
-        return investments_settings
+        return self.api.settings_list
 
     def stop_candles_stream(self, asset):
+        self.candle_streams.pop(asset, None)
+        if self.shards is not None and self.shards.shard_for(asset).index:
+            self.shards.unfollow(asset)
+            return
         self.api.unsubscribe_realtime_candle(asset)
         self.api.unfollow_candle(asset)
 
@@ -689,7 +1077,13 @@ class Quotex:
         while True:
             if self.api.realtime_price.get(asset):
                 tick = self.api.realtime_candles
-                return process_tick(tick, period, data)
+                candles = process_tick(tick, period, data)
+                candles = {
+                    key: candle if isinstance(candle, Candle) else Candle.from_dict(candle)
+                    for key, candle in candles.items()
+                }
+                self.get_candle_series(asset, period).extend(candles.values())
+                return candles
             await asyncio.sleep(0.1)
 
     async def start_realtime_price(self, asset: str, period: int = 0):
@@ -700,21 +1094,122 @@ class Quotex:
             await asyncio.sleep(0.2)
 
     async def get_realtime_price(self, asset: str):
-        return self.api.realtime_price.get(asset, {})
+        return [
+            Tick(asset, item["time"], item["price"])
+            for item in self.api.realtime_price.get(asset, [])
+        ]
 
-    async def start_realtime_sentiment(self, asset: str, period: int = 0):
+    async def start_realtime_sentiment(self, asset: str, period: int = 0, timeout: float = None):
+        """Follow ``asset`` and return its first sentiment, ``None`` after ``timeout`` seconds."""
         self.start_candles_stream(asset, period)
+        deadline = None if timeout is None else time.monotonic() + timeout
         while True:
             if self.api.realtime_sentiment.get(asset):
                 return self.api.realtime_sentiment[asset]
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
             await asyncio.sleep(0.2)
 
+    def stream_ticks(self, assets, policy: str = "latest", maxsize: int = 1024):
+        """Async iterator of :class:`Tick` updates for ``assets``.
+
+        :param str policy: ``"latest"`` delivers only the newest tick per
+            asset when the consumer lags; ``"lossless"`` keeps every tick
+            up to ``maxsize`` pending items.
+        """
+        self.api.enable("streams")
+        subscription = self.api.streams.subscribe([("tick", asset) for asset in assets], policy, maxsize)
+        for asset in assets:
+            self.start_candles_stream(asset, self.period_default)
+        return subscription
+
+    def stream_candles(self, asset: str, period: int = 60, policy: str = "latest", maxsize: int = 1024):
+        """Async iterator of the live :class:`Candle` of ``asset``, updated on every tick."""
+        self.api.enable("streams")
+        subscription = self.api.streams.subscribe([("candle", asset, period)], policy, maxsize)
+        self.start_candles_stream(asset, period)
+        return subscription
+
+    def stream_sentiment(self, assets, policy: str = "latest", maxsize: int = 1024):
+        """Async iterator of sentiment dicts (``buy``, ``sell``, ``asset``) for ``assets``."""
+        self.api.enable("streams")
+        subscription = self.api.streams.subscribe([("sentiment", asset) for asset in assets], policy, maxsize)
+        for asset in assets:
+            self.start_candles_stream(asset, self.period_default)
+        return subscription
+
+    def get_depth(self, asset: str, levels: int = 10):
+        """Return the top levels of the depth book followed for ``asset``."""
+        self.api.enable("depth")
+        return self.api.depth.get(asset).snapshot(levels)
+
     async def get_realtime_sentiment(self, asset: str):
         return self.api.realtime_sentiment.get(asset, {})
 
+    def get_sentiment_stats(self, asset: str, period: int = 10):
+        """Return rolling mean, z-score and rate of change of the buy sentiment."""
+        self.api.enable("sentiment")
+        return self.api.sentiment.get(asset).stats(period)
+
+    def get_sentiment_history(self, asset: str, size: int = None):
+        self.api.enable("sentiment")
+        return self.api.sentiment.get(asset).history(size)
+
+    def get_sentiment_extremes(self, count: int = 5, key: str = "zscore"):
+        """Return the assets whose sentiment deviates most, across all streams."""
+        self.api.enable("sentiment")
+        return self.api.sentiment.extremes(count, key)
+
+    def start_recording(self, path=None):
+        """Capture every websocket frame of this session to a compressed file."""
+        self.stop_recording()
+        path = path or self.resource_path / f"session_{int(time.time())}.qxws.gz"
+        self.recorder = SessionRecorder(path).start()
+        if self.api:
+            self.api.recorder = self.recorder
+        return path
+
+    def stop_recording(self):
+        if self.recorder is None:
+            return None
+        if self.api:
+            self.api.recorder = None
+        self.recorder.stop()
+        frames, self.recorder = self.recorder.frames, None
+        return frames
+
+    async def replay_session(self, path, speed=1.0):
+        """Replay a capture through the API handlers without a live socket.
+
+        :param float speed: ``1`` for real time, ``N`` for N times faster,
+            ``0`` for as fast as possible.
+        """
+        if self.api is None:
+            self.api = self._new_api()
+        if self.api.websocket_client is None:
+            self.api.attach_client()
+        return await SessionReplayer(self.api, path, speed).run()
+
+    def get_throttle_stats(self):
+        """Outbound rate limiter state: current rates, waits and throttle events."""
+        return self.api.rate_limiter.snapshot()
+
     def get_signal_data(self):
         return self.api.signal_data
 
+    def get_signals(self, asset: str, timeframe: int = None, start: float = None, end: float = None):
+        """Return the live (not yet expired) signals of ``asset`` in time order."""
+        self.api.enable("signals")
+        return self.api.signals.get(asset, timeframe, start, end)
+
+    def subscribe_signals(self, consumer):
+        """Push every new signal to ``async consumer(signal)``."""
+        self.api.signals.subscribe(consumer)
+        self.api.signals_subscribe()
+
+    def unsubscribe_signals(self, consumer):
+        self.api.signals.unsubscribe(consumer)
+
     def get_profit(self):
         return self.api.profit_in_operation or 0
 
@@ -769,16 +1264,17 @@ class Quotex:
                 await self.connect()
             await asyncio.sleep(0.2)
 
-    async def start_mood_stream(self, asset, instrument="turbo-option"):
+    async def start_mood_stream(self, asset, instrument="turbo-option", timeout: float = 5.0):
+        """Follow the trader mood of ``asset``, samples land in ``api.sentiment``.
+
+        Returns the first sentiment, or ``None`` when none arrived within
+        ``timeout`` seconds; the subscription stays active either way.
+        """
         if asset not in self.subscribe_mood:
             self.subscribe_mood.append(asset)
-        while True:
-            self.api.subscribe_Traders_mood(asset[asset], instrument)
-            try:
-                self.api.traders_mood[self.codes_asset[asset]] = self.codes_asset[asset]
-                break
-            finally:
-                await asyncio.sleep(0.2)
+        self.api.enable("sentiment")
+        self.api.sentiment.get(asset)
+        return await self.start_realtime_sentiment(asset, self.period_default, timeout)
 
     def close(self):
         return self.api.close()
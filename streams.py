@@ -0,0 +1,148 @@
+"""Async iterator streams for ticks, candles and sentiment.
+
+Frames are pushed from the websocket thread into per-consumer buffers;
+the consumer's event loop is woken at most once per batch, so thousands
+of updates per second reach ``async for`` loops without polling.
+"""
+import asyncio
+import threading
+from collections import deque, OrderedDict
+from .records import Tick, Candle
+
+LATEST = "latest"
+LOSSLESS = "lossless"
+
+
+class Subscription(object):
+    """Bounded buffer feeding one ``async for`` consumer.
+
+    :param str policy: ``"latest"`` conflates updates per key and only
+        the newest value of each asset/period is delivered; ``"lossless"``
+        delivers every update in order up to ``maxsize`` pending items,
+        beyond which the oldest are dropped and counted in ``dropped``.
+    """
+
+    def __init__(self, hub, topics, policy=LATEST, maxsize=1024):
+        if policy not in (LATEST, LOSSLESS):
+            raise ValueError(f"Unknown conflation policy: {policy}")
+        self.hub = hub
+        self.topics = set(topics)
+        self.policy = policy
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.delivered = 0
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._wakeup = False
+        self._lock = threading.Lock()
+        self._closed = False
+        self._items = OrderedDict() if policy == LATEST else deque()
+
+    def push(self, key, item):
+        """Called from the producer thread."""
+        with self._lock:
+            if self.policy == LATEST:
+                self._items.pop(key, None)
+                self._items[key] = item
+            else:
+                if len(self._items) >= self.maxsize:
+                    self._items.popleft()
+                    self.dropped += 1
+                self._items.append(item)
+            if self._wakeup:
+                return
+            self._wakeup = True
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            with self._lock:
+                if self._items:
+                    if self.policy == LATEST:
+                        item = self._items.popitem(last=False)[1]
+                    else:
+                        item = self._items.popleft()
+                    self.delivered += 1
+                    return item
+                self._wakeup = False
+                self._event.clear()
+            if self._closed:
+                raise StopAsyncIteration
+            await self._event.wait()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._closed = True
+        self.hub.unsubscribe(self)
+        self._loop.call_soon_threadsafe(self._event.set)
+
+
+class StreamHub(object):
+    """Route decoded frames to the subscriptions interested in them."""
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.candles = {}
+        # Candle periods per asset, replaced rather than changed under the
+        # lock so the websocket thread iterates a set nobody mutates.
+        self.periods = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics, policy=LATEST, maxsize=1024):
+        subscription = Subscription(self, topics, policy, maxsize)
+        with self._lock:
+            for topic in subscription.topics:
+                self.subscriptions.setdefault(topic, []).append(subscription)
+                if topic[0] == "candle":
+                    self.periods[topic[1]] = self.periods.get(topic[1], frozenset()) | {topic[2]}
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self.subscriptions.get(topic, [])
+                if subscription in subscribers:
+                    subscribers.remove(subscription)
+                if not subscribers:
+                    self.subscriptions.pop(topic, None)
+                    if topic[0] == "candle":
+                        self.periods[topic[1]] = self.periods.get(topic[1], frozenset()) - {topic[2]}
+
+    def publish(self, topic, key, item):
+        for subscription in tuple(self.subscriptions.get(topic, ())):
+            subscription.push(key, item)
+
+    def on_tick(self, asset, timestamp, price, direction=None):
+        if ("tick", asset) in self.subscriptions:
+            self.publish(("tick", asset), asset, Tick(asset, timestamp, price, direction))
+        for period in self.periods.get(asset, ()):
+            start = int(timestamp // period * period)
+            candle = self.candles.get((asset, period))
+            if candle is None or candle.time != start:
+                candle = self.candles[(asset, period)] = Candle(start, price, price, price, price, 0)
+            candle.update(price)
+            self.publish(("candle", asset, period), (asset, period), Candle(*candle.values()))
+
+    def on_frame(self, event, payload):
+        if not self.subscriptions:
+            return
+        if isinstance(payload, list):
+            for tick in payload:
+                if isinstance(tick, list) and len(tick) >= 3:
+                    self.on_tick(tick[0], tick[1], tick[2], tick[3] if len(tick) > 3 else None)
+        elif isinstance(payload, dict) and "sentiment" in payload:
+            asset = payload.get("asset")
+            topic = ("sentiment", asset)
+            if topic in self.subscriptions:
+                self.publish(topic, asset, dict(payload["sentiment"], asset=asset))
@@ -0,0 +1,14 @@
+"""Make the checkout importable as ``quotexapi`` whatever its directory is called."""
+import sys
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+if "quotexapi" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "quotexapi", ROOT / "__init__.py", submodule_search_locations=[str(ROOT)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["quotexapi"] = module
+    spec.loader.exec_module(module)
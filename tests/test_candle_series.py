@@ -0,0 +1,46 @@
+import pytest
+from quotexapi.candle_series import CandleSeries
+from quotexapi.records import Candle
+
+
+def test_out_of_order_candles_are_sorted_and_merged():
+    series = CandleSeries([{"time": 120, "open": 1, "close": 2, "high": 3, "low": 0.5, "ticks": 4},
+                           Candle(60, 1, 1, 1, 1, 1)])
+    series.add(90, 2, 2, 2, 2)
+    series.add(120, 9, 2.5, 3.5, 0.25, 2)
+    assert list(series.column("time")) == [60, 90, 120]
+    assert series[-1] == Candle(120, 1.0, 2.5, 3.5, 0.25, 4)
+    assert series.last_time == 120
+
+
+def test_live_ticks_fold_into_the_current_candle():
+    series = CandleSeries()
+    series.update(61, 1.0, 60)
+    series.update(70, 1.5, 60)
+    series.update(75, 0.5, 60)
+    series.update(120, 2.0, 60)
+    assert series.to_candles() == [Candle(60, 1.0, 0.5, 1.5, 0.5, 3), Candle(120, 2.0, 2.0, 2.0, 2.0, 1)]
+
+
+def test_range_and_last_are_views():
+    series = CandleSeries(Candle(time, 1, 1, 1, 1, 1) for time in range(0, 600, 60))
+    window = series.range(100, 300)
+    assert [candle.time for candle in window] == [120, 180, 240, 300]
+    assert list(window.column("time")) == [120, 180, 240, 300]
+    assert window[-1].time == 300 and [c.time for c in window[1:3]] == [180, 240]
+    assert [c.time for c in window[::2]] == [120, 240]
+    with pytest.raises(IndexError):
+        window[4]
+    series.add(300, 1, 7, 7, 1)
+    assert window[-1].close == 7
+    assert [candle.time for candle in series.last(2)] == [480, 540]
+    assert len(series.last(50)) == 10
+
+
+def test_maxlen_trims_in_blocks():
+    series = CandleSeries(maxlen=4)
+    for time in range(5):
+        series.add(time, 1, 1, 1, 1)
+    assert len(series) == 5
+    series.add(5, 1, 1, 1, 1)
+    assert list(series.column("time")) == [2, 3, 4, 5]
@@ -0,0 +1,51 @@
+import pytest
+from quotexapi import codec
+from quotexapi.frames import FrameDecoder, outgoing_event
+
+
+@pytest.fixture
+def restore_backend():
+    current = codec.backend
+    yield
+    codec.use(current)
+
+
+def test_backends_agree(restore_backend):
+    value = {"asset": "EURUSD_otc", "prices": [1.08451, 2], "name": "é/x", "ok": True}
+    pretty = set()
+    for name in codec.available():
+        assert codec.use(name) == name
+        assert codec.loads(codec.dumps(value)) == value
+        pretty.add(codec.dumps_pretty(value))
+    assert len(pretty) == 1
+    assert '    "asset": "EURUSD_otc"' in pretty.pop()
+
+
+def test_standard_library_is_always_available(restore_backend):
+    assert codec.available()[-1] == "json"
+    codec.use("json")
+    assert codec.dumps({"a": 1}) == '{"a":1}'
+
+
+def test_unknown_or_missing_backend(restore_backend, monkeypatch):
+    with pytest.raises(KeyError):
+        codec.use("simdjson")
+    monkeypatch.setitem(codec.BACKENDS, "ujson", (None, None))
+    with pytest.raises(ImportError):
+        codec.use("ujson")
+
+
+def test_decode_error_covers_every_backend(restore_backend):
+    for name in codec.available():
+        codec.use(name)
+        with pytest.raises(codec.DecodeError):
+            codec.loads(b"[1,")
+
+
+def test_frame_decoder_pairs_binary_payload_with_announced_event():
+    decoder = FrameDecoder()
+    assert decoder.decode('451-["quotes/stream",{"_placeholder":true,"num":0}]') is None
+    assert decoder.decode(b'\x04[["EURUSD",1.5,1.1,1]]') == ("quotes/stream", [["EURUSD", 1.5, 1.1, 1]])
+    assert decoder.decode('42["s_authorization"]') == ("s_authorization", None)
+    assert decoder.decode(b"\x04{broken") is None
+    assert outgoing_event('42["orders/open",{}]') == "orders/open"
@@ -0,0 +1,50 @@
+import pytest
+from quotexapi.columnar import write_candles, open_candles, candles_path, COLUMNS
+
+
+def _candles():
+    return [
+        {"time": 180, "open": 1.3, "high": 1.5, "low": 1.2, "close": 1.4, "ticks": 7},
+        {"time": 60, "open": 1.1, "high": 1.2, "low": 1.0, "close": 1.15},
+        {"time": 120, "open": 1.15, "high": 1.3, "low": 1.1, "close": 1.3, "ticks": 3},
+    ]
+
+
+def test_round_trip_sorts_by_time_and_defaults_ticks(tmp_path):
+    path = candles_path(tmp_path, "EURUSD_otc", 60)
+    assert write_candles(path, "EURUSD_otc", 60, _candles()) == 3
+    with open_candles(path) as candles:
+        assert (candles.asset, candles.period, len(candles)) == ("EURUSD_otc", 60, 3)
+        rows = candles.to_candles()
+    assert [row["time"] for row in rows] == [60, 120, 180]
+    assert rows[0]["ticks"] == 0
+    assert rows[2] == dict(zip(COLUMNS, (180, 1.3, 1.5, 1.2, 1.4, 7)))
+
+
+def test_columns_are_views_over_the_file(tmp_path):
+    path = tmp_path / "c.qxc"
+    write_candles(path, "GBPUSD", 300, _candles())
+    candles = open_candles(path)
+    try:
+        assert list(candles["close"]) == [1.15, 1.3, 1.4]
+        assert candles.column("close") is candles["close"]
+    finally:
+        candles.close()
+
+
+def test_rewrite_replaces_the_file(tmp_path):
+    path = tmp_path / "c.qxc"
+    write_candles(path, "EURUSD", 60, _candles())
+    write_candles(path, "EURUSD", 60, _candles()[:1])
+    with open_candles(path) as candles:
+        assert len(candles) == 1
+    assert not path.with_name("c.qxc.tmp").exists()
+
+
+def test_rejects_long_asset_and_foreign_file(tmp_path):
+    with pytest.raises(ValueError):
+        write_candles(tmp_path / "a.qxc", "X" * 33, 60, [])
+    other = tmp_path / "other.qxc"
+    other.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        open_candles(other)
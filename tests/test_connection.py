@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from quotexapi.connection import (
+    ConnectionState, CONNECTING, CONNECTED, AUTHENTICATING, READY, REJECTED, CLOSED, DISCONNECTED
+)
+
+
+def test_handshake_frames_drive_the_state():
+    connection = ConnectionState()
+    assert connection.state == DISCONNECTED
+    connection.transition(CONNECTING)
+    connection.transition(CONNECTED)
+    connection.transition(AUTHENTICATING)
+    connection.on_frame("s_authorization", None)
+    assert connection.ready
+    assert set(connection.timings()) == {CONNECTED, AUTHENTICATING, READY}
+    connection.on_frame("authorization/reject", None)
+    assert (connection.state, connection.reason) == (REJECTED, "Websocket Token Rejected.")
+
+
+def test_new_attempt_resets_timings():
+    connection = ConnectionState()
+    connection.transition(CONNECTING)
+    connection.transition(READY)
+    connection.transition(CONNECTING)
+    assert connection.timings() == {}
+
+
+def test_async_wait_is_woken_from_another_thread():
+    async def run():
+        connection = ConnectionState()
+        connection.transition(CONNECTING)
+        threading.Timer(0.05, connection.transition, (CONNECTED,)).start()
+        threading.Timer(0.1, connection.transition, (CLOSED, "gone")).start()
+        first = await connection.wait((CONNECTED, CLOSED), 1)
+        second = await connection.wait((READY, CLOSED), 1)
+        return first, second, connection.reason
+
+    assert asyncio.run(run()) == (CONNECTED, CLOSED, "gone")
+
+
+def test_waits_return_the_current_state_on_timeout():
+    async def run():
+        return await ConnectionState().wait((READY,), 0.05)
+
+    assert asyncio.run(run()) == DISCONNECTED
+    connection = ConnectionState()
+    threading.Timer(0.05, connection.transition, (READY,)).start()
+    assert connection.wait_sync((READY, CLOSED), 1) == READY
+    assert connection.wait_sync((CLOSED,), 0.01) == READY
@@ -0,0 +1,62 @@
+import threading
+from quotexapi.depth import DepthBook, DepthBooks
+
+
+def test_levels_update_and_remove():
+    book = DepthBook("EURUSD")
+    book.apply(bids=[[1.1, 5], [1.2, 3]], asks=[[1.4, 2], [1.3, 1]], timestamp=10)
+    assert book.best_bid == (1.2, 3)
+    assert book.best_ask == (1.3, 1)
+    assert round(book.spread, 10) == 0.1
+    book.apply(bids=[[1.2, 0]], asks=[[1.3, 4]])
+    assert book.best_bid == (1.1, 5)
+    assert book.size_at("ask", 1.3) == 4
+    assert book.size_at("bid", 1.2) == 0
+    assert book.updates == 2
+
+
+def test_snapshot_replaces_book_and_orders_best_first():
+    book = DepthBook("EURUSD")
+    book.apply(bids=[[1.0, 1]], asks=[[2.0, 1]])
+    book.apply(bids=[[1.1, 1], [1.2, 2], [1.15, 3]], asks=[[1.3, 1]], snapshot=True, timestamp=5)
+    snapshot = book.snapshot(levels=2)
+    assert snapshot == {"asset": "EURUSD", "time": 5, "bids": [(1.2, 2), (1.15, 3)], "asks": [(1.3, 1)]}
+
+
+def test_empty_side_has_no_spread():
+    book = DepthBook("EURUSD")
+    book.apply(bids=[[1.0, 1]])
+    assert book.best_ask is None and book.spread is None
+
+
+def test_books_listen_to_depth_frames_only():
+    books = DepthBooks()
+    books.on_frame("depth/change", {"asset": "EURUSD", "buy": [[1.1, 1]], "sell": [[1.2, 1]]})
+    books.on_frame("quotes/stream", {"asset": "GBPUSD", "bids": [[1.1, 1]]})
+    books.on_frame("depth/change", {"bids": [[1.1, 1]]})
+    assert list(books.books) == ["EURUSD"]
+    assert books.get("EURUSD").best_bid == (1.1, 1)
+    books.discard("EURUSD")
+    assert not books.books
+
+
+def test_reads_stay_consistent_while_updates_run():
+    book = DepthBook("EURUSD")
+    stop = threading.Event()
+
+    def writer():
+        price = 0
+        while not stop.is_set():
+            price += 1
+            book.apply(bids=[[1.0 + price % 50 / 1000, 1]], asks=[[2.0 - price % 50 / 1000, 1]],
+                       snapshot=price % 7 == 0)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(20000):
+            spread = book.spread
+            assert spread is None or spread > 0
+    finally:
+        stop.set()
+        thread.join()
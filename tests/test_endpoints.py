@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from quotexapi.endpoints import Endpoint, EndpointPool, tcp_probe
+
+
+def _pool(rtts, **kwargs):
+    async def probe(endpoint):
+        rtt = rtts[endpoint.host]
+        if rtt is None:
+            raise OSError("unreachable")
+        if rtt == "hang":
+            await asyncio.sleep(1)
+        return rtt
+
+    return EndpointPool(list(rtts), probe=probe, probe_timeout=0.05, **kwargs)
+
+
+def test_endpoint_addresses():
+    assert Endpoint("a.com").ws_address == "ws2.a.com"
+    assert Endpoint("a.com", ws_host="ws.a.com", port=8443).ws_address == "ws.a.com:8443"
+    with pytest.raises(ValueError):
+        EndpointPool([])
+
+
+def test_probe_picks_the_fastest_healthy_endpoint():
+    pool = _pool({"a.com": None, "b.com": 0.2, "c.com": 0.1, "d.com": "hang"})
+    assert pool.stale
+    assert asyncio.run(pool.probe()) == {"a.com": None, "b.com": 0.2, "c.com": 0.1, "d.com": None}
+    assert not pool.stale
+    assert pool.endpoints[0].last_error == "unreachable"
+    assert pool.endpoints[3].last_error == "TimeoutError"
+    assert pool.choose().host == "c.com" and pool.failovers == 1
+    assert [stat["available"] for stat in pool.stats()] == [False, True, True, False]
+
+
+def test_unprobed_endpoints_keep_their_order():
+    pool = EndpointPool(["a.com", "b.com"])
+    assert pool.best().host == "a.com" and not EndpointPool(["a.com"]).stale
+
+
+def test_repeated_failures_fail_over_until_the_cooldown_ends():
+    pool = EndpointPool(["a.com", "b.com"], max_failures=2, cooldown=60)
+    first = pool.current
+    pool.record_failure(first, "refused")
+    assert pool.choose() is first
+    pool.record_failure(first, "refused")
+    assert pool.choose().host == "b.com" and pool.failovers == 1
+    pool.record_failure(pool.current)
+    pool.record_failure(pool.current)
+    assert pool.best() is first
+    first.down_until = 0.0
+    assert pool.choose() is first
+    pool.record_success(first)
+    assert first.failures == 0 and first.last_error is None
+
+
+def test_tcp_probe_times_a_local_connect():
+    async def run():
+        server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await tcp_probe(Endpoint("local", ws_host="127.0.0.1", port=port))
+
+    assert 0 <= asyncio.run(run()) < 1
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from quotexapi.indicator_cache import IndicatorCache
+
+
+def test_key_normalises_name_and_parameters():
+    assert IndicatorCache.key("EURUSD", 60, "rsi", {"b": 1, "a": 2}, 120) == \
+        IndicatorCache.key("EURUSD", 60, "RSI", {"a": 2, "b": 1}, 120)
+    assert IndicatorCache.key("EURUSD", 60, "rsi", None, 120) != IndicatorCache.key("EURUSD", 60, "rsi", None, 180)
+
+
+def test_identical_requests_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 50}
+
+    async def run():
+        cache = IndicatorCache()
+        first = await asyncio.gather(*(cache.get("k", compute) for _ in range(3)))
+        again = await cache.get("k", compute)
+        return cache, first, again
+
+    cache, first, again = asyncio.run(run())
+    assert len(calls) == 1
+    assert first == [{"value": 50}] * 3 and again is first[0]
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "shared": 2}
+
+
+def test_rejected_results_and_errors_are_not_stored():
+    async def error():
+        return {"error": "no data"}
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def run():
+        cache = IndicatorCache()
+        assert await cache.get("e", error, cacheable=lambda result: "error" not in result) == {"error": "no data"}
+        with pytest.raises(RuntimeError):
+            await cache.get("f", fail)
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.results == {} and cache.inflight == {}
+
+
+def test_least_recently_used_result_is_evicted():
+    async def value(result):
+        return result
+
+    async def run():
+        cache = IndicatorCache(maxsize=2)
+        await cache.get("a", lambda: value(1))
+        await cache.get("b", lambda: value(2))
+        await cache.get("a", lambda: value(1))
+        await cache.get("c", lambda: value(3))
+        return cache
+
+    assert list(asyncio.run(run()).results) == ["a", "c"]
+
+
+def test_cancelled_caller_does_not_cancel_the_computation():
+    async def compute():
+        await asyncio.sleep(0.02)
+        return 7
+
+    async def run():
+        cache = IndicatorCache()
+        waiter = asyncio.ensure_future(cache.get("k", compute))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        result = await cache.get("k", compute)
+        return cache, result
+
+    cache, result = asyncio.run(run())
+    assert result == 7 and cache.stats()["misses"] == 1 and cache.stats()["shared"] == 1
@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from quotexapi.latency import LatencyMonitor, PING, PONG
+
+
+class _Socket(object):
+
+    def __init__(self, monitor=None, fail=False):
+        self.monitor = monitor
+        self.fail = fail
+        self.sent = []
+
+    def send(self, data):
+        if self.fail:
+            raise OSError("closed")
+        self.sent.append(data)
+        if self.monitor is not None:
+            asyncio.get_running_loop().call_later(0.005, self.monitor.on_message, PONG)
+
+
+class _API(object):
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.rtt_monitor = None
+        self.listeners = []
+
+    def add_frame_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_frame_listener(self, listener):
+        self.listeners.remove(listener)
+
+
+def _watch(monitor, api, seconds):
+    async def run():
+        monitor.attach(api)
+        monitor.start()
+        await asyncio.sleep(seconds)
+        monitor.stop()
+
+    asyncio.run(run())
+
+
+def test_pongs_are_timed():
+    monitor = LatencyMonitor(interval=0.02, dead_after=1)
+    api = _API(_Socket(monitor))
+    _watch(monitor, api, 0.15)
+    stats = monitor.stats()
+    assert api.websocket.sent[0] == PING and api.rtt_monitor is monitor
+    assert stats["count"] >= 3 and not monitor.dead
+    assert 0.004 <= stats["p50"] <= stats["p90"] <= stats["max"] < 0.5
+    assert len(monitor.history(2)) == 2
+
+
+def test_stats_pick_percentiles():
+    monitor = LatencyMonitor()
+    assert monitor.stats() == {"count": 0}
+    monitor.samples.extend((0, rtt / 100) for rtt in range(1, 101))
+    stats = monitor.stats()
+    assert (stats["p50"], stats["p90"], stats["max"]) == (0.51, 0.91, 1.0)
+    assert stats["mean"] == pytest.approx(0.505)
+
+
+@pytest.mark.parametrize("socket, stall, expected", [
+    (_Socket(), None, "no pong"),
+    (_Socket(fail=True), None, "ping failed"),
+])
+def test_dead_connection_is_reported_once(socket, stall, expected):
+    reasons = []
+
+    async def on_dead(reason):
+        reasons.append(reason)
+
+    monitor = LatencyMonitor(interval=0.02, dead_after=0.04, stall_after=stall, on_dead=on_dead)
+    _watch(monitor, _API(socket), 0.2)
+    assert monitor.dead and len(reasons) == 1 and reasons[0].startswith(expected)
+
+
+def test_stalled_tick_stream_is_dead():
+    reasons = []
+
+    async def on_dead(reason):
+        reasons.append(reason)
+
+    monitor = LatencyMonitor(interval=0.4, dead_after=5, stall_after=0.05, on_dead=on_dead)
+    api = _API(_Socket(monitor))
+
+    async def run():
+        monitor.attach(api)
+        api.listeners[0]("quotes/stream", [["EURUSD", 1, 1.1, 0]])
+        monitor.start()
+        await asyncio.sleep(0.2)
+        monitor.stop()
+
+    asyncio.run(run())
+    assert reasons and reasons[0].startswith("tick stream stalled")
+
+
+def test_attach_moves_to_the_new_connection():
+    monitor = LatencyMonitor()
+    old, new = _API(_Socket()), _API(_Socket())
+    monitor.attach(old)
+    monitor.dead = True
+    monitor.attach(new)
+    assert old.rtt_monitor is None and old.listeners == []
+    assert new.listeners == [monitor.on_frame] and not monitor.dead
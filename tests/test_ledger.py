@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from quotexapi.ledger import Ledger, DEMO, LIVE, account_name
+
+
+def _open(id="a1", asset="EURUSD", amount=10, command=0, price=1.1, demo=True):
+    return {"id": id, "asset": asset, "amount": amount, "command": command,
+            "openPrice": price, "percentProfit": 85, "isDemo": demo}
+
+
+def test_balance_push_sets_each_account():
+    ledger = Ledger()
+    ledger.on_frame("s_balance", {"demoBalance": 100, "liveBalance": None})
+    assert ledger.balances == {DEMO: 100.0, LIVE: None}
+    assert ledger.balance() == 100.0 and ledger.balance(LIVE) is None
+    assert account_name(False) == LIVE
+
+
+def test_open_revalue_and_close():
+    ledger = Ledger()
+    ledger.on_balance({"demoBalance": 100})
+    ledger.on_frame("s_orders/open", _open())
+    ledger.on_frame("s_orders/open", _open())
+    assert ledger.open_positions() == 1
+    assert ledger.asset_exposure("EURUSD") == ledger.total_exposure() == 10
+    ledger.on_frame("quotes/stream", [["EURUSD", 1.0, 1.2, 1]])
+    assert ledger.unrealized[DEMO]["EURUSD"] == pytest.approx(8.5)
+    assert ledger.balance() == pytest.approx(108.5)
+    ledger.on_frame("quotes/stream", [["EURUSD", 2.0, 1.0, 0]])
+    assert ledger.balance() == pytest.approx(90)
+    ledger.on_frame("deals/close", {"deals": [{"id": "a1", "profit": -10}]})
+    assert ledger.open_positions() == 0 and ledger.total_exposure() == 0
+    assert ledger.realized_pnl("EURUSD") == -10
+    assert ledger.unrealized_total[DEMO] == 0
+
+
+def test_accounts_are_kept_apart():
+    ledger = Ledger(account=LIVE)
+    ledger.on_open(_open(id="d", demo=True))
+    ledger.on_open(_open(id="l", demo=False, amount=3))
+    assert ledger.total_exposure() == 3
+    assert ledger.total_exposure(DEMO) == 10
+
+
+def test_changes_iterates_notifications():
+    async def run():
+        ledger = Ledger()
+        changes = ledger.changes()
+        pending = asyncio.ensure_future(changes.__anext__())
+        await asyncio.sleep(0)
+        ledger.on_balance({"demoBalance": 5})
+        kind, data = await asyncio.wait_for(pending, 1)
+        await changes.aclose()
+        return kind, data, ledger._listeners
+
+    kind, data, listeners = asyncio.run(run())
+    assert kind == "balance" and data[DEMO] == 5.0
+    assert listeners == []
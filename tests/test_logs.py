@@ -0,0 +1,52 @@
+import logging
+import threading
+from quotexapi import logs
+
+
+class _Collect(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.name, threading.current_thread() is threading.main_thread(),
+                             self.format(record)))
+
+
+def test_package_logger_follows_the_import_path():
+    assert logs.LOGGERS == ("quotexapi", "websocket")
+
+
+def test_records_are_written_by_the_listener_thread():
+    handler = _Collect()
+    listener = logs.start_background_logging(logging.INFO, handlers=[handler])
+    try:
+        logger = logging.getLogger("quotexapi.api")
+        logger.debug("dropped %s", 1)
+        logger.info("sent %s", {"id": 1})
+        assert logging.getLogger("quotexapi").propagate is False
+    finally:
+        logs.stop_background_logging()
+    assert listener.queue_handler not in logging.getLogger("quotexapi").handlers
+    assert logging.getLogger("quotexapi").propagate is True
+    assert handler.records == [("quotexapi.api", False, "sent {'id': 1}")]
+
+
+def test_restart_replaces_the_listener():
+    first = logs.start_background_logging(handlers=[_Collect()])
+    second = logs.start_background_logging(handlers=[_Collect()])
+    try:
+        assert logging.getLogger("websocket").handlers.count(first.queue_handler) == 0
+        assert second.queue_handler in logging.getLogger("websocket").handlers
+    finally:
+        logs.stop_background_logging()
+    logs.stop_background_logging()
+
+
+def test_lazy_handler_keeps_the_record_arguments():
+    args = ([1, 2],)
+    record = logging.LogRecord("quotexapi", logging.INFO, __file__, 1, "%s", args, None)
+    prepared = logs.LazyQueueHandler(None).prepare(record)
+    assert prepared is record and prepared.args is args
+    assert not hasattr(prepared, "message")
@@ -0,0 +1,52 @@
+import urllib.request
+from quotexapi.metrics import Metrics, Histogram, BUCKETS
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) is None
+    for value in (0.0004, 0.0004, 0.003, 7.0):
+        histogram.observe(value)
+    assert (histogram.count, histogram.max) == (4, 7.0)
+    assert histogram.quantile(0.5) == BUCKETS[0]
+    assert histogram.quantile(0.75) == 0.005
+    assert histogram.quantile(1.0) == 7.0
+
+
+def test_snapshot_keys_values_by_name_and_label():
+    metrics = Metrics()
+    metrics.inc("frames_in_total", "quotes/stream")
+    metrics.inc("frames_in_total", "quotes/stream", 2)
+    metrics.set_gauge("queue_depth", "outbound", 5)
+    metrics.observe("request_seconds", "buy", 0.02)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"frames_in_total{quotes/stream}": 3}
+    assert snapshot["gauges"] == {"queue_depth{outbound}": 5}
+    assert snapshot["histograms"]["request_seconds{buy}"]["count"] == 1
+    metrics.reset()
+    assert metrics.snapshot()["counters"] == {}
+
+
+def test_prometheus_rendering():
+    metrics = Metrics()
+    metrics.inc("reconnects_total")
+    metrics.observe("request_seconds", "buy", 0.02)
+    text = metrics.render_prometheus()
+    assert "# TYPE quotex_reconnects_total counter" in text
+    assert "quotex_reconnects_total 1" in text
+    assert 'quotex_request_seconds_bucket{request="buy",le="0.025"} 1' in text
+    assert 'quotex_request_seconds_bucket{request="buy",le="+Inf"} 1' in text
+    assert 'quotex_request_seconds_count{request="buy"} 1' in text
+
+
+def test_serve_exposes_metrics_over_http():
+    metrics = Metrics()
+    server = metrics.serve(port=0)
+    try:
+        assert metrics.enabled
+        metrics.inc("reconnects_total")
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert b"quotex_reconnects_total 1" in response.read()
+    finally:
+        metrics.shutdown()
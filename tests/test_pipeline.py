@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from quotexapi.pipeline import CandlePipeline
+from quotexapi.ratelimit import RateLimiter
+
+
+class _API(object):
+    """Answers every ``history/load`` from another thread, like the websocket thread."""
+
+    def __init__(self, silent=()):
+        self.rate_limiter = RateLimiter(connection=(10000.0, 10000), limits={"history": (10000.0, 10000)})
+        self.pipeline = None
+        self.silent = set(silent)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def enable(self, *components):
+        pass
+
+    def get_candles(self, asset, index, end_from_time, offset, period):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if asset in self.silent:
+            return
+        payload = {"asset": asset, "period": period, "index": index, "data": [[offset]]}
+        timer = threading.Timer(0.01, self._answer, (payload,))
+        timer.start()
+
+    def _answer(self, payload):
+        self.in_flight -= 1
+        self.pipeline.on_frame("history/load", payload)
+
+
+def test_indices_never_repeat_or_stall():
+    pipeline = CandlePipeline(_API())
+    indices = [pipeline._next_index() for _ in range(1000)]
+    assert len(set(indices)) == 1000
+    assert indices == sorted(indices)
+
+
+def test_responses_are_matched_to_their_requests():
+    async def run():
+        api = _API()
+        pipeline = api.pipeline = CandlePipeline(api, window=3)
+        requests = [(f"ASSET{number}", 60, number * 100) for number in range(10)]
+        results = [item async for item in pipeline.fetch(requests)]
+        return api, pipeline, results
+
+    api, pipeline, results = asyncio.run(run())
+    assert len(results) == 10
+    for position, (asset, period, offset), payload in results:
+        assert payload["asset"] == asset and payload["data"] == [[offset]]
+    assert api.max_in_flight <= 3
+    assert pipeline.pending == {}
+
+
+def test_a_missing_response_times_out_alone():
+    async def run():
+        api = _API(silent={"QUIET"})
+        pipeline = api.pipeline = CandlePipeline(api, timeout=0.2)
+        return [item async for item in pipeline.fetch([("QUIET", 60, 0), ("EURUSD", 60, 0)])]
+
+    results = asyncio.run(run())
+    payloads = {request[0]: payload for _, request, payload in results}
+    assert isinstance(payloads["QUIET"], asyncio.TimeoutError)
+    assert payloads["EURUSD"]["asset"] == "EURUSD"
@@ -0,0 +1,118 @@
+import time
+import asyncio
+import threading
+from quotexapi.ratelimit import (
+    RateLimiter, OutboundQueue, TokenBucket, classify, ORDERS, SUBSCRIPTIONS, HISTORY, HTTP
+)
+
+
+def test_classify_by_event():
+    assert classify('42["orders/open",{}]') == ORDERS
+    assert classify('42["history/load",{}]') == HISTORY
+    assert classify('42["tick"]') is None
+    assert classify("2") is None
+
+
+def test_bucket_goes_into_debt_in_order():
+    bucket = TokenBucket(10.0, 2)
+    now = bucket.updated
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now) == 0.0
+    assert round(bucket.reserve(now), 3) == 0.1
+    assert round(bucket.reserve(now), 3) == 0.2
+    assert round(bucket.delay(now + 0.1), 3) == 0.2
+
+
+def test_try_take_and_orders_skip_the_connection_bucket():
+    limiter = RateLimiter({SUBSCRIPTIONS: (1.0, 1)}, connection=(1.0, 1))
+    assert limiter.try_take(SUBSCRIPTIONS)
+    assert not limiter.try_take(SUBSCRIPTIONS)
+    assert limiter.delay(SUBSCRIPTIONS) > 0
+    assert limiter.try_take(ORDERS)
+    assert limiter.try_take("unknown")
+
+
+def test_throttle_signal_backs_off_then_recovers():
+    limiter = RateLimiter(recovery=0.0)
+    base = limiter.buckets[ORDERS].base_rate
+    limiter.on_frame("error", {"error": "Too many requests"})
+    assert limiter.buckets[ORDERS].rate == base * 0.5
+    assert limiter.throttle_events[-1][1] == "error"
+    limiter.try_take(HISTORY)
+    assert limiter.buckets[ORDERS].rate == base * 0.5 * 1.25
+    limiter.on_frame("ok", {"message": "fine"})
+    assert len(limiter.throttle_events) == 1
+
+
+def test_wait_paces_coroutines_and_prepays_acquire():
+    async def run():
+        limiter = RateLimiter({HTTP: (10.0, 1)})
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.wait(HTTP)
+            assert limiter.acquire(HTTP) == 0.0
+        return time.monotonic() - started
+
+    assert 0.15 < asyncio.run(run()) < 0.5
+
+
+def test_queue_sends_orders_before_queued_subscriptions():
+    limiter = RateLimiter({SUBSCRIPTIONS: (10.0, 1), ORDERS: (10.0, 1)})
+    sent, done = [], threading.Event()
+
+    def send(data, no_force_send):
+        sent.append(data)
+        if len(sent) == 6:
+            done.set()
+
+    queue = OutboundQueue(limiter, send)
+    queue.submit(ORDERS, "o0")
+    queue.submit(SUBSCRIPTIONS, "s0")
+    for index in range(1, 3):
+        queue.submit(SUBSCRIPTIONS, f"s{index}")
+    for index in range(1, 3):
+        queue.submit(ORDERS, f"o{index}")
+    assert done.wait(2)
+    # Each queued order is ready no later than the subscription beside it.
+    assert sent == ["o0", "s0", "o1", "s1", "o2", "s2"]
+    queue.close()
+
+
+def test_sent_callback_runs_after_the_frame_went_out():
+    limiter = RateLimiter({SUBSCRIPTIONS: (20.0, 1)})
+    events, done = [], threading.Event()
+    queue = OutboundQueue(limiter, lambda data, no_force_send: events.append(("send", data)))
+    queue.submit(SUBSCRIPTIONS, "a", sent=lambda: events.append(("sent", "a")))
+    queue.submit(SUBSCRIPTIONS, "b", sent=lambda: events.append(("sent", "b")) or done.set())
+    assert done.wait(2)
+    assert events == [("send", "a"), ("sent", "a"), ("send", "b"), ("sent", "b")]
+    queue.close()
+
+
+def test_submit_after_close_is_still_sent():
+    limiter = RateLimiter({SUBSCRIPTIONS: (50.0, 1)})
+    sent = []
+    queue = OutboundQueue(limiter, lambda data, no_force_send: sent.append(data))
+    for index in range(3):
+        queue.submit(SUBSCRIPTIONS, f"before{index}")
+    queue.close()
+    for index in range(2):
+        queue.submit(SUBSCRIPTIONS, f"after{index}")
+    deadline = time.monotonic() + 2
+    while len(sent) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sent == ["before0", "after0", "after1"]
+    assert len(queue) == 0
+    queue.close()
+
+
+def test_next_picks_the_first_ready_class_by_priority():
+    limiter = RateLimiter({ORDERS: (1.0, 1)})
+    queue = OutboundQueue(limiter, None)
+    now = time.monotonic()
+    queue.queues[SUBSCRIPTIONS].append((now, "s", True, None))
+    queue.queues[ORDERS].append((now, "o", True, None))
+    queue.queues[ORDERS].append((now, "o2", True, None))
+    assert queue._next()[1] == "o"
+    assert queue._next()[1] == "s"
+    assert 0 < queue._next() <= 1.0
@@ -0,0 +1,84 @@
+import gzip
+import asyncio
+import pytest
+from quotexapi.recorder import SessionRecorder, SessionReplayer, read_capture, INBOUND, OUTBOUND
+
+
+def _capture(path):
+    with SessionRecorder(path, flush_interval=0.01) as recorder:
+        recorder.record(INBOUND, '451-["quotes/stream",{"_placeholder":true,"num":0}]')
+        recorder.record(INBOUND, b'\x04[["EURUSD",1.5,1.1,1]]')
+        recorder.record(OUTBOUND, '42["tick"]')
+    return recorder
+
+
+def test_capture_round_trip_keeps_kinds_and_order(tmp_path):
+    path = tmp_path / "session.qxws.gz"
+    recorder = _capture(path)
+    assert recorder.frames == 3 and not recorder.recording
+    frames = list(read_capture(path))
+    assert [(direction, message) for _, direction, message in frames] == [
+        (INBOUND, '451-["quotes/stream",{"_placeholder":true,"num":0}]'),
+        (INBOUND, b'\x04[["EURUSD",1.5,1.1,1]]'),
+        (OUTBOUND, '42["tick"]'),
+    ]
+    offsets = [offset for offset, _, _ in frames]
+    assert offsets == sorted(offsets)
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "other.gz"
+    with gzip.open(path, "wb") as file:
+        file.write(b"\0" * 32)
+    with pytest.raises(ValueError):
+        list(read_capture(path))
+
+
+class _WebSocketApp(object):
+    def __init__(self, handler):
+        self.on_message = handler
+
+
+class _Client(object):
+    def __init__(self, handler):
+        self.wss = _WebSocketApp(handler)
+
+
+class _API(object):
+    websocket_client = None
+
+    def __init__(self):
+        self.dispatched = []
+
+    def send_websocket_request(self, data, no_force_send=True):
+        raise AssertionError("replay must not reach the socket")
+
+    def dispatch_frame(self, message):
+        self.dispatched.append(message)
+
+
+def test_replay_feeds_the_client_handler_and_collects_sends(tmp_path):
+    path = tmp_path / "session.qxws.gz"
+    _capture(path)
+    api = _API()
+    handled = []
+
+    def on_message(wss, message):
+        handled.append(message)
+        api.send_websocket_request('42["answer"]')
+
+    api.websocket_client = _Client(on_message)
+    replayer = SessionReplayer(api, path, speed=0)
+    result = asyncio.run(replayer.run())
+    assert result["frames"] == 2 and result["sent"] == 2
+    assert handled[1] == b'\x04[["EURUSD",1.5,1.1,1]]'
+    assert api.dispatched == []
+    assert "send_websocket_request" not in vars(api)
+
+
+def test_replay_without_a_client_dispatches_frames(tmp_path):
+    path = tmp_path / "session.qxws.gz"
+    _capture(path)
+    api = _API()
+    asyncio.run(SessionReplayer(api, path, speed=0).run())
+    assert len(api.dispatched) == 2
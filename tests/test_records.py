@@ -0,0 +1,37 @@
+import pytest
+from quotexapi.records import Tick, Candle, Deal, to_candles
+
+
+def test_records_answer_like_dicts():
+    candle = Candle(time=60, open=1.1, close=1.2, high=1.3, low=1.0)
+    assert candle["close"] == 1.2
+    assert candle.get("ticks", 0) == 0
+    assert "ticks" not in candle and "open" in candle
+    assert dict(candle.items()) == {"time": 60, "open": 1.1, "close": 1.2, "high": 1.3, "low": 1.0}
+    assert candle == candle.to_dict()
+    with pytest.raises(KeyError):
+        candle["volume"]
+    with pytest.raises(KeyError):
+        candle["volume"] = 1
+
+
+def test_records_have_no_instance_dict():
+    tick = Tick.from_list(["EURUSD", 1.5, 1.1, 1, "extra"])
+    assert (tick.asset, tick.time, tick.price, tick.direction) == ("EURUSD", 1.5, 1.1, 1)
+    assert not hasattr(tick, "__dict__")
+
+
+def test_candle_update_folds_prices():
+    candle = Candle(60, 1.1, 1.1, 1.1, 1.1)
+    for price in (1.3, 0.9, 1.2):
+        candle.update(price)
+    assert (candle.high, candle.low, candle.close, candle.ticks) == (1.3, 0.9, 1.2, 3)
+
+
+def test_conversions():
+    deal = Deal.from_dict({"id": "a1", "profit": 8.5, "unknown": 1})
+    assert deal.to_dict() == {"id": "a1", "profit": 8.5}
+    existing = Candle(0, 1, 1, 1, 1)
+    converted = to_candles([existing, {"time": 60, "open": 2, "close": 2, "high": 2, "low": 2}])
+    assert converted[0] is existing
+    assert isinstance(converted[1], Candle) and converted[1]["time"] == 60
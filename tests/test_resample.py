@@ -0,0 +1,65 @@
+import pytest
+from quotexapi import resample as resample_module
+from quotexapi.records import Candle
+from quotexapi.resample import Resampler, Resamplers, resample, bucket_start
+
+
+def _base(count, start=0, period=60):
+    return [Candle(start + index * period, 1.0 + index, 1.5 + index, 2.0 + index, 0.5 + index, 1)
+            for index in range(count)]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(resample_module, "np", None)
+    elif resample_module.np is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+def test_resample_aggregates_aligned_buckets(backend):
+    bars = resample(_base(7, start=120), 300)
+    assert [bar.to_dict() for bar in bars] == [
+        {"time": 0, "open": 1.0, "close": 3.5, "high": 4.0, "low": 0.5, "ticks": 3},
+        {"time": 300, "open": 4.0, "close": 7.5, "high": 8.0, "low": 3.5, "ticks": 4},
+    ]
+    assert resample([], 300) == []
+
+
+def test_bucket_start_with_offset():
+    assert bucket_start(299, 300) == 0
+    assert bucket_start(299, 300, offset=100) == 100
+    assert bucket_start(99, 300, offset=100) == -200
+
+
+def test_live_ticks_update_every_timeframe():
+    resampler = Resampler("EURUSD", base_period=60)
+    resampler.load(_base(5), span=300)
+    assert resampler.covers(300) and not resampler.covers(600)
+    assert len(resampler.candles(300)) == 1
+    resampler.on_tick(301, 9.9)
+    resampler.on_tick(302, 0.1)
+    latest = resampler.candles(300)[-1]
+    assert (latest.time, latest.open, latest.high, latest.low, latest.close) == (300, 9.9, 9.9, 0.1, 0.1)
+    assert resampler.candles(60, count=1)[0].ticks == 2
+    resampler.on_tick(10, 5.0)
+    assert resampler.candles(60)[0].close == 1.5
+
+
+def test_load_grows_maxlen_to_keep_the_history():
+    resampler = Resampler("EURUSD", maxlen=4)
+    resampler.load(_base(10))
+    assert len(resampler.candles(60)) == 10
+    with pytest.raises(ValueError):
+        resampler.add_timeframe(90)
+
+
+def test_registry_feeds_loaded_resamplers_only():
+    resamplers = Resamplers()
+    loaded = resamplers.get("EURUSD")
+    loaded.load(_base(1))
+    empty = resamplers.get("GBPUSD")
+    resamplers.on_frame("quotes/stream", [["EURUSD", 61, 3.0, 1], ["GBPUSD", 61, 3.0, 1]])
+    assert len(loaded.candles(60)) == 2 and not empty.loaded
+    assert resamplers.get("EURUSD", base_period=30) is not loaded
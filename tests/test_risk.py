@@ -0,0 +1,64 @@
+import time
+from quotexapi.ledger import Ledger, DEMO, LIVE
+from quotexapi.risk import RiskEngine
+
+
+def _engine(**limits):
+    engine = RiskEngine()
+    engine.attach(Ledger())
+    engine.set_limits(DEMO, **limits)
+    return engine
+
+
+def _open(id, amount, request_id=None):
+    return {"id": id, "asset": "EURUSD", "amount": amount, "command": 0, "openPrice": 1.1,
+            "percentProfit": 85, "isDemo": True, "requestId": request_id}
+
+
+def test_reservations_count_against_exposure_until_released():
+    engine = _engine(max_asset_exposure=25)
+    ok, first = engine.approve(10, "EURUSD")
+    assert ok
+    assert engine.approve(10, "EURUSD")[0]
+    assert engine.approve(10, "EURUSD") == (False, "max_asset_exposure")
+    assert engine.release(first) and not engine.release(first)
+    assert engine.approve(10, "EURUSD")[0]
+    assert engine.rejections["max_asset_exposure"] == 1
+
+
+def test_acknowledgement_releases_the_request_reservation():
+    engine = _engine(max_open_positions=1)
+    ok, _ = engine.approve(10, "EURUSD", request_id=7)
+    assert ok
+    assert engine.approve(10, "EURUSD") == (False, "max_open_positions")
+    engine.ledger.on_open(_open("p1", 10, request_id=7))
+    assert engine.snapshot()["reservations"] == 0
+    assert engine.approve(10, "EURUSD") == (False, "max_open_positions")
+    engine.ledger.on_close({"id": "p1", "profit": -4})
+    assert engine.approve(10, "EURUSD")[0]
+    assert engine.daily_pnl[DEMO] == -4
+
+
+def test_daily_loss_and_order_amount_rules():
+    engine = _engine(max_order_amount=50, max_daily_loss=5)
+    assert engine.approve(60, "EURUSD") == (False, "max_order_amount")
+    engine.ledger.on_close({"id": "x", "profit": -5, "isDemo": True})
+    assert engine.approve(1, "EURUSD") == (False, "max_daily_loss")
+    assert engine.approve(1, "EURUSD", account=LIVE)[0]
+
+
+def test_stale_reservations_expire():
+    engine = _engine(max_total_exposure=10)
+    engine.reservation_timeout = 0
+    assert engine.approve(10, "EURUSD")[0]
+    time.sleep(0.01)
+    assert engine.approve(10, "GBPUSD")[0]
+    assert engine.snapshot()["reservations"] == 1
+
+
+def test_attach_moves_the_listener():
+    engine = _engine()
+    old = engine.ledger
+    engine.attach(Ledger())
+    assert engine.on_ledger not in old._listeners
+    assert engine.on_ledger in engine.ledger._listeners
@@ -0,0 +1,92 @@
+import pytest
+from quotexapi.runner import RingBuffer, StrategyRunner, TICK, CANDLE
+
+
+@pytest.fixture
+def ring():
+    ring = RingBuffer(8)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def _publish(ring, count):
+    for index in range(count):
+        ring.publish(TICK, 0, 0, float(index), 1.0, 1.0, 1.0, 1.0, 1)
+
+
+def test_ring_reads_in_order_with_limit(ring):
+    _publish(ring, 5)
+    records, position, lost = ring.read(0, limit=3)
+    assert [record[3] for record in records] == [0.0, 1.0, 2.0]
+    assert (position, lost) == (3, 0)
+    records, position, lost = ring.read(position)
+    assert [record[3] for record in records] == [3.0, 4.0]
+    assert ring.read(position) == ([], 5, 0)
+
+
+def test_ring_wraparound_reports_lost_records(ring):
+    _publish(ring, 20)
+    records, position, lost = ring.read(0)
+    # Only capacity - 1 records behind the writer are readable.
+    assert [record[3] for record in records] == [float(index) for index in range(13, 20)]
+    assert (position, lost) == (20, 13)
+
+
+def test_attached_reader_shares_the_ring(ring):
+    reader = RingBuffer(8, name=ring.name)
+    try:
+        _publish(ring, 2)
+        assert reader.sequence == 2
+        assert len(reader.read(0)[0]) == 2
+    finally:
+        reader.close()
+
+
+class _Client(object):
+    def __init__(self):
+        self.listeners = []
+
+    def add_frame_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_frame_listener(self, listener):
+        self.listeners.remove(listener)
+
+
+class _Process(object):
+    name = "worker"
+
+    def __init__(self, exitcode=None):
+        self.exitcode = exitcode
+
+    def is_alive(self):
+        return self.exitcode is None
+
+
+def test_ticks_build_candles_published_on_close(ring):
+    runner = StrategyRunner(_Client(), [], ["EURUSD"], periods=(60,))
+    runner.ring = ring
+    runner.on_frame("quotes/stream", [["EURUSD", 61.0, 1.1, 1], ["GBPUSD", 61.5, 1.3, 1]])
+    runner.on_frame("quotes/stream", [["EURUSD", 62.0, 1.3, 1], ["EURUSD", 65.0, 1.0, 0]])
+    runner.on_frame("quotes/stream", [["EURUSD", 120.0, 1.2, 1]])
+    records = ring.read(0)[0]
+    assert [record[0] for record in records] == [TICK, TICK, TICK, TICK, CANDLE]
+    candle = records[4]
+    assert candle[2:] == (60, 60.0, 1.1, 1.3, 1.0, 1.0, 3.0)
+
+
+def test_dead_workers_are_restarted_then_dropped(ring):
+    runner = StrategyRunner(_Client(), [], ["EURUSD"], max_restarts=1)
+    spawned = []
+    runner._spawn = lambda strategy: spawned.append(strategy) or runner.processes.append(_Process())
+    crashed, finished, alive = _Process(1), _Process(0), _Process()
+    runner.processes = [crashed, finished, alive]
+    runner._strategies = {crashed: "a", finished: "b", alive: "c"}
+    assert runner.check_workers() == 2
+    assert spawned == ["a"]
+    runner.processes[-1].exitcode = 1
+    runner._strategies[runner.processes[-1]] = "a"
+    alive.exitcode = -9
+    assert runner.check_workers() == 0
+    assert spawned == ["a"] and runner.restarts == 1
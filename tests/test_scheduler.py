@@ -0,0 +1,116 @@
+import time
+import asyncio
+from quotexapi import expiration
+from quotexapi.scheduler import OrderScheduler, ScheduledEntry, DEFAULT_LEAD
+
+
+class _Monitor(object):
+    def __init__(self, p90):
+        self.p90 = p90
+
+    def stats(self):
+        return {"count": 10, "p90": self.p90}
+
+
+class _API(object):
+    rtt_monitor = None
+    pending_id = None
+
+    def __init__(self):
+        self.sent = []
+        self.follows = []
+
+    @staticmethod
+    def pending_frame(amount, asset, direction, duration, open_time):
+        return f"pending {asset} {open_time}"
+
+    def send_websocket_request(self, data):
+        self.sent.append((time.time(), data))
+        asyncio.get_running_loop().call_later(0.05, setattr, self, "pending_id", f"T{len(self.sent)}")
+
+    def instruments_follow(self, amount, asset, direction, duration, open_time):
+        self.follows.append((self.pending_id, asset, open_time))
+
+
+class _Client(object):
+    def __init__(self):
+        self.api = _API()
+
+    async def get_time_offset(self):
+        return 0
+
+
+def test_lead_defaults_to_measured_round_trip():
+    client = _Client()
+    scheduler = OrderScheduler(client)
+    assert scheduler.current_lead() == DEFAULT_LEAD
+    client.api.rtt_monitor = _Monitor(0.8)
+    assert scheduler.current_lead() == 0.8
+    client.api.rtt_monitor = _Monitor(0.1)
+    assert scheduler.current_lead() == DEFAULT_LEAD
+    assert OrderScheduler(client, lead=0.2).current_lead() == 0.2
+
+
+def test_pending_entry_fires_ahead_and_follows_its_ticket():
+    async def run():
+        client = _Client()
+        scheduler = OrderScheduler(client, lead=0.3)
+        entry = await scheduler.schedule(5, "EURUSD", "call", 60, at=time.time() + 0.6)
+        await asyncio.sleep(0.5)
+        assert client.api.sent and entry.fired_at is not None
+        assert await entry.result is True
+        return client, scheduler, entry
+
+    client, scheduler, entry = asyncio.run(run())
+    fired_at, frame = client.api.sent[0]
+    assert abs(fired_at - (entry.target - 0.3)) < 0.05
+    assert frame == f"pending EURUSD {entry.open_time}"
+    assert client.api.follows == [("T1", "EURUSD", entry.open_time)]
+    assert scheduler.pending == 0 and scheduler.lag_report()["fired"] == 1
+
+
+def test_default_pending_target_matches_open_pending_lookahead():
+    async def run():
+        scheduler = OrderScheduler(_Client(), lead=0.1)
+        entry = await scheduler.schedule(5, "EURUSD", "call", 60)
+        scheduler.cancel_all()
+        return entry
+
+    now = time.time()
+    entry = asyncio.run(run())
+    assert entry.target == expiration.get_next_boundary(now, 60) + 60
+
+
+def test_cancel_all_cancels_armed_and_parked_entries():
+    async def run():
+        client = _Client()
+        scheduler = OrderScheduler(client, lead=0.0)
+        now = time.time()
+        armed = await scheduler.schedule(5, "EURUSD", "call", 60, at=now + 0.3)
+        parked = await scheduler.schedule(5, "EURUSD", "call", 60, at=now + 30)
+        assert armed in scheduler.armed
+        scheduler.cancel_all()
+        await asyncio.sleep(0.4)
+        return client, scheduler, armed, parked
+
+    client, scheduler, armed, parked = asyncio.run(run())
+    assert armed.cancelled and parked.cancelled
+    assert client.api.sent == [] and not scheduler.armed
+
+
+def test_tick_sweeps_slots_skipped_by_a_stall():
+    async def run():
+        scheduler = OrderScheduler(_Client(), lead=0.0, slots=16)
+        scheduler._loop = asyncio.get_running_loop()
+        now = int(time.time())
+        late = ScheduledEntry("EURUSD", "call", 5, 60, now - 2.5, "buy")
+        late.fire_at = late.target
+        scheduler.wheel[int(late.fire_at) % scheduler.slots].append(late)
+        scheduler.pending = 1
+        scheduler._processed = now - 4
+        scheduler._tick()
+        armed = late in scheduler.armed
+        scheduler.cancel_all()
+        return armed
+
+    assert asyncio.run(run())
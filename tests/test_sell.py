@@ -0,0 +1,70 @@
+import asyncio
+from quotexapi.ratelimit import RateLimiter
+from quotexapi.sell import OptionSeller
+
+
+class _API(object):
+
+    def __init__(self, answered):
+        self.answered = answered
+        self.enabled = set()
+        self.sent = []
+        self.rate_limiter = RateLimiter()
+        self.seller = OptionSeller(self)
+
+    def enable(self, name):
+        self.enabled.add(name)
+
+    def sell_frame(self, ticket):
+        return ticket
+
+    def send_websocket_request(self, data):
+        self.sent.append(data)
+
+    def answer(self):
+        for ticket in reversed(self.sent):
+            if ticket in self.answered:
+                self.seller.on_frame("orders/cancel", {"ticket": ticket, "status": "ok"})
+
+
+def _sell(api, tickets, timeout):
+    async def run():
+        results = []
+        async for result in api.seller.sell_many(tickets, timeout=timeout):
+            results.append(result)
+            if len(results) == 1:
+                assert api.seller.pending
+        return results
+
+    async def main():
+        task = asyncio.ensure_future(run())
+        while len(api.sent) < len(dict.fromkeys(tickets)):
+            await asyncio.sleep(0.001)
+        api.answer()
+        return await task
+
+    return asyncio.run(main())
+
+
+def test_results_are_routed_by_ticket():
+    api = _API({"t1", "t2", "t3"})
+    results = _sell(api, ["t1", "t2", "t1", "t3"], timeout=1)
+    assert api.sent == ["t1", "t2", "t3"] and "seller" in api.enabled
+    assert sorted(result.ticket for result in results) == ["t1", "t2", "t3"]
+    assert all(result.response["ticket"] == result.ticket for result in results)
+    assert all(result.latency >= 0 and result.error is None for result in results)
+    assert api.seller.pending == {}
+
+
+def test_unanswered_tickets_time_out():
+    api = _API({"t1"})
+    results = _sell(api, ["t1", "t2"], timeout=0.05)
+    assert [(result.ticket, result.error) for result in results] == [("t1", None), ("t2", "timeout")]
+    assert results[1].response is None
+    assert api.seller.pending == {}
+
+
+def test_unknown_frames_are_ignored():
+    seller = OptionSeller(None)
+    seller.on_frame("orders/cancel", {"ticket": "x"})
+    seller.on_frame("orders/cancel", ["x"])
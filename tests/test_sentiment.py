@@ -0,0 +1,47 @@
+import math
+import statistics
+import pytest
+from quotexapi.sentiment import SentimentSeries, SentimentStore
+
+
+def test_rolling_statistics_match_the_window():
+    series = SentimentSeries(capacity=10, window=4)
+    values = [50, 55, 60, 40, 70, 65]
+    for second, value in enumerate(values):
+        series.push(second, value)
+    window = values[-4:]
+    assert series.mean() == pytest.approx(statistics.mean(window))
+    assert series.std() == pytest.approx(statistics.pstdev(window))
+    assert series.zscore() == pytest.approx((65 - statistics.mean(window)) / statistics.pstdev(window))
+    assert series.rate_of_change(2) == 65 - 40
+
+
+def test_ring_keeps_the_newest_samples():
+    series = SentimentSeries(capacity=3, window=3)
+    for second in range(5):
+        series.push(float(second), float(second * 10))
+    assert len(series) == 3
+    assert series.history() == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert series.history(2) == [(3.0, 30.0), (4.0, 40.0)]
+    assert (series.last, series.last_time) == (40.0, 4.0)
+    assert series.rate_of_change(3) is None
+
+
+def test_flat_and_short_series():
+    series = SentimentSeries()
+    assert series.mean() is None and series.last is None
+    series.push(0, 50)
+    assert series.std() is None and series.zscore() is None
+    series.push(1, 50)
+    assert series.std() == 0 and series.zscore() == 0.0
+
+
+def test_store_tracks_buy_percentage_and_ranks_extremes():
+    store = SentimentStore(window=5)
+    for second, (calm, wild) in enumerate([(50, 50), (51, 50), (50, 50), (51, 90)]):
+        store.on_frame(None, {"asset": "CALM", "sentiment": {"buy": calm, "sell": 100 - calm}, "time": second})
+        store.on_frame(None, {"asset": "WILD", "sentiment": {"buy": wild, "sell": 100 - wild}, "time": second})
+    store.on_frame(None, {"asset": "NONE", "sentiment": {"sell": 10}})
+    assert store.latest() == {"CALM": 51.0, "WILD": 90.0}
+    ranked = store.extremes(count=1)
+    assert ranked[0]["asset"] == "WILD" and not math.isnan(ranked[0]["zscore"])
@@ -0,0 +1,47 @@
+from quotexapi.settings_cache import SettingsCache
+
+
+class _Profile(object):
+    nick_name = profile_id = demo_balance = live_balance = offset = None
+
+
+def _payload(fast=False, expiry=100, asset="EURUSD"):
+    return {"chartId": "graph", "settings": {
+        "isFastOption": fast, "currentExpirationTime": expiry, "currentAsset": {"symbol": asset},
+    }}
+
+
+def test_unsent_settings_are_not_remembered():
+    cache = SettingsCache(_Profile())
+    payload = _payload()
+    assert cache.settings_changed(payload)
+    assert cache.settings_changed(payload)
+    cache.settings_sent(payload)
+    assert not cache.settings_changed(payload)
+    assert cache.settings_changed(_payload(asset="GBPUSD"))
+
+
+def test_wall_clock_expiry_is_ignored_outside_fast_options():
+    cache = SettingsCache(_Profile())
+    cache.settings_sent(_payload(expiry=100))
+    assert not cache.settings_changed(_payload(expiry=160))
+
+
+def test_fast_option_expiry_is_compared():
+    cache = SettingsCache(_Profile())
+    cache.settings_sent(_payload(fast=True, expiry=100))
+    assert not cache.settings_changed(_payload(fast=True, expiry=100))
+    assert cache.settings_changed(_payload(fast=True, expiry=160))
+
+
+def test_pushes_refresh_the_profile():
+    profile = _Profile()
+    cache = SettingsCache(profile, ttl=300)
+    assert not cache.is_fresh()
+    cache.on_frame("s_profile", {"nickname": "trader", "timeOffset": 10800, "demoBalance": 10000})
+    assert (profile.nick_name, profile.offset, profile.demo_balance) == ("trader", 10800, 10000)
+    assert cache.is_fresh()
+    cache.on_frame("s_balance", {"liveBalance": 5.5})
+    assert profile.live_balance == 5.5
+    cache.invalidate()
+    assert not cache.is_fresh()
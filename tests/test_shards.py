@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from quotexapi.connection import ConnectionState, READY, CLOSED
+from quotexapi.ratelimit import RateLimiter
+from quotexapi.shards import HashRing, ShardedSubscriptions, SHARED_STATE, market_data
+
+
+class _API(object):
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.connection = ConnectionState()
+        self.rate_limiter = RateLimiter()
+        self.frame_listeners = []
+        self.frame_lock = None
+        self.calls = []
+        self.closed = False
+        for name in SHARED_STATE:
+            setattr(self, name, {})
+
+    def emit_frame(self, event, payload):
+        assert self.frame_lock is None or self.frame_lock.locked()
+        for listener in self.frame_listeners:
+            listener(event, payload)
+
+    async def connect(self, is_demo):
+        if self.fail:
+            return False, "refused"
+        self.connection.transition(READY)
+        return True, "connected"
+
+    def close(self):
+        self.closed = True
+
+    def __getattr__(self, name):
+        if name in ("subscribe_realtime_candle", "chart_notification", "follow_candle",
+                    "unsubscribe_realtime_candle", "unfollow_candle"):
+            return lambda *args: self.calls.append((name,) + args)
+        raise AttributeError(name)
+
+
+class _Client(object):
+    account_is_demo = True
+
+    def __init__(self, fail_after=None):
+        self.api = _API()
+        self.created = []
+        self.fail_after = fail_after
+
+    def _new_api(self):
+        api = _API(fail=self.fail_after is not None and len(self.created) >= self.fail_after)
+        self.created.append(api)
+        return api
+
+
+class _LockingAPI(_API):
+
+    def emit_frame(self, event, payload):
+        if self.frame_lock is None:
+            return super().emit_frame(event, payload)
+        with self.frame_lock:
+            super().emit_frame(event, payload)
+
+
+def test_hash_ring_is_stable_and_moves_few_keys():
+    assets = [f"ASSET{index}" for index in range(1000)]
+    four, five = HashRing(range(4)), HashRing(range(5))
+    assert [four.node_for(asset) for asset in assets] == [HashRing(range(4)).node_for(asset) for asset in assets]
+    moved = [asset for asset in assets if four.node_for(asset) != five.node_for(asset)]
+    assert all(five.node_for(asset) == 4 for asset in moved)
+    assert 100 < len(moved) < 350
+
+
+@pytest.mark.parametrize("event, payload, expected", [
+    ("quotes/stream", [["EURUSD", 1, 1.1, 0]], True),
+    ("instruments/list", [[1, "EURUSD"]], False),
+    ("depth/change", {"asset": "EURUSD"}, True),
+    ("sentiment", {"sentiment": {"buy": 60}}, True),
+    ("s_balance", {"demoBalance": 5}, False),
+    ("s_orders/open", [], False),
+])
+def test_market_data_filter(event, payload, expected):
+    assert market_data(event, payload) is expected
+
+
+def test_follow_routes_by_ring_and_replays_on_connect():
+    client = _Client()
+    shards = ShardedSubscriptions(client, count=3)
+    indexes = {asset: shards.follow(asset, 60) for asset in ("EURUSD", "GBPUSD", "USDJPY", "AUDCAD", "BTCUSD")}
+    assert all(shards.shard_for(asset).index == shards.ring.node_for(asset) == index
+               for asset, index in indexes.items())
+
+    asyncio.run(shards.start())
+    for shard in shards.shards:
+        followed = [call[1] for call in shard.api.calls if call[0] == "follow_candle"]
+        assert followed == list(shard.assets)
+        assert shard.api.realtime_price is client.api.realtime_price
+    assert client.api.frame_lock is not None
+    shard = shards.shard_for("EURUSD")
+    shards.unfollow("EURUSD")
+    assert "EURUSD" not in shard.assets and shard.api.calls[-1] == ("unfollow_candle", "EURUSD")
+    asyncio.run(shards.stop())
+    assert all(api.closed for api in client.created) and client.api.frame_lock is None
+
+
+def test_failed_start_closes_connected_shards():
+    client = _Client(fail_after=1)
+    shards = ShardedSubscriptions(client, count=3)
+    with pytest.raises(ConnectionError):
+        asyncio.run(shards.start())
+    assert [api.closed for api in client.created] == [True, True]
+    assert all(shard.api is None for shard in shards.shards[1:])
+    assert all(shard.task is None for shard in shards.shards)
+    assert client.api.frame_lock is None
+
+
+def test_extra_shards_forward_market_data_under_the_primary_lock():
+    client = _Client()
+    client.api = _LockingAPI()
+    received = []
+    client.api.frame_listeners = [lambda event, payload: received.append(event)]
+    shards = ShardedSubscriptions(client, count=2)
+
+    async def run():
+        await shards.start()
+        extra = shards.shards[1].api
+        for listener in extra.frame_listeners:
+            listener("quotes/stream", [["EURUSD", 1, 1.1, 0]])
+            listener("s_balance", {"demoBalance": 1})
+        client.api.emit_frame("s_balance", {"demoBalance": 2})
+        await shards.stop()
+
+    asyncio.run(run())
+    assert received == ["quotes/stream", "s_balance"]
+    assert shards.stats()[1]["frames"] == 1
+
+
+def test_single_shard_leaves_the_primary_unlocked():
+    client = _Client()
+    shards = asyncio.run(ShardedSubscriptions(client, count=1).start())
+    assert client.api.frame_lock is None and shards.follow("EURUSD", 60) == 0
+
+
+def test_dropped_shard_is_closed_and_reconnected():
+    client = _Client()
+    shards = ShardedSubscriptions(client, count=2)
+
+    async def run():
+        await shards.start()
+        first = shards.shards[1].api
+        first.connection.transition(CLOSED, "gone")
+        for _ in range(200):
+            if shards.shards[1].reconnects:
+                break
+            await asyncio.sleep(0.01)
+        await shards.stop()
+        return first
+
+    first = asyncio.run(run())
+    assert first.closed and shards.shards[1].reconnects == 1 and len(client.created) == 2
@@ -0,0 +1,58 @@
+import time
+import asyncio
+from quotexapi.signals import SignalStore, Signal
+
+
+def _frame(now, *items):
+    return {"signals": [[asset, [{"signal": direction, "timeFrame": frame}], now + offset]
+                        for asset, direction, frame, offset in items]}
+
+
+def test_index_by_asset_timeframe_and_time():
+    store = SignalStore()
+    now = time.time()
+    store.on_frame("signals/list", _frame(
+        now, ("EURUSD", "call", 60, 0), ("EURUSD", "put", 300, -10), ("EURUSD", "call", 60, -5),
+        ("GBPUSD", "put", 60, 0),
+    ))
+    assert len(store) == 4
+    assert [signal.direction for signal in store.get("EURUSD")] == ["put", "call", "call"]
+    assert [signal.time for signal in store.get("EURUSD", 60)] == [now - 5, now]
+    assert [signal.time for signal in store.get("EURUSD", start=now - 6, end=now - 1)] == [now - 5]
+    assert store.latest("EURUSD", 300).direction == "put"
+
+
+def test_expired_signals_are_dropped():
+    store = SignalStore()
+    now = time.time()
+    assert not store.add(Signal("EURUSD", "call", 60, now - 61, 0))
+    assert store.add(Signal("EURUSD", "call", 1, now - 0.95, 0))
+    time.sleep(0.1)
+    assert store.get("EURUSD") == []
+    assert len(store) == 0
+
+
+def test_malformed_items_are_skipped():
+    store = SignalStore()
+    store.on_frame("signals/list", {"signals": [["EURUSD"], None]})
+    store.on_frame("signals/list", {"other": 1})
+    assert len(store) == 0
+
+
+def test_consumers_receive_new_signals():
+    async def run():
+        store = SignalStore()
+        received = []
+
+        async def consumer(signal):
+            received.append(signal.asset)
+
+        store.subscribe(consumer)
+        store.on_frame("signals/list", _frame(time.time(), ("EURUSD", "call", 60, 0)))
+        await asyncio.sleep(0.05)
+        store.unsubscribe(consumer)
+        return received, store.latency_stats()
+
+    received, stats = asyncio.run(run())
+    assert received == ["EURUSD"]
+    assert stats["count"] == 1
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import pytest
+from quotexapi.streams import StreamHub, LOSSLESS
+
+
+def test_latest_policy_conflates_per_key():
+    async def run():
+        hub = StreamHub()
+        subscription = hub.subscribe([("tick", "EURUSD"), ("tick", "GBPUSD")])
+        hub.on_frame("quotes/stream", [["EURUSD", 1.0, 1.1, 1], ["GBPUSD", 1.0, 1.3, 0], ["EURUSD", 2.0, 1.2, 1]])
+        items = [await subscription.__anext__(), await subscription.__anext__()]
+        subscription.close()
+        return items, len(subscription)
+
+    items, left = asyncio.run(run())
+    assert [(tick.asset, tick.price) for tick in items] == [("GBPUSD", 1.3), ("EURUSD", 1.2)]
+    assert left == 0
+
+
+def test_lossless_policy_drops_oldest_beyond_maxsize():
+    async def run():
+        hub = StreamHub()
+        subscription = hub.subscribe([("tick", "EURUSD")], policy=LOSSLESS, maxsize=2)
+        for second in range(4):
+            hub.on_tick("EURUSD", float(second), 1.0 + second)
+        subscription.close()
+        return [tick.time async for tick in subscription], subscription.dropped
+
+    times, dropped = asyncio.run(run())
+    assert times == [2.0, 3.0] and dropped == 2
+
+
+def test_candles_are_built_per_subscribed_period():
+    async def run():
+        hub = StreamHub()
+        async with hub.subscribe([("candle", "EURUSD", 60)], policy=LOSSLESS) as subscription:
+            for timestamp, price in ((61, 1.1), (70, 1.3), (90, 1.0), (121, 1.2)):
+                hub.on_tick("EURUSD", timestamp, price)
+            candles = [await subscription.__anext__() for _ in range(4)]
+        return candles, hub.periods
+
+    candles, periods = asyncio.run(run())
+    assert candles[2].to_dict() == {"time": 60, "open": 1.1, "close": 1.0, "high": 1.3, "low": 1.0, "ticks": 3}
+    assert (candles[3].time, candles[3].ticks) == (120, 1)
+    assert periods == {"EURUSD": frozenset()}
+
+
+def test_sentiment_topic_and_unknown_policy():
+    async def run():
+        hub = StreamHub()
+        with pytest.raises(ValueError):
+            hub.subscribe([("tick", "EURUSD")], policy="newest")
+        subscription = hub.subscribe([("sentiment", "EURUSD")])
+        hub.on_frame(None, {"asset": "EURUSD", "sentiment": {"buy": 60, "sell": 40}})
+        item = await subscription.__anext__()
+        subscription.close()
+        return item
+
+    assert asyncio.run(run()) == {"buy": 60, "sell": 40, "asset": "EURUSD"}
+
+
+def test_ticks_from_another_thread_while_subscriptions_change():
+    async def run():
+        hub = StreamHub()
+        stop = threading.Event()
+        errors = []
+
+        def feed():
+            second = 0
+            while not stop.is_set():
+                try:
+                    hub.on_tick("EURUSD", second * 0.01, 1.1)
+                except RuntimeError as error:
+                    errors.append(error)
+                    return
+                second += 1
+
+        thread = threading.Thread(target=feed)
+        thread.start()
+        try:
+            for index in range(2000):
+                hub.subscribe([("candle", "EURUSD", index % 50 + 1)]).close()
+        finally:
+            stop.set()
+            thread.join()
+        return errors
+
+    assert asyncio.run(run()) == []